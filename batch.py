@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Analyzes a list of sites in parallel worker processes.
+
+Usage:
+    python batch.py sites.txt
+    cat sites.txt | python batch.py --processes 8 --max-concurrency 128
+
+The site list has one URL per line (blank lines and # comments are ignored).
+Findings are written to one JSONL file per site and a summary to batch_summary.json.
+"""
+
+import argparse
+import json
+import logging
+import sys
+
+from src.batch import read_sites, run_batch
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Analyze many sites in parallel worker processes.")
+    parser.add_argument("sites", nargs="?", default="-", help="File listing one site per line (default: stdin)")
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes (default: number of CPUs)")
+    parser.add_argument("--max-concurrency", type=int, default=64, help="Requests in flight across all workers")
+    parser.add_argument("--results-dir", default="batch_results", help="Directory for the per-site JSONL files")
+    parser.add_argument("--summary", default="batch_summary.json", help="File for the aggregated summary")
+    parser.add_argument("--crawl-depth", type=int, default=None, help="Maximum crawl depth for every site")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    args = parse_args()
+
+    if args.sites == "-":
+        sites = read_sites(sys.stdin)
+    else:
+        with open(args.sites) as f:
+            sites = read_sites(f)
+    if not sites:
+        sys.exit("No sites to analyze")
+
+    summary = run_batch(
+        sites,
+        args.results_dir,
+        processes=args.processes,
+        max_concurrency=args.max_concurrency,
+        max_crawl_depth=args.crawl_depth,
+    )
+    with open(args.summary, 'w') as f:
+        json.dump(summary, f, indent=2)
+
+    print(f"Analyzed {summary['sites']} sites in {summary['seconds']}s "
+          f"({summary['succeeded']} succeeded, {summary['failed']} failed)")
+    for kind, total in summary["totals"].items():
+        print(f"  {kind}: {total}")
+    print(f"Summary saved to '{args.summary}', findings in '{args.results_dir}/'")
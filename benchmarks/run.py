@@ -0,0 +1,209 @@
+"""
+Offline benchmarks of SitemapAnalyzer against a local synthetic site.
+
+Usage (from the project root):
+    python -m benchmarks.run
+    python -m benchmarks.run --pages 20000 --slow-every 50 --json results.json
+    python -m benchmarks.run --baseline results.json   # exit 1 on a regression
+
+Each scenario runs in a fresh process against a freshly started site, so peak RSS
+and CPU time belong to that scenario alone. Reported metrics: pages/s, requests/s,
+p50/p99 request latency, peak RSS and CPU time; analyze() scenarios also check
+their findings against what the synthetic site is known to contain.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # resource is Unix-only; RSS and CPU time are then not reported
+    resource = None
+
+from src.async_engine import AsyncPageStore
+from src.sitemap_analyzer import SitemapAnalyzer
+
+from .synthetic_site import SiteSpec, SyntheticSite, sitemap_urls
+
+SCENARIOS = ("analyze", "analyze-async", "detect_broken_links", "detect_seo_issues", "detect_orphan_pages")
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers (None when empty)."""
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def _usage():
+    if resource is None:
+        return None, None
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak_rss = own.ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+    return cpu, peak_rss
+
+
+def _timed_async_requests(latencies):
+    """Records the latency of every request the async engine sends."""
+    request = AsyncPageStore._request
+
+    async def timed_request(self, *args):
+        started = time.perf_counter()
+        page = await request(self, *args)
+        latencies.append(time.perf_counter() - started)
+        return page
+
+    AsyncPageStore._request = timed_request
+
+
+def run_scenario(name, site_url, spec, options):
+    """Runs one scenario in the current process and returns its metrics."""
+    latencies = []
+    analyzer = SitemapAnalyzer(f"{site_url}/sitemap.xml", engine="async" if name == "analyze-async" else "thread",
+                               **options)
+    # The synthetic site is full of deliberate 404s and 429s; only report real failures
+    analyzer.set_log_level(logging.ERROR)
+    # elapsed runs from sending the request until its headers are parsed
+    analyzer.session.hooks['response'].append(lambda response, *args, **kwargs:
+                                              latencies.append(response.elapsed.total_seconds()))
+    if name == "analyze-async":
+        _timed_async_requests(latencies)
+    urls = sitemap_urls(spec, site_url)
+
+    cpu_before, _ = _usage()
+    started = time.perf_counter()
+    correct = None
+    if name in ("analyze", "analyze-async"):
+        report = analyzer.analyze()
+        found = {kind: len(report.get(kind, ())) for kind in ("broken_links", "orphan_pages", "seo_issues")}
+        correct = "error" not in report and found == SyntheticSite(spec).expected
+        pages = len(urls)
+    elif name == "detect_broken_links":
+        analyzer.detect_broken_links(urls)
+        pages = len(urls)
+    elif name == "detect_seo_issues":
+        analyzer.detect_seo_issues(urls)
+        pages = len(urls)
+    else:
+        pages = analyzer.crawl_website().page_count
+    seconds = time.perf_counter() - started
+    cpu_after, peak_rss = _usage()
+
+    p50, p99 = percentile(latencies, 0.5), percentile(latencies, 0.99)
+    return {
+        "scenario": name,
+        "seconds": round(seconds, 3),
+        "pages": pages,
+        "pages_per_second": round(pages / seconds, 1),
+        "requests": len(latencies),
+        "requests_per_second": round(len(latencies) / seconds, 1),
+        "p50_ms": round(p50 * 1000, 2) if p50 is not None else None,
+        "p99_ms": round(p99 * 1000, 2) if p99 is not None else None,
+        "cpu_seconds": round(cpu_after - cpu_before, 3) if cpu_before is not None else None,
+        "peak_rss_mb": round(peak_rss / 2 ** 20, 1) if peak_rss is not None else None,
+        "correct": correct,
+    }
+
+
+def _scenario_process(name, spec, options, results):
+    with SyntheticSite(spec) as site:
+        results.put(run_scenario(name, site.url, spec, options))
+
+
+def run_benchmarks(spec, scenarios=SCENARIOS, options=None):
+    """Runs each scenario in its own process and returns their metrics."""
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for name in scenarios:
+        queue = context.Queue()
+        process = context.Process(target=_scenario_process, args=(name, spec, options or {}, queue))
+        process.start()
+        results.append(queue.get())
+        process.join()
+    return results
+
+
+def regressions(results, baseline, tolerance):
+    """Lists scenarios whose throughput dropped or whose peak RSS grew by more than ``tolerance``."""
+    previous = {result["scenario"]: result for result in baseline}
+    found = []
+    for result in results:
+        before = previous.get(result["scenario"])
+        if before is None:
+            continue
+        if result["pages_per_second"] < before["pages_per_second"] * (1 - tolerance):
+            found.append(f"{result['scenario']}: {before['pages_per_second']} -> {result['pages_per_second']} pages/s")
+        if (result["peak_rss_mb"] and before.get("peak_rss_mb")
+                and result["peak_rss_mb"] > before["peak_rss_mb"] * (1 + tolerance)):
+            found.append(f"{result['scenario']}: peak RSS {before['peak_rss_mb']} -> {result['peak_rss_mb']} MB")
+        if result["correct"] is False:
+            found.append(f"{result['scenario']}: findings differ from the synthetic site")
+    return found
+
+
+def print_table(results):
+    columns = ("scenario", "pages_per_second", "requests_per_second", "p50_ms", "p99_ms",
+               "cpu_seconds", "peak_rss_mb", "correct")
+    widths = [max(len(column), *(len(str(result[column])) for result in results)) for column in columns]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    for result in results:
+        print("  ".join(str(result[column]).ljust(width) for column, width in zip(columns, widths)))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark SitemapAnalyzer against a local synthetic site.")
+    parser.add_argument("--pages", type=int, default=2000, help="Linked pages on the site")
+    parser.add_argument("--fan-out", type=int, default=10, help="Links from each page one level deeper")
+    parser.add_argument("--depth", type=int, default=None, help="Maximum click depth of the site")
+    parser.add_argument("--orphans", type=int, default=20, help="Sitemap pages no page links to")
+    parser.add_argument("--broken", type=int, default=20, help="Sitemap URLs that return 404")
+    parser.add_argument("--slow-every", type=int, default=0, help="Delay every n-th page")
+    parser.add_argument("--slow-delay", type=float, default=0.05, help="Delay of slow pages in seconds")
+    parser.add_argument("--rate-limited-every", type=int, default=0, help="Answer every n-th page with one 429")
+    parser.add_argument("--sitemap-size", type=int, default=500, help="URLs per child sitemap (0: no index)")
+    parser.add_argument("--no-gzip", action="store_true", help="Serve child sitemaps uncompressed")
+    parser.add_argument("--page-bytes", type=int, default=4096, help="Filler markup per page")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated scenarios to run")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Results file of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown or growth")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    spec = SiteSpec(
+        pages=args.pages, fan_out=args.fan_out, depth=args.depth, orphans=args.orphans, broken=args.broken,
+        slow_every=args.slow_every, slow_delay=args.slow_delay, rate_limited_every=args.rate_limited_every,
+        sitemap_size=args.sitemap_size, gzip_sitemaps=not args.no_gzip, page_bytes=args.page_bytes,
+    )
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        sys.exit(f"Unknown scenarios: {', '.join(sorted(unknown))} (choose from {', '.join(SCENARIOS)})")
+
+    results = run_benchmarks(spec, scenarios)
+    print_table(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(results, json.load(f), args.tolerance)
+        for regression in found:
+            print(f"REGRESSION {regression}")
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+Local HTTP server that generates synthetic websites for offline benchmarks.
+
+Every page, sitemap and robots.txt is computed from the request path and a
+SiteSpec, so sites with hundreds of thousands of pages cost no memory to serve.
+"""
+
+import collections
+import gzip
+import http.server
+import multiprocessing
+import sys
+import threading
+import time
+
+SiteSpec = collections.namedtuple('SiteSpec', [
+    'pages',                     # linked pages, including the home page
+    'fan_out',                   # links from each page to pages one level deeper
+    'depth',                     # maximum click depth; the deepest level takes every remaining page
+    'orphans',                   # extra sitemap pages no page links to
+    'broken',                    # sitemap URLs that return 404
+    'missing_description_every', # every n-th page has no meta description (0: never)
+    'slow_every',                # every n-th page is delayed by slow_delay seconds (0: never)
+    'slow_delay',
+    'rate_limited_every',        # every n-th page answers its first request with 429 (0: never)
+    'sitemap_size',              # URLs per child sitemap of a sitemap index (0: one plain sitemap)
+    'gzip_sitemaps',             # serve child sitemaps gzip-compressed
+    'page_bytes',                # filler markup added to every page body
+])
+SiteSpec.__new__.__defaults__ = (1000, 10, None, 10, 10, 10, 0, 0.05, 0, 500, True, 4096)
+SiteSpec.__doc__ = """Shape of a synthetic site; every field has a default."""
+
+FILLER = '<div class="card"><h2>Item</h2><p>Lorem <b>ipsum</b> dolor <span>sit</span> amet.</p></div>\n'
+
+
+def level_sizes(spec):
+    """Returns the number of pages on each click-depth level, starting with the home page."""
+    sizes = [1]
+    remaining = spec.pages - 1
+    while remaining > 0:
+        if spec.depth is not None and len(sizes) > spec.depth:
+            sizes[-1] += remaining
+            break
+        size = min(sizes[-1] * spec.fan_out, remaining)
+        sizes.append(size)
+        remaining -= size
+    return sizes
+
+
+def expected_findings(spec):
+    """Returns the number of broken links, orphan pages and SEO issues analyze() should report."""
+    sizes = level_sizes(spec)
+    # Page j of a level is linked from page j // fan_out of the level above, if that exists
+    unlinked = sum(max(0, size - parent * spec.fan_out) for parent, size in zip(sizes, sizes[1:]))
+    missing = spec.pages // spec.missing_description_every if spec.missing_description_every else 0
+    return {
+        "broken_links": spec.broken,
+        "orphan_pages": unlinked + spec.orphans + spec.broken,
+        "seo_issues": missing + spec.broken,
+    }
+
+
+def sitemap_urls(spec, base_url):
+    """Returns every URL the sitemap of a synthetic site served at base_url lists."""
+    site = _Site(spec)
+    return [base_url + site.sitemap_path(index) for index in range(site.sitemap_length)]
+
+
+class _Site:
+    """Renders the documents of a SiteSpec; shared by every request handler thread."""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.sizes = level_sizes(spec)
+        self.starts = [sum(self.sizes[:level]) for level in range(len(self.sizes))]
+        self.filler = FILLER * max(0, spec.page_bytes // len(FILLER))
+        self.seen = collections.Counter()
+        self.lock = threading.Lock()
+
+    @property
+    def sitemap_length(self):
+        return self.spec.pages + self.spec.orphans + self.spec.broken
+
+    def sitemap_path(self, index):
+        """Returns the path of the index-th sitemap URL: linked pages, then orphans, then broken URLs."""
+        if index == 0:
+            return '/'
+        if index < self.spec.pages:
+            return f'/page/{index}'
+        index -= self.spec.pages
+        if index < self.spec.orphans:
+            return f'/orphan/{index}'
+        return f'/gone/{index - self.spec.orphans}'
+
+    def links(self, number):
+        level = max(index for index, start in enumerate(self.starts) if start <= number)
+        position = number - self.starts[level]
+        links = ['/']
+        if level + 1 < len(self.sizes):
+            for child in range(position * self.spec.fan_out, (position + 1) * self.spec.fan_out):
+                if child < self.sizes[level + 1]:
+                    links.append(f'/page/{self.starts[level + 1] + child}')
+        return links
+
+    def page(self, title, links, description=True):
+        description = '<meta name="description" content="Synthetic page">' if description else ''
+        anchors = ''.join(f'<a href="{link}">{link}</a>\n' for link in links)
+        return (f'<!DOCTYPE html><html><head><title>{title}</title>{description}</head>'
+                f'<body><nav>{anchors}</nav>{self.filler}</body></html>').encode()
+
+    def urlset(self, host, start, stop):
+        urls = ''.join(f'<url><loc>http://{host}{self.sitemap_path(index)}</loc></url>' for index in range(start, stop))
+        return (f'<?xml version="1.0" encoding="UTF-8"?>'
+                f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>').encode()
+
+    def respond(self, path, host):
+        """Returns a (status, headers, body) tuple for a request path."""
+        spec = self.spec
+        if path == '/robots.txt':
+            body = f'User-agent: *\nDisallow: /admin/\nSitemap: http://{host}/sitemap.xml\n'.encode()
+            return 200, {'Content-Type': 'text/plain'}, body
+        if path == '/sitemap.xml':
+            if not spec.sitemap_size:
+                return 200, {'Content-Type': 'application/xml'}, self.urlset(host, 0, self.sitemap_length)
+            extension = 'xml.gz' if spec.gzip_sitemaps else 'xml'
+            children = ''.join(
+                f'<sitemap><loc>http://{host}/sitemap-{index}.{extension}</loc></sitemap>'
+                for index in range((self.sitemap_length + spec.sitemap_size - 1) // spec.sitemap_size)
+            )
+            body = (f'<?xml version="1.0" encoding="UTF-8"?>'
+                    f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{children}</sitemapindex>')
+            return 200, {'Content-Type': 'application/xml'}, body.encode()
+        if path.startswith('/sitemap-'):
+            index = int(path[len('/sitemap-'):].split('.')[0])
+            start = index * spec.sitemap_size
+            body = self.urlset(host, start, min(start + spec.sitemap_size, self.sitemap_length))
+            if path.endswith('.gz'):
+                return 200, {'Content-Type': 'application/x-gzip'}, gzip.compress(body)
+            return 200, {'Content-Type': 'application/xml'}, body
+
+        if path == '/':
+            number = 0
+        elif path.startswith('/page/') and path[6:].isdigit() and int(path[6:]) < spec.pages:
+            number = int(path[6:])
+        elif path.startswith('/orphan/'):
+            return 200, {'Content-Type': 'text/html'}, self.page('Orphan', ['/'])
+        else:
+            return 404, {'Content-Type': 'text/html'}, b'<html><body>Not found</body></html>'
+
+        if spec.rate_limited_every and (number + 1) % spec.rate_limited_every == 0:
+            with self.lock:
+                self.seen[path] += 1
+                first = self.seen[path] == 1
+            if first:
+                return 429, {'Retry-After': '0.1'}, b''
+        if spec.slow_every and (number + 1) % spec.slow_every == 0:
+            time.sleep(spec.slow_delay)
+        every = spec.missing_description_every
+        body = self.page(f'Page {number}', self.links(number), not (every and (number + 1) % every == 0))
+        return 200, {'Content-Type': 'text/html; charset=utf-8'}, body
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self._respond(with_body=False)
+
+    def do_GET(self):
+        self._respond(with_body=True)
+
+    def _respond(self, with_body):
+        status, headers, body = self.server.site.respond(self.path.split('?')[0], self.headers['Host'])
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if with_body:
+            self.wfile.write(body)
+
+
+class _Server(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        # Clients hang up on bodies they do not need (error pages, non-HTML, past </head>)
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def _serve(spec, port_queue):
+    server = _Server(('127.0.0.1', 0), _Handler)
+    server.site = _Site(spec)
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+class SyntheticSite:
+    """Serves a synthetic site on a local port; use as a context manager.
+
+    Args:
+        spec: SiteSpec describing the site
+        in_process: Serve from a thread of this process instead of a separate
+            process (quicker to start, but the server then shares the GIL and the
+            CPU time of whatever is being measured)
+    """
+
+    def __init__(self, spec=None, in_process=False):
+        self.spec = spec or SiteSpec()
+        self.in_process = in_process
+        self.url = None
+        self._server = None
+        self._process = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @property
+    def expected(self):
+        """Findings a correct analysis of this site reports."""
+        return expected_findings(self.spec)
+
+    def start(self):
+        if self.in_process:
+            self._server = _Server(('127.0.0.1', 0), _Handler)
+            self._server.site = _Site(self.spec)
+            threading.Thread(target=self._server.serve_forever, daemon=True).start()
+            port = self._server.server_address[1]
+        else:
+            context = multiprocessing.get_context('spawn')
+            port_queue = context.Queue()
+            self._process = context.Process(target=_serve, args=(self.spec, port_queue), daemon=True)
+            self._process.start()
+            port = port_queue.get(timeout=30)
+        self.url = f'http://127.0.0.1:{port}'
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._process = None
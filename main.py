@@ -2,18 +2,25 @@ import os
 import logging
 import json
 from dotenv import load_dotenv
+from src.log_handlers import queued_handler
+from src.page_store import DEFAULT_MAX_BODY_BYTES
+from src.result_sink import open_sink
 from src.sitemap_analyzer import SitemapAnalyzer
 
 def setup_logging():
-    """Set up logging configuration."""
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.StreamHandler(),
-            logging.FileHandler('sitemap_analysis.log')
-        ]
-    )
+    """Set up logging configuration.
+
+    Console and file output happen on a background thread, so the analysis
+    threads never wait on them.
+    """
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handlers = [
+        logging.StreamHandler(),
+        logging.FileHandler('sitemap_analysis.log')
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    logging.basicConfig(level=logging.INFO, handlers=[queued_handler(*handlers)])
 
 load_dotenv()
 
@@ -31,9 +38,28 @@ if __name__ == "__main__":
     logger.info("2. Look for sitemap in robots.txt if not found")
     logger.info("3. Try common sitemap locations (/sitemap.xml, /sitemap_index.xml, etc.)")
     
-    analyzer = SitemapAnalyzer(url)
+    crawl_depth = os.getenv("CRAWL_DEPTH")
+    analyzer = SitemapAnalyzer(
+        url,
+        crawl_workers=int(os.getenv("MAX_WORKERS", "10")),
+        max_crawl_depth=int(crawl_depth) if crawl_depth else None,
+        checkpoint_path=os.getenv("CHECKPOINT_PATH"),
+        parse_workers=int(os.getenv("PARSE_WORKERS", "0")),
+        # RECORD_PATH archives every HTTP exchange; REPLAY_PATH re-runs an archive offline
+        record_path=os.getenv("RECORD_PATH"),
+        replay_path=os.getenv("REPLAY_PATH"),
+        replay_timing=bool(os.getenv("REPLAY_TIMING")),
+        max_body_bytes=int(os.getenv("MAX_BODY_BYTES", str(DEFAULT_MAX_BODY_BYTES))) or None,
+    )
+    # RESULTS_PATH (.jsonl or .db) streams findings to disk as they are found
+    results_path = os.getenv("RESULTS_PATH")
+    sink = open_sink(results_path) if results_path else None
     try:
-        results = analyzer.analyze()
+        # RESUME=1 continues the run recorded in CHECKPOINT_PATH instead of starting over
+        if os.getenv("RESUME") and analyzer.checkpoint is not None:
+            results = analyzer.resume(sink=sink)
+        else:
+            results = analyzer.analyze(sink=sink)
         
         # Pretty print the results
         print("\n" + "="*60)
@@ -44,18 +70,34 @@ if __name__ == "__main__":
             print(f"ERROR: {results['error']}")
             logger.error(f"Analysis failed: {results['error']}")
         else:
-            print(f"Broken Links: {len(results['broken_links'])}")
-            print(f"Orphan Pages: {len(results['orphan_pages'])}")
-            print(f"SEO Issues: {len(results['seo_issues'])}")
+            def count(kind):
+                return results[kind] if sink is not None else len(results[kind])
+
+            print(f"Broken Links: {count('broken_links')}")
+            print(f"Orphan Pages: {count('orphan_pages')}")
+            print(f"SEO Issues: {count('seo_issues')}")
+            print(f"Weakly Linked Pages: {count('weakly_linked_pages')}")
             
-            # Save detailed results to file
-            with open('analysis_results.json', 'w') as f:
-                json.dump(results, f, indent=2)
+            # METRICS_PATH receives the run's metrics in Prometheus text format
+            metrics_path = os.getenv("METRICS_PATH")
+            if metrics_path:
+                with open(metrics_path, 'w') as f:
+                    f.write(analyzer.metrics.to_prometheus())
+                print(f"Metrics saved to '{metrics_path}'")
+
+            if sink is None:
+                # Save detailed results to file
+                with open('analysis_results.json', 'w') as f:
+                    json.dump(results, f, indent=2)
+                results_path = 'analysis_results.json'
             
             logger.info("Analysis completed successfully")
-            print("\nDetailed results saved to 'analysis_results.json'")
+            print(f"\nDetailed results saved to '{results_path}'")
             
     except Exception as e:
         logger.error(f"An error occurred during analysis: {e}")
         print(f"An error occurred: {e}")
-        raise
\ No newline at end of file
+        raise
+    finally:
+        if sink is not None:
+            sink.close()
\ No newline at end of file
@@ -0,0 +1,312 @@
+import asyncio
+import collections
+import time
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp is only needed for engine="async"
+    aiohttp = None
+
+from .host_scheduler import host_of
+from .link_graph import LinkGraph
+from .log_handlers import Progress
+from .page_store import BODY_CHUNK_SIZE, DEFAULT_MAX_BODY_BYTES, BodyReader, Page, is_html
+from .result_sink import ListSink
+from .url_normalizer import normalize_url, url_key
+
+
+class AsyncPageStore:
+    """Asyncio counterpart of PageStore: each URL is fetched once per run.
+
+    Coroutines asking for a URL that is already being downloaded await the same task.
+    Requests go through the analyzer's HostScheduler like those of the thread engine,
+    and bodies are read with the same content-type gate and ``max_body_bytes`` cap.
+    As in PageStore, pages keep only their facts once fetched and, with ``max_bytes``
+    set, the oldest ones are forgotten when the store outgrows the budget.
+    """
+
+    def __init__(self, session, semaphore, scheduler, timeout=5, cache=None, parse_pool=None, metrics=None,
+                 max_body_bytes=DEFAULT_MAX_BODY_BYTES, max_bytes=None):
+        self.session = session
+        self.semaphore = semaphore
+        self.scheduler = scheduler
+        self.timeout = timeout
+        self.cache = cache
+        self.parse_pool = parse_pool
+        self.metrics = metrics
+        self.max_body_bytes = max_body_bytes
+        self.max_bytes = max_bytes
+        self._tasks = {}
+        self._stored = collections.OrderedDict()
+        self._stored_bytes = 0
+
+    async def get(self, url):
+        """Returns the Page for a URL, fetching it if no coroutine has done so yet."""
+        task = self._tasks.get(url)
+        if self.metrics is not None:
+            self.metrics.cache_lookup("page_store", task is not None)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(url))
+            self._tasks[url] = task
+        return await task
+
+    async def _fetch(self, url):
+        entry = self.cache.lookup(url) if self.cache else None
+        headers = self.cache.conditional_headers(entry) if self.cache else None
+        host = host_of(url)
+        attempt = 0
+        while True:
+            await self.scheduler.acquire_async(host)
+            started = time.monotonic()
+            page, received = await self._request(url, headers, entry)
+            if page.error is not None and not self._is_transient(page.error):
+                # Errors retrying cannot fix (DNS failures, invalid URLs) say nothing about the host load
+                self.scheduler.cancel(host)
+                return page
+            status_code = None if page.error is not None else page.status_code
+            self.scheduler.release(host, status_code, time.monotonic() - started, page.headers.get('Retry-After'),
+                                   received)
+            if not self.scheduler.should_retry(status_code, attempt):
+                break
+            attempt += 1
+
+        if self.parse_pool is not None:
+            # Parsing in worker processes keeps the event loop free for network I/O
+            await self.parse_pool.parse_async(page)
+        if self.cache and self.metrics is not None and page.error is None:
+            self.metrics.cache_lookup("http", page.from_cache)
+        if page.from_cache:
+            self.cache.hit(url)
+        elif self.cache and page.status_code == 200 and not page.truncated:
+            self.cache.store(url, page.headers, page.status_code, page.facts, page.redirects)
+        # Checks only read facts, so no body outlives its fetch
+        page.compact()
+        if self.max_bytes is not None:
+            self._remember(url, page)
+        return page
+
+    def _remember(self, url, page):
+        """Accounts for a stored page, forgetting the oldest ones while over budget."""
+        size = page.estimated_size()
+        self._stored[url] = size
+        self._stored_bytes += size
+        while self._stored_bytes > self.max_bytes and len(self._stored) > 1:
+            evicted_url, size = self._stored.popitem(last=False)
+            self._stored_bytes -= size
+            self._tasks.pop(evicted_url, None)
+
+    def _is_transient(self, error):
+        if isinstance(error, getattr(aiohttp, 'ClientConnectorDNSError', ())):
+            return False
+        return isinstance(error, (aiohttp.ClientConnectionError, asyncio.TimeoutError))
+
+    async def _request(self, url, headers, entry):
+        """Sends one request; returns the Page and the number of body bytes read."""
+        async with self.semaphore:
+            try:
+                timeout = aiohttp.ClientTimeout(total=self.timeout)
+                async with self.session.get(url, timeout=timeout, headers=headers) as response:
+                    if entry is not None and response.status == 304:
+                        return Page(url, entry.status_code, response.headers, redirects=entry.redirects,
+                                    facts=entry.facts, from_cache=True), 0
+                    reader = BodyReader(self.max_body_bytes)
+                    # Error pages and non-HTML bodies are never parsed, so they are not downloaded
+                    if response.status < 400 and is_html(response.headers.get('content-type')):
+                        async for chunk in response.content.iter_chunked(BODY_CHUNK_SIZE):
+                            if not reader.feed(chunk):
+                                break
+                    redirects = [{"url": str(hop.url), "status_code": hop.status} for hop in response.history]
+                    page = Page(url, response.status, response.headers, reader.content, redirects=redirects,
+                                metrics=self.metrics, truncated=reader.truncated)
+                    return page, reader.received
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                return Page(url, error=e), 0
+
+
+class AsyncEngine:
+    """Runs the broken link, orphan page and SEO checks of an analyzer on one event loop.
+
+    Args:
+        analyzer: The SitemapAnalyzer whose configuration and result helpers are used
+        max_concurrency: Maximum number of requests in flight across all hosts
+        max_connections_per_host: Maximum number of open connections to a single host
+    """
+
+    def __init__(self, analyzer, max_concurrency=100, max_connections_per_host=10):
+        if aiohttp is None:
+            raise ImportError("The async engine requires aiohttp (pip install aiohttp)")
+        self.analyzer = analyzer
+        self.logger = analyzer.logger
+        self.max_concurrency = max_concurrency
+        self.max_connections_per_host = max_connections_per_host
+        self.store = None
+
+    def run(self, urls, check_urls=None, sink=None):
+        """Runs all checks and returns the broken link, orphan page and SEO report keys of analyze().
+
+        Args:
+            urls: Every sitemap URL, used for orphan detection
+            check_urls: URLs to check for broken links and SEO issues (defaults to urls)
+            sink: ResultSink to stream findings to; the report then holds their numbers
+        """
+        return asyncio.run(self._run(urls, urls if check_urls is None else check_urls, sink))
+
+    async def _run(self, urls, check_urls, sink):
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrency,
+            limit_per_host=self.max_connections_per_host,
+        )
+        headers = dict(self.analyzer.session.headers)
+        async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self.store = AsyncPageStore(session, semaphore, self.analyzer.scheduler, cache=self.analyzer.http_cache,
+                                        parse_pool=self.analyzer.parse_pool, metrics=self.analyzer.metrics,
+                                        max_body_bytes=self.analyzer.max_body_bytes,
+                                        max_bytes=self.analyzer._memory_share())
+            broken_links, orphan_pages, seo_issues = await asyncio.gather(
+                self.detect_broken_links(check_urls, sink),
+                self.detect_orphan_pages(urls, sink),
+                self.detect_seo_issues(check_urls, sink),
+            )
+        return {
+            "broken_links": broken_links,
+            "orphan_pages": orphan_pages,
+            "seo_issues": seo_issues
+        }
+
+    async def _allowed(self, url):
+        """Whether robots.txt allows a URL, fetching an unknown host's robots.txt off the event loop."""
+        robots = self.analyzer.robots
+        if robots is None:
+            return True
+        rules = robots.cached(url)
+        if rules is None:
+            rules = await asyncio.get_running_loop().run_in_executor(None, robots.rules_for, url)
+        return rules.allowed(url)
+
+    async def _check_link(self, url):
+        found, finding = self.analyzer._recorded_finding("broken_links", url)
+        if not found:
+            finding = await self._link_finding(url)
+            self.analyzer._record_finding("broken_links", url, finding)
+        return finding
+
+    async def _link_finding(self, url):
+        if not await self._allowed(url):
+            return None
+        return self.analyzer._link_result(url, await self.store.get(url))
+
+    async def _check_seo(self, url):
+        found, finding = self.analyzer._recorded_finding("seo_issues", url)
+        if not found:
+            finding = await self._seo_finding(url)
+            self.analyzer._record_finding("seo_issues", url, finding)
+        return finding
+
+    async def _seo_finding(self, url):
+        if not await self._allowed(url):
+            return self.analyzer._disallowed_result(url)
+        return self.analyzer._seo_result(url, await self.store.get(url))
+
+    async def detect_broken_links(self, urls, sink=None):
+        """Identifies and reports broken links (their number when streaming to ``sink``)."""
+        self.logger.info("Starting broken links detection for %d URLs", len(urls))
+        findings = sink if sink is not None else ListSink()
+        found = 0
+        with self.analyzer.metrics.phase("broken_links"):
+            progress = Progress(self.logger, "Checked {done}/{total} links for broken status")
+            for i, check in enumerate(asyncio.as_completed([self._check_link(url) for url in urls])):
+                progress.update(i + 1, len(urls))
+                result = await check
+                if result:
+                    found += 1
+                    findings.write("broken_links", result)
+        self.logger.info("Broken links detection completed. Found %d broken links", found)
+        return found if sink is not None else findings.results["broken_links"]
+
+    async def detect_seo_issues(self, urls, sink=None):
+        """Identifies and reports potential SEO issues (their number when streaming to ``sink``)."""
+        self.logger.info("Starting SEO issues detection for %d URLs", len(urls))
+        findings = sink if sink is not None else ListSink()
+        found = 0
+        with self.analyzer.metrics.phase("seo"):
+            progress = Progress(self.logger, "Checked {done}/{total} pages for SEO issues")
+            for i, check in enumerate(asyncio.as_completed([self._check_seo(url) for url in urls])):
+                progress.update(i + 1, len(urls))
+                result = await check
+                if result:
+                    found += 1
+                    findings.write("seo_issues", result)
+        self.logger.info("SEO issues detection completed. Found %d SEO issues", found)
+        return found if sink is not None else findings.results["seo_issues"]
+
+    async def detect_orphan_pages(self, urls, sink=None):
+        """Identifies and reports orphan pages (their number when streaming to ``sink``)."""
+        self.logger.info("Starting orphan pages detection for %d URLs", len(urls))
+        self.logger.info("Crawling website to discover internal links")
+        link_graph = await self.crawl_website()
+        return self.analyzer._orphan_result(urls, link_graph, sink)
+
+    async def crawl_website(self):
+        """Crawls the website breadth-first from the base URL and returns its LinkGraph."""
+        analyzer = self.analyzer
+        self.logger.info("Starting website crawl from %s", analyzer.base_url)
+        start_url = normalize_url(analyzer.base_url)
+        link_graph = analyzer.link_graph = LinkGraph(start_url)
+        analyzer.visited = analyzer._new_visited_set()
+        analyzer.visited.add(url_key(start_url))
+        if not await self._allowed(start_url):
+            self.logger.warning("robots.txt disallows crawling %s", analyzer.base_url)
+            return link_graph
+        frontier = analyzer._new_frontier()
+        for link, depth in analyzer._restore_crawl(link_graph):
+            if await self._allowed(link):
+                frontier.append((link, depth))
+        pages_crawled = link_graph.page_count
+        if not pages_crawled:
+            frontier.append((start_url, 0))
+        in_flight = {}
+        progress = Progress(self.logger, "Crawled {done} pages so far")
+
+        async def crawl_page(url):
+            self.logger.debug("Crawling page: %s", url)
+            return analyzer._page_links(url, await self.store.get(url))
+
+        with analyzer.metrics.phase("crawl"), frontier:
+            while frontier or in_flight:
+                # Only max_concurrency tasks exist at a time; the rest of the frontier may be on disk
+                while frontier and len(in_flight) < self.max_concurrency:
+                    if analyzer.max_crawl_pages is not None and pages_crawled >= analyzer.max_crawl_pages:
+                        self.logger.info("Reached crawl limit of %d pages", analyzer.max_crawl_pages)
+                        frontier.clear()
+                        break
+                    url, depth = frontier.popleft()
+                    in_flight[asyncio.ensure_future(crawl_page(url))] = (url, depth)
+                    pages_crawled += 1
+                    progress.update(pages_crawled)
+                analyzer.metrics.observe_queue("crawl_frontier", len(frontier))
+                analyzer.metrics.observe_queue("crawl_in_flight", len(in_flight))
+
+                if not in_flight:
+                    break
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    url, depth = in_flight.pop(task)
+                    links = task.result()
+                    link_graph.add_page(url, links)
+                    if analyzer.checkpoint is not None:
+                        analyzer.checkpoint.record_page(url, depth, links)
+                    for link in links:
+                        key = url_key(link)
+                        if key in analyzer.visited:
+                            continue
+                        if analyzer.max_crawl_depth is not None and depth + 1 > analyzer.max_crawl_depth:
+                            continue
+                        if not await self._allowed(link):
+                            continue
+                        analyzer.visited.add(key)
+                        frontier.append((link, depth + 1))
+
+        self.logger.info("Website crawl completed. Crawled %d pages with %d internal links",
+                         link_graph.page_count, link_graph.link_count)
+        return link_graph
@@ -0,0 +1,132 @@
+import concurrent.futures
+import logging
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import urlparse
+
+from .result_sink import RESULT_KINDS, JsonlSink
+from .sitemap_analyzer import SitemapAnalyzer
+
+logger = logging.getLogger(__name__)
+
+
+def read_sites(lines):
+    """Returns the site URLs listed in an iterable of lines, skipping blanks and # comments."""
+    sites = []
+    for line in lines:
+        line = line.split('#', 1)[0].strip()
+        if line:
+            sites.append(line)
+    return sites
+
+
+def _results_path(results_dir, index, site):
+    """Returns a per-site JSONL file name that stays unique when a host appears twice."""
+    host = urlparse(site if '://' in site else f"http://{site}").netloc or site
+    return os.path.join(results_dir, f"{index:04d}-{re.sub(r'[^A-Za-z0-9.-]+', '_', host)}.jsonl")
+
+
+def analyze_site(site, results_path, options, log_level=logging.WARNING, shared_slots=None):
+    """Analyzes one site in a worker process, streaming its findings to ``results_path``.
+
+    Any failure is returned in the summary instead of raised, so one broken site
+    cannot stop the batch. Every request of the site takes one of ``shared_slots``,
+    if given, for as long as it is in flight.
+
+    Returns:
+        A summary dict with the site, its per-kind counts (or an error), the results
+        file and the run time in seconds
+    """
+    start_time = time.time()
+    summary = {"site": site, "results_path": results_path}
+    try:
+        analyzer = SitemapAnalyzer(site, **options)
+        analyzer.scheduler.shared_slots = shared_slots
+        analyzer.set_log_level(log_level)
+        with JsonlSink(results_path) as sink:
+            report = analyzer.analyze(sink=sink)
+        if "error" in report:
+            summary["error"] = report["error"]
+        else:
+            summary["counts"] = report
+    except Exception as e:
+        summary["error"] = f"{type(e).__name__}: {e}"
+    summary["seconds"] = round(time.time() - start_time, 2)
+    return summary
+
+
+def summarize(site_summaries, seconds):
+    """Aggregates per-site summaries into totals for the whole batch."""
+    totals = {kind: 0 for kind in RESULT_KINDS}
+    failed = 0
+    for summary in site_summaries:
+        if "error" in summary:
+            failed += 1
+            continue
+        for kind in RESULT_KINDS:
+            totals[kind] += summary["counts"].get(kind, 0)
+    return {
+        "sites": len(site_summaries),
+        "succeeded": len(site_summaries) - failed,
+        "failed": failed,
+        "seconds": round(seconds, 2),
+        "totals": totals,
+        "results": site_summaries,
+    }
+
+
+def run_batch(sites, results_dir, processes=None, max_concurrency=64, log_level=logging.WARNING, **options):
+    """Analyzes many sites on a process pool and returns an aggregated summary.
+
+    Each site runs in a fresh worker process, so page parsing scales with the
+    number of cores and a crash, an error or leftover process state stays isolated
+    to its site. Findings go to one JSONL file per site in ``results_dir``; only
+    small summaries travel back to the parent.
+
+    ``max_concurrency`` is one budget shared by every worker: each request, to any
+    host and including robots.txt and sitemap fetches, holds a slot of a semaphore
+    served by a manager process while it is in flight, so sites still running at
+    the tail of a batch can use the slots finished ones gave back. A worker keeps
+    one slot while it streams its sitemap, so at most ``max_concurrency - 1``
+    workers run at once.
+
+    Args:
+        sites: Site URLs (or sitemap / robots.txt URLs) to analyze
+        results_dir: Directory for the per-site JSONL result files
+        processes: Number of worker processes (defaults to the number of CPUs)
+        max_concurrency: Requests in flight across all workers (at least 2)
+        log_level: Log level of the analyzers in the workers
+        **options: Further SitemapAnalyzer keyword arguments applied to every site
+    """
+    if max_concurrency < 2:
+        raise ValueError("max_concurrency must be at least 2")
+    processes = processes or os.cpu_count() or 1
+    processes = max(1, min(processes, len(sites), max_concurrency - 1))
+    os.makedirs(results_dir, exist_ok=True)
+
+    logger.info(f"Analyzing {len(sites)} sites on {processes} processes ({max_concurrency} requests in flight in total)")
+    start_time = time.time()
+    summaries = [None] * len(sites)
+    context = multiprocessing.get_context('spawn')
+    with context.Manager() as manager, concurrent.futures.ProcessPoolExecutor(
+            max_workers=processes, mp_context=context, max_tasks_per_child=1) as executor:
+        slots = manager.BoundedSemaphore(max_concurrency)
+        futures = {
+            executor.submit(analyze_site, site, _results_path(results_dir, index, site), options, log_level,
+                            slots): index
+            for index, site in enumerate(sites)
+        }
+        for done, future in enumerate(concurrent.futures.as_completed(futures), 1):
+            index = futures[future]
+            try:
+                summaries[index] = future.result()
+            except BrokenProcessPool as e:
+                # A worker died (e.g. out of memory); the sites it was handed are lost
+                summaries[index] = {"site": sites[index], "error": f"Worker process failed: {e}"}
+            status = summaries[index].get("error", "ok")
+            logger.info(f"[{done}/{len(sites)}] {sites[index]}: {status}")
+
+    return summarize(summaries, time.time() - start_time)
@@ -0,0 +1,182 @@
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+
+class Checkpoint:
+    """On-disk progress of one analysis run, so an interrupted run can be resumed.
+
+    Records the sitemap URLs read so far, the finding (or None) of every finished
+    broken link and SEO check, and each crawled page with its depth and internal
+    links. The crawl frontier and visited set are not stored: they are re-derived
+    from the crawled pages on resume. Writes are buffered and flushed to SQLite at
+    most every ``interval`` seconds, so checkpointing adds no per-URL disk round trip.
+
+    Args:
+        path: SQLite database file holding the checkpoint
+        interval: Seconds between flushes of buffered progress
+    """
+
+    def __init__(self, path, interval=30):
+        self.path = path
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS urls (position INTEGER PRIMARY KEY, url TEXT UNIQUE, lastmod TEXT)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS findings (kind TEXT, url TEXT, finding TEXT, PRIMARY KEY (kind, url))"
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, depth INTEGER, links TEXT)")
+        self._db.commit()
+        self._meta = {}
+        self._findings = {}
+        self._pending_urls = []
+        self._pending_findings = []
+        self._pending_pages = []
+        self._last_flush = time.monotonic()
+
+    @property
+    def started_at(self):
+        """Start time of the checkpointed run (None before start() or load())."""
+        value = self._meta.get('started_at')
+        return datetime.fromisoformat(value) if value else None
+
+    @property
+    def sitemap_complete(self):
+        """True once every sitemap URL of the run has been recorded."""
+        return self._meta.get('sitemap_complete') == '1'
+
+    @property
+    def sitemap_url(self):
+        """Sitemap URL discovery chose for the checkpointed run (None if not recorded)."""
+        return self._meta.get('sitemap_url')
+
+    def start(self, input_url, started_at):
+        """Discards any previous progress and starts checkpointing a new run."""
+        with self._lock:
+            self._pending_urls, self._pending_findings, self._pending_pages = [], [], []
+            self._findings = {}
+            for table in ("meta", "urls", "findings", "pages"):
+                self._db.execute(f"DELETE FROM {table}")
+            self._meta = {'input_url': input_url, 'started_at': started_at.isoformat(), 'sitemap_complete': '0'}
+            self._db.executemany("INSERT INTO meta VALUES (?, ?)", self._meta.items())
+            self._db.commit()
+            self._last_flush = time.monotonic()
+
+    def load(self, input_url):
+        """Loads the progress of a previous run of ``input_url``.
+
+        Returns:
+            True if the checkpoint holds a run of the same input URL, False otherwise
+        """
+        with self._lock:
+            meta = dict(self._db.execute("SELECT key, value FROM meta").fetchall())
+            if meta.get('input_url') != input_url:
+                return False
+            self._meta = meta
+            self._findings = {}
+            for kind, url, finding in self._db.execute("SELECT kind, url, finding FROM findings"):
+                self._findings.setdefault(kind, {})[url] = json.loads(finding)
+        return True
+
+    def record_sitemap_url(self, url):
+        """Records the sitemap URL discovery chose, so a resumed run need not discover it again."""
+        with self._lock:
+            self._meta['sitemap_url'] = url
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('sitemap_url', ?)", (url,))
+            self._db.commit()
+
+    def mark_sitemap_complete(self):
+        """Records that the whole sitemap has been read."""
+        with self._lock:
+            self._flush()
+            self._meta['sitemap_complete'] = '1'
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('sitemap_complete', '1')")
+            self._db.commit()
+
+    def record_url(self, url, lastmod):
+        """Records a sitemap URL, unless the recorded sitemap is already complete."""
+        if self.sitemap_complete:
+            return
+        with self._lock:
+            self._pending_urls.append((url, lastmod))
+            self._maybe_flush()
+
+    def iter_urls(self):
+        """Yields the recorded sitemap URLs as (url, lastmod) tuples, in sitemap order."""
+        self.flush()
+        last_position = 0
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT position, url, lastmod FROM urls WHERE position > ? ORDER BY position LIMIT 1000",
+                    (last_position,),
+                ).fetchall()
+            if not rows:
+                return
+            for last_position, url, lastmod in rows:
+                yield url, lastmod
+
+    def finding(self, kind, url):
+        """Returns a (found, finding) tuple for a check of ``kind`` ("broken_links" or "seo_issues")."""
+        findings = self._findings.get(kind)
+        if findings is None or url not in findings:
+            return False, None
+        return True, findings[url]
+
+    def record_finding(self, kind, url, finding):
+        """Records the result of a finished check; ``finding`` is None when the URL passed."""
+        with self._lock:
+            self._findings.setdefault(kind, {})[url] = finding
+            self._pending_findings.append((kind, url, json.dumps(finding)))
+            self._maybe_flush()
+
+    def record_page(self, url, depth, links):
+        """Records a crawled page with its depth and the internal links found on it."""
+        with self._lock:
+            self._pending_pages.append((url, depth, json.dumps(links)))
+            self._maybe_flush()
+
+    def iter_pages(self):
+        """Yields the recorded crawled pages as (url, depth, links) tuples, in crawl order."""
+        self.flush()
+        last_row = 0
+        while True:
+            # Read in batches so the lock is never held while the caller works
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT rowid, url, depth, links FROM pages WHERE rowid > ? ORDER BY rowid LIMIT 1000",
+                    (last_row,),
+                ).fetchall()
+            if not rows:
+                return
+            for last_row, url, depth, links in rows:
+                yield url, depth, json.loads(links)
+
+    def flush(self):
+        """Writes buffered progress to disk."""
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        """Flushes buffered progress and closes the underlying database."""
+        with self._lock:
+            self._flush()
+            self._db.close()
+
+    def _maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.interval:
+            self._flush()
+
+    def _flush(self):
+        self._db.executemany("INSERT OR IGNORE INTO urls (url, lastmod) VALUES (?, ?)", self._pending_urls)
+        self._db.executemany("INSERT OR REPLACE INTO findings VALUES (?, ?, ?)", self._pending_findings)
+        self._db.executemany("INSERT OR REPLACE INTO pages VALUES (?, ?, ?)", self._pending_pages)
+        self._db.commit()
+        self._pending_urls, self._pending_findings, self._pending_pages = [], [], []
+        self._last_flush = time.monotonic()
@@ -0,0 +1,159 @@
+import collections
+import hashlib
+import json
+import math
+import tempfile
+
+# Rough in-memory cost of one exactly tracked URL (string, hash slot, overhead)
+EXACT_BYTES_PER_URL = 128
+
+# Rough in-memory cost of one buffered frontier entry
+FRONTIER_BYTES_PER_ENTRY = 256
+
+
+class SpillingQueue:
+    """FIFO queue that keeps at most ``max_items`` entries in memory and spills the rest to disk.
+
+    Entries are tuples of JSON-serializable values. Once anything has spilled, new
+    entries go to the spill file until it is drained, so order is kept.
+
+    Args:
+        max_items: Entries held in memory before spilling (None never spills)
+        directory: Directory for the temporary spill file (system default if None)
+    """
+
+    def __init__(self, max_items=10000, directory=None):
+        self.max_items = max_items
+        self.directory = directory
+        self._memory = collections.deque()
+        self._file = None
+        self._read_position = 0
+        self._spilled = 0
+
+    def __len__(self):
+        return len(self._memory) + self._spilled
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def append(self, item):
+        """Adds an entry at the end of the queue."""
+        if not self._spilled and (self.max_items is None or len(self._memory) < self.max_items):
+            self._memory.append(item)
+            return
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(dir=self.directory)
+        self._file.seek(0, 2)
+        self._file.write(json.dumps(item).encode('utf-8') + b'\n')
+        self._spilled += 1
+
+    def popleft(self):
+        """Removes and returns the oldest entry."""
+        if not self._memory and self._spilled:
+            self._refill()
+        return self._memory.popleft()
+
+    def clear(self):
+        """Drops every entry, in memory and on disk."""
+        self._memory.clear()
+        if self._file is not None:
+            self._file.seek(0)
+            self._file.truncate()
+        self._read_position = 0
+        self._spilled = 0
+
+    def close(self):
+        """Deletes the spill file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _refill(self):
+        self._file.seek(self._read_position)
+        while self._spilled and len(self._memory) < self.max_items:
+            self._memory.append(tuple(json.loads(self._file.readline())))
+            self._spilled -= 1
+        self._read_position = self._file.tell()
+        if not self._spilled:
+            self._file.seek(0)
+            self._file.truncate()
+            self._read_position = 0
+
+
+class BloomFilter:
+    """Fixed-size probabilistic set of strings: no false negatives, rare false positives.
+
+    Args:
+        max_bytes: Size of the bit array
+        error_rate: Target false positive rate at ``capacity`` items
+    """
+
+    def __init__(self, max_bytes, error_rate=0.001):
+        self._size = max(8, max_bytes * 8)
+        self._bits = bytearray(self._size // 8)
+        self._hashes = max(1, round(-math.log2(error_rate)))
+        self.capacity = int(self._size * math.log(2) ** 2 / -math.log(error_rate))
+        self.count = 0
+
+    def add(self, item):
+        """Adds a string to the filter."""
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def _positions(self, item):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self._size for i in range(self._hashes)]
+
+
+class VisitedSet:
+    """Set of seen URLs that stays within a memory budget.
+
+    URLs are tracked exactly in a Python set while that fits the budget, which
+    covers small sites. Past that they move into a BloomFilter of the same size, so
+    a tiny share of new URLs may be mistaken for seen ones.
+
+    Args:
+        max_bytes: Memory budget for the set (None always tracks URLs exactly)
+        error_rate: False positive rate of the Bloom filter at its capacity
+    """
+
+    def __init__(self, max_bytes=None, error_rate=0.001):
+        self.max_bytes = max_bytes
+        self.error_rate = error_rate
+        self.exact_limit = max(1, max_bytes // EXACT_BYTES_PER_URL) if max_bytes is not None else None
+        self._exact = set()
+        self._bloom = None
+
+    @property
+    def exact(self):
+        """True while URLs are still tracked in an exact set."""
+        return self._bloom is None
+
+    def __len__(self):
+        return len(self._exact) if self._bloom is None else self._bloom.count
+
+    def __contains__(self, url):
+        return url in self._exact if self._bloom is None else url in self._bloom
+
+    def add(self, url):
+        """Marks a URL as seen, switching to the Bloom filter once the exact set outgrows the budget."""
+        if self._bloom is not None:
+            if url not in self._bloom:
+                self._bloom.add(url)
+            return
+        self._exact.add(url)
+        if self.exact_limit is not None and len(self._exact) > self.exact_limit:
+            self._bloom = BloomFilter(self.max_bytes, self.error_rate)
+            for seen in self._exact:
+                self._bloom.add(seen)
+            self._exact = set()
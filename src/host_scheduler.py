@@ -0,0 +1,303 @@
+import requests
+from requests.adapters import HTTPAdapter
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+try:
+    from urllib3.exceptions import NameResolutionError
+except ImportError:  # urllib3 < 2 reports DNS failures as NewConnectionError
+    NameResolutionError = None
+
+# Statuses worth retrying: the server is overloaded or a gateway hiccupped
+RETRY_STATUSES = (429, 502, 503, 504)
+
+# Transport failures worth retrying: the connection broke before the whole response arrived
+TRANSIENT_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                    requests.exceptions.ChunkedEncodingError)
+
+# Seconds of latency above twice the fastest response still counted as healthy
+LATENCY_TOLERANCE = 0.05
+
+# Seconds an async waiter sleeps before checking again for a free per-host slot
+ASYNC_POLL_INTERVAL = 0.01
+
+
+def host_of(url):
+    """Returns the host (netloc) requests to a URL are scheduled under."""
+    return urlparse(url).netloc.lower()
+
+
+def is_name_resolution_error(error):
+    """Whether a requests ConnectionError was caused by a failed DNS lookup."""
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return NameResolutionError is not None and isinstance(reason, NameResolutionError)
+
+
+def bytes_received(response):
+    """Returns the body bytes read from the connection so far (as sent, before decoding)."""
+    tell = getattr(response.raw, 'tell', None)
+    return tell() if tell is not None else 0
+
+
+def parse_retry_after(value):
+    """Returns the seconds a Retry-After header (delta-seconds or HTTP date) asks to wait, or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class _HostState:
+    """Rate, concurrency and back-off bookkeeping for one host."""
+
+    def __init__(self, rate, limit):
+        self.rate = rate
+        self.tokens = 1.0
+        self.refilled_at = time.monotonic()
+        self.limit = limit
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.failures = 0
+        self.min_latency = None
+
+
+class HostScheduler:
+    """Per-host politeness scheduler every request of an analysis run goes through.
+
+    Each host gets a token bucket (one request per ``Crawl-delay`` from robots.txt,
+    or ``rate_limit`` requests per second) and an adaptive concurrency limit. The
+    limit grows additively while response latency stays within twice the fastest
+    response seen from the host, and is halved on 429/503 responses, gateway errors,
+    timeouts and connection failures. Those failures also put the host in a cool-down
+    taken from ``Retry-After`` or an exponential back-off (doubling per consecutive
+    failure, at most ``max_retries`` times), after which the request is retried up
+    to ``max_retries`` times. With ``shared_slots`` set, every request also holds
+    one slot of that semaphore, which caps requests in flight across every
+    scheduler (and process) sharing it.
+
+    Args:
+        max_connections_per_host: Upper bound of the adaptive per-host concurrency
+        initial_concurrency: Concurrency a host starts with
+        rate_limit: Default requests per second per host (None for unlimited)
+        max_retries: Retries for transient failures before giving up
+        backoff_factor: Base delay in seconds of the exponential back-off
+        max_backoff: Cap in seconds on back-off and Retry-After delays
+        logger: Logger back-pressure events are reported to
+        metrics: Metrics every finished request is recorded in
+        shared_slots: Semaphore shared with other schedulers, e.g. a
+            multiprocessing.Manager().BoundedSemaphore (None for no global cap)
+    """
+
+    def __init__(self, max_connections_per_host=10, initial_concurrency=4, rate_limit=None,
+                 max_retries=3, backoff_factor=0.5, max_backoff=60, logger=None, metrics=None,
+                 shared_slots=None):
+        self.max_connections_per_host = max_connections_per_host
+        self.initial_concurrency = min(initial_concurrency, max_connections_per_host)
+        self.rate_limit = rate_limit
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.logger = logger or logging.getLogger(__name__)
+        self.metrics = metrics
+        self.shared_slots = shared_slots
+        self._hosts = {}
+        self._rates = {}
+        self._condition = threading.Condition()
+
+    def set_crawl_delay(self, host, delay):
+        """Limits a host to one request per ``delay`` seconds (from robots.txt Crawl-delay)."""
+        rate = 1.0 / delay if delay and delay > 0 else None
+        with self._condition:
+            self._rates[host] = rate
+            if host in self._hosts:
+                self._hosts[host].rate = rate
+        if rate is not None:
+            self.logger.info(f"Honouring Crawl-delay of {delay}s for {host}")
+
+    def acquire(self, host):
+        """Blocks until a request to host may be sent and takes a slot for it."""
+        with self._condition:
+            while True:
+                wait = self._try_acquire(host)
+                if wait == 0:
+                    break
+                self._condition.wait(wait)
+        if self.shared_slots is not None:
+            try:
+                self.shared_slots.acquire()
+            except BaseException:
+                self._free(host)
+                raise
+
+    async def acquire_async(self, host):
+        """Asyncio counterpart of acquire() that never blocks the event loop."""
+        while True:
+            with self._condition:
+                wait = self._try_acquire(host)
+            if wait == 0:
+                break
+            await asyncio.sleep(wait if wait is not None else ASYNC_POLL_INTERVAL)
+        if self.shared_slots is not None:
+            try:
+                while not self.shared_slots.acquire(blocking=False):
+                    await asyncio.sleep(ASYNC_POLL_INTERVAL)
+            except BaseException:
+                self._free(host)
+                raise
+
+    def release(self, host, status_code, latency, retry_after=None, size=0):
+        """Frees the slot of a finished request and adapts the host to its outcome.
+
+        Args:
+            host: Host the request was sent to
+            status_code: Response status, or None when the request failed in transit
+            latency: Seconds the request took
+            retry_after: Value of the response's Retry-After header, if any
+            size: Response body bytes received
+        """
+        if self.metrics is not None:
+            self.metrics.observe_request(host, status_code, latency, size)
+        with self._condition:
+            state = self._hosts[host]
+            state.in_flight -= 1
+            if status_code is None or status_code in RETRY_STATUSES:
+                state.failures += 1
+                state.limit = max(1.0, state.limit / 2)
+                delay = parse_retry_after(retry_after)
+                if delay is None:
+                    delay = self.backoff_factor * 2 ** min(state.failures - 1, self.max_retries)
+                delay = min(delay, self.max_backoff)
+                state.blocked_until = max(state.blocked_until, time.monotonic() + delay)
+                self.logger.warning("Backing off %s for %.1fs after %s (concurrency now %d)",
+                                    host, delay, status_code or 'a connection failure', int(state.limit))
+            else:
+                state.failures = 0
+                if state.min_latency is None or latency < state.min_latency:
+                    state.min_latency = latency
+                if latency <= 2 * state.min_latency + LATENCY_TOLERANCE and state.limit < self.max_connections_per_host:
+                    state.limit = min(self.max_connections_per_host, state.limit + 1 / state.limit)
+            self._condition.notify_all()
+        if self.shared_slots is not None:
+            self.shared_slots.release()
+
+    def cancel(self, host):
+        """Frees the slot of a request that never reached the host, without adapting to it."""
+        self._free(host)
+        if self.shared_slots is not None:
+            self.shared_slots.release()
+
+    def _free(self, host):
+        with self._condition:
+            self._hosts[host].in_flight -= 1
+            self._condition.notify_all()
+
+    def should_retry(self, status_code, attempt):
+        """Whether a request that ended with status_code (None for a transport failure) is retried."""
+        return attempt < self.max_retries and (status_code is None or status_code in RETRY_STATUSES)
+
+    def _try_acquire(self, host):
+        """Takes a slot if possible; otherwise returns seconds to wait (None: until a release)."""
+        state = self._hosts.get(host)
+        if state is None:
+            state = _HostState(self._rates.get(host, self.rate_limit), float(self.initial_concurrency))
+            self._hosts[host] = state
+
+        now = time.monotonic()
+        if now < state.blocked_until:
+            return state.blocked_until - now
+        if state.in_flight >= int(state.limit):
+            return None
+        if state.rate is not None:
+            state.tokens = min(1.0, state.tokens + (now - state.refilled_at) * state.rate)
+            state.refilled_at = now
+            if state.tokens < 1.0:
+                return (1.0 - state.tokens) / state.rate
+            state.tokens -= 1.0
+        state.in_flight += 1
+        return 0
+
+
+class SchedulingAdapter(HTTPAdapter):
+    """Transport adapter that sends every request of a requests.Session through a HostScheduler.
+
+    Each hop of a redirect chain is scheduled under its own host, and a request
+    holds its slot until its body is downloaded: streamed responses keep it until
+    they are read to the end or closed, so callers must close them. Transient failures
+    (including bodies cut off mid-transfer) are retried once the host's cool-down has
+    passed; any other error frees the request's slot before it propagates.
+    """
+
+    def __init__(self, scheduler, **kwargs):
+        kwargs.setdefault('pool_maxsize', scheduler.max_connections_per_host)
+        super().__init__(**kwargs)
+        self.scheduler = scheduler
+
+    def send(self, request, **kwargs):
+        host = host_of(request.url)
+        attempt = 0
+        while True:
+            self.scheduler.acquire(host)
+            started = time.monotonic()
+            try:
+                response = super().send(request, **kwargs)
+                if not kwargs.get('stream'):
+                    # Read the body inside the slot so concurrency limits cover the download
+                    response.content
+            except TRANSIENT_ERRORS as e:
+                if is_name_resolution_error(e):
+                    self.scheduler.cancel(host)
+                    raise
+                self.scheduler.release(host, None, time.monotonic() - started)
+                if not self.scheduler.should_retry(None, attempt):
+                    raise
+            except BaseException:
+                # Whatever else went wrong, never leave the slot taken
+                self.scheduler.cancel(host)
+                raise
+            else:
+                retry = self.scheduler.should_retry(response.status_code, attempt)
+                if kwargs.get('stream') and not retry:
+                    # The caller reads the body later; keep the slot until it is consumed or closed
+                    self._release_when_read(host, response, started)
+                    return response
+                self._release(host, response, started)
+                if not retry:
+                    return response
+                response.close()
+            attempt += 1
+
+    def _release(self, host, response, started):
+        self.scheduler.release(host, response.status_code, time.monotonic() - started,
+                               response.headers.get('Retry-After'), bytes_received(response))
+
+    def _release_when_read(self, host, response, started):
+        """Frees the slot of a streamed response once its body is read to the end or it is closed.
+
+        urllib3 hands the connection back through ``release_conn()`` in both cases
+        (requests' Response.close() calls it too), so the slot is released there, once,
+        with the number of bytes the caller actually read.
+        """
+        raw = response.raw
+        release_conn = raw.release_conn
+        once = threading.Lock()
+
+        def release():
+            release_conn()
+            if once.acquire(blocking=False):
+                self._release(host, response, started)
+
+        raw.release_conn = release
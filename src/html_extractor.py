@@ -0,0 +1,124 @@
+import codecs
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+# Characters of decoded HTML handed to the parser per step
+FEED_SIZE = 16 * 1024
+
+
+class PageFactsExtractor(HTMLParser):
+    """Single-pass, event-based extractor for the facts the checks need from a page.
+
+    Collects links, meta description, title, canonical URL and robots meta without
+    building a document tree. When links are not wanted the extractor marks itself
+    done at </head> (or <body>) so the caller can stop feeding it.
+    """
+
+    def __init__(self, url, with_links=True):
+        super().__init__(convert_charrefs=True)
+        self.url = url
+        self.base_url = url
+        self.with_links = with_links
+        self.done = False
+        self.links = [] if with_links else None
+        self.meta_description = None
+        self.title = None
+        self.canonical = None
+        self.robots = None
+        self._title_parts = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            if self.with_links:
+                href = dict(attrs).get('href')
+                if href is not None:
+                    self.links.append(urljoin(self.base_url, href.strip()))
+            return
+
+        if tag == 'body':
+            self._end_head()
+        elif tag == 'meta':
+            attributes = dict(attrs)
+            name = (attributes.get('name') or '').lower()
+            if name == 'description' and self.meta_description is None:
+                self.meta_description = attributes.get('content')
+            elif name == 'robots' and self.robots is None:
+                self.robots = attributes.get('content')
+        elif tag == 'link':
+            attributes = dict(attrs)
+            if 'canonical' in (attributes.get('rel') or '').lower().split() and self.canonical is None:
+                href = attributes.get('href')
+                if href:
+                    self.canonical = urljoin(self.base_url, href.strip())
+        elif tag == 'base':
+            href = dict(attrs).get('href')
+            if href:
+                self.base_url = urljoin(self.url, href.strip())
+        elif tag == 'title' and self.title is None:
+            self._title_parts = []
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag == 'title' and self._title_parts is not None:
+            self.title = ''.join(self._title_parts).strip()
+            self._title_parts = None
+        elif tag == 'head':
+            self._end_head()
+
+    def handle_data(self, data):
+        if self._title_parts is not None:
+            self._title_parts.append(data)
+
+    def facts(self):
+        """Returns the extracted facts as a plain dict."""
+        return {
+            "links": self.links,
+            "meta_description": self.meta_description,
+            "title": self.title,
+            "canonical": self.canonical,
+            "robots": self.robots,
+        }
+
+    def _end_head(self):
+        if self._title_parts is not None:
+            self.title = ''.join(self._title_parts).strip()
+            self._title_parts = None
+        if not self.with_links:
+            self.done = True
+
+
+def charset_from_content_type(content_type, default='utf-8'):
+    """Returns the charset parameter of a Content-Type header, or the default."""
+    for parameter in (content_type or '').split(';')[1:]:
+        name, _, value = parameter.partition('=')
+        if name.strip().lower() == 'charset' and value.strip():
+            charset = value.strip().strip('"\'')
+            try:
+                codecs.lookup(charset)
+                return charset
+            except LookupError:
+                break
+    return default
+
+
+def extract_facts(url, content, content_type='', with_links=True):
+    """Extracts page facts from raw HTML bytes in a single streaming pass.
+
+    Args:
+        url: URL the page was fetched from, used to resolve relative links
+        content: Raw response body
+        content_type: Content-Type header, used to pick the character set
+        with_links: Collect <a href> links; when False parsing stops after </head>
+    """
+    extractor = PageFactsExtractor(url, with_links)
+    decoder = codecs.getincrementaldecoder(charset_from_content_type(content_type))(errors='replace')
+    for start in range(0, len(content), FEED_SIZE):
+        extractor.feed(decoder.decode(content[start:start + FEED_SIZE]))
+        if extractor.done:
+            break
+    else:
+        extractor.feed(decoder.decode(b'', final=True))
+        extractor.close()
+    return extractor.facts()
@@ -0,0 +1,215 @@
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+import io
+import json
+import pathlib
+import sqlite3
+import threading
+import time
+import zlib
+
+# Headers describing the wire format of a body that is archived already decoded
+WIRE_HEADERS = ('content-encoding', 'transfer-encoding', 'content-length')
+
+
+class HttpArchive:
+    """Single-file SQLite archive of HTTP exchanges, indexed by method and URL.
+
+    Bodies are stored zlib-compressed and already decoded. Requests that failed
+    are stored with their error message instead of a response.
+
+    Args:
+        path: SQLite database file holding the archive
+        clear: Delete exchanges left by an earlier recording
+        read_only: Open an existing archive for replay; a missing file raises
+            FileNotFoundError instead of becoming an empty archive
+    """
+
+    def __init__(self, path, clear=False, read_only=False):
+        self.path = path
+        self._lock = threading.Lock()
+        self._pending = []
+        if read_only:
+            if not pathlib.Path(path).is_file():
+                raise FileNotFoundError(f"No HTTP archive at {path}")
+            self._db = sqlite3.connect(f"{pathlib.Path(path).absolute().as_uri()}?mode=ro", uri=True,
+                                       check_same_thread=False)
+            return
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS exchanges ("
+            "id INTEGER PRIMARY KEY, method TEXT, url TEXT, status_code INTEGER, reason TEXT, "
+            "headers TEXT, body BLOB, elapsed REAL, error TEXT)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS exchanges_request ON exchanges (method, url)")
+        if clear:
+            self._db.execute("DELETE FROM exchanges")
+        self._db.commit()
+
+    def record(self, method, url, response=None, body=b'', elapsed=0.0, error=None):
+        """Adds an exchange; pass the error instead of a response for failed requests."""
+        if response is not None:
+            headers = [(name, value) for name, value in response.headers.items() if name.lower() not in WIRE_HEADERS]
+            row = (method, url, response.status_code, response.reason, json.dumps(headers),
+                   zlib.compress(body), elapsed, None)
+        else:
+            row = (method, url, None, None, None, None, elapsed, f"{type(error).__name__}: {error}")
+        with self._lock:
+            self._pending.append(row)
+            if len(self._pending) >= 100:
+                self._flush()
+
+    def exchange_ids(self, method, url):
+        """Returns the IDs of the exchanges recorded for a request, oldest first."""
+        self.flush()
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id FROM exchanges WHERE method = ? AND url = ? ORDER BY id", (method, url)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def exchange(self, exchange_id):
+        """Returns a (status_code, reason, headers, body, elapsed, error) tuple."""
+        with self._lock:
+            status_code, reason, headers, body, elapsed, error = self._db.execute(
+                "SELECT status_code, reason, headers, body, elapsed, error FROM exchanges WHERE id = ?",
+                (exchange_id,),
+            ).fetchone()
+        if error is not None:
+            return None, None, None, b'', elapsed, error
+        return status_code, reason, json.loads(headers), zlib.decompress(body), elapsed, None
+
+    def flush(self):
+        """Writes buffered exchanges to disk."""
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        """Flushes buffered exchanges and closes the underlying database."""
+        with self._lock:
+            self._flush()
+            self._db.close()
+
+    def _flush(self):
+        if self._pending:
+            self._db.executemany(
+                "INSERT INTO exchanges (method, url, status_code, reason, headers, body, elapsed, error) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                self._pending,
+            )
+            self._db.commit()
+            self._pending = []
+
+
+class RecordingAdapter(BaseAdapter):
+    """Transport adapter that sends requests through ``adapter`` and archives every exchange.
+
+    Streamed responses are archived when the caller closes them, with only the part
+    of the body the caller read: the page store's content-type gate and size cap
+    apply while recording just as they do otherwise, and replay serves the same bytes.
+    """
+
+    def __init__(self, adapter, archive):
+        super().__init__()
+        self.adapter = adapter
+        self.archive = archive
+
+    def send(self, request, **kwargs):
+        started = time.monotonic()
+        try:
+            response = self.adapter.send(request, **kwargs)
+            if kwargs.get('stream'):
+                self._record_on_close(request, response, started)
+                return response
+            body = response.content
+        except requests.exceptions.RequestException as e:
+            self.archive.record(request.method, request.url, elapsed=time.monotonic() - started, error=e)
+            raise
+        self.archive.record(request.method, request.url, response, body, time.monotonic() - started)
+        return response
+
+    def _record_on_close(self, request, response, started):
+        """Collects the chunks the caller reads from a streamed response and archives them on close()."""
+        raw = response.raw
+        stream, close = raw.stream, response.close
+        chunks = []
+        once = threading.Lock()
+
+        def tee(*args, **kwargs):
+            for chunk in stream(*args, **kwargs):
+                chunks.append(chunk)
+                yield chunk
+
+        def record_and_close():
+            close()
+            if once.acquire(blocking=False):
+                self.archive.record(request.method, request.url, response, b''.join(chunks),
+                                    time.monotonic() - started)
+
+        raw.stream = tee
+        response.close = record_and_close
+
+    def close(self):
+        self.adapter.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    """Transport adapter that answers requests from an HttpArchive instead of the network.
+
+    Repeated requests for a URL get the recorded exchanges in order (for example a
+    429 and then the retried 200); once those run out the last one is repeated.
+    Requests the archive does not hold fail with a ConnectionError.
+
+    Args:
+        archive: HttpArchive to replay
+        timing: Wait the recorded latency before each response instead of answering
+            at full speed
+    """
+
+    def __init__(self, archive, timing=False):
+        super().__init__()
+        self.archive = archive
+        self.timing = timing
+        self._positions = {}
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        key = (request.method, request.url)
+        with self._lock:
+            if key not in self._positions:
+                self._positions[key] = [self.archive.exchange_ids(*key), 0]
+            exchange_ids, position = self._positions[key]
+            if not exchange_ids:
+                raise requests.exceptions.ConnectionError(
+                    f"{request.method} {request.url} is not in the archive", request=request
+                )
+            self._positions[key][1] = min(position + 1, len(exchange_ids) - 1)
+
+        status_code, reason, headers, body, elapsed, error = self.archive.exchange(exchange_ids[position])
+        if self.timing:
+            time.sleep(elapsed)
+        if error is not None:
+            # Re-raise the recorded kind of failure (Timeout, ConnectionError, ...)
+            name, _, message = error.partition(': ')
+            error_class = getattr(requests.exceptions, name, requests.exceptions.ConnectionError)
+            if not isinstance(error_class, type) or not issubclass(error_class, requests.exceptions.RequestException):
+                error_class = requests.exceptions.ConnectionError
+            raise error_class(message, request=request)
+
+        response = requests.Response()
+        response.status_code = status_code
+        response.reason = reason
+        response.headers = CaseInsensitiveDict(headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(body)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
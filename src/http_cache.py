@@ -0,0 +1,107 @@
+import collections
+import json
+import sqlite3
+import threading
+import time
+
+CacheEntry = collections.namedtuple('CacheEntry', ['etag', 'last_modified', 'status_code', 'facts', 'redirects'])
+CacheEntry.__doc__ = """Validators and extracted facts stored for one URL."""
+
+
+class HttpCache:
+    """On-disk cache of page facts keyed by URL, revalidated with conditional requests.
+
+    Only the validators (ETag, Last-Modified), the status and the facts the checks
+    need (links, meta description) are stored, never page bodies. When the total
+    stored size exceeds ``max_bytes`` the least recently used entries are evicted.
+
+    Args:
+        path: SQLite database file holding the cache
+        max_bytes: Size budget for stored entries
+    """
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, status_code INTEGER, "
+            "facts TEXT, redirects TEXT, size INTEGER, accessed REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed)")
+        self._db.commit()
+        self._total_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+    def lookup(self, url):
+        """Returns the CacheEntry stored for a URL, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, last_modified, status_code, facts, redirects FROM pages WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, status_code, facts, redirects = row
+        return CacheEntry(etag, last_modified, status_code, json.loads(facts), json.loads(redirects))
+
+    def conditional_headers(self, entry):
+        """Builds If-None-Match / If-Modified-Since headers from a cache entry."""
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def hit(self, url):
+        """Records that a cached entry was revalidated (304) and reused."""
+        with self._lock:
+            self.hits += 1
+            self._db.execute("UPDATE pages SET accessed = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+
+    def store(self, url, response_headers, status_code, facts, redirects):
+        """Stores the facts of a freshly downloaded page if the server sent validators."""
+        etag = response_headers.get('ETag')
+        last_modified = response_headers.get('Last-Modified')
+        with self._lock:
+            self.misses += 1
+            if not etag and not last_modified:
+                return
+            facts = json.dumps(facts)
+            redirects = json.dumps(redirects)
+            size = len(url) + len(facts) + len(redirects) + len(etag or '') + len(last_modified or '')
+            previous = self._db.execute("SELECT size FROM pages WHERE url = ?", (url,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, status_code, facts, redirects, size, time.time()),
+            )
+            self._total_bytes += size - (previous[0] if previous else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+            self._db.commit()
+
+    def close(self):
+        """Closes the underlying database."""
+        with self._lock:
+            self._db.close()
+
+    def _evict(self):
+        """Deletes least recently used entries until the cache is back under 90% of its budget."""
+        target = self.max_bytes * 0.9
+        rows = self._db.execute("SELECT url, size FROM pages ORDER BY accessed")
+        evicted = []
+        for url, size in rows:
+            if self._total_bytes <= target:
+                break
+            evicted.append((url,))
+            self._total_bytes -= size
+        rows.close()
+        self._db.executemany("DELETE FROM pages WHERE url = ?", evicted)
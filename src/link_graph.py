@@ -0,0 +1,152 @@
+import array
+import collections
+
+try:
+    import numpy as np
+except ImportError:  # numpy only speeds up LinkGraph.metrics()
+    np = None
+
+from .url_normalizer import url_key
+
+LinkMetrics = collections.namedtuple('LinkMetrics', ['inbound', 'outbound', 'depth'])
+LinkMetrics.__doc__ = """Per-node inbound links, outbound links (-1: not crawled) and click depth (-1: unreachable)."""
+
+
+class LinkGraph:
+    """Internal link graph of a crawl, stored as compact integer arrays.
+
+    URLs are interned to integer IDs (pages sharing a url_key() share an ID), and
+    each node keeps that key as its URL, held once by both the ID table and the
+    node list. Edges are kept CSR-style: crawled page ``sources[row]`` links to
+    ``targets[offsets[row]:offsets[row + 1]]``. Self-links and repeated links on a
+    page are dropped. The graph is not counted against a crawl's memory_budget.
+
+    Args:
+        root_url: Page the crawl starts from; click depth is measured from it
+    """
+
+    def __init__(self, root_url=None):
+        self._ids = {}
+        self._urls = []
+        self._sources = array.array('i')
+        self._offsets = array.array('q', [0])
+        self._targets = array.array('i')
+        self._metrics = None
+        self.root = self.intern(root_url) if root_url is not None else None
+
+    def __len__(self):
+        return len(self._urls)
+
+    def __iter__(self):
+        return iter(self._urls)
+
+    @property
+    def page_count(self):
+        """Number of crawled pages."""
+        return len(self._sources)
+
+    @property
+    def link_count(self):
+        """Number of distinct page-to-page links."""
+        return len(self._targets)
+
+    def intern(self, url):
+        """Returns the integer ID of a URL, assigning the next free one on first sight."""
+        key = url_key(url)
+        node = self._ids.get(key)
+        if node is None:
+            node = len(self._urls)
+            self._ids[key] = node
+            self._urls.append(key)
+        return node
+
+    def lookup(self, url):
+        """Returns the integer ID of a URL, or None if the crawl never saw it."""
+        return self._ids.get(url_key(url))
+
+    def url(self, node):
+        """Returns the url_key() of the URLs interned to an ID."""
+        return self._urls[node]
+
+    def add_page(self, url, links):
+        """Records a crawled page and the internal links found on it."""
+        source = self.intern(url)
+        targets = {self.intern(link) for link in links}
+        targets.discard(source)
+        self._sources.append(source)
+        self._targets.extend(sorted(targets))
+        self._offsets.append(len(self._targets))
+        self._metrics = None
+
+    def metrics(self):
+        """Computes inbound/outbound link counts and click depth from the root for every node.
+
+        Uses vectorized NumPy operations when numpy is installed and plain loops
+        over the same arrays otherwise. The result is cached until the graph changes.
+        """
+        if self._metrics is None:
+            if np is not None:
+                self._metrics = self._numpy_metrics()
+            else:
+                self._metrics = self._python_metrics()
+        return self._metrics
+
+    def _numpy_metrics(self):
+        nodes = len(self._urls)
+        sources = np.frombuffer(self._sources, dtype=np.int32)
+        offsets = np.frombuffer(self._offsets, dtype=np.int64)
+        targets = np.frombuffer(self._targets, dtype=np.int32)
+
+        inbound = np.bincount(targets, minlength=nodes)
+        outbound = np.full(nodes, -1, dtype=np.int64)
+        outbound[sources] = np.diff(offsets)
+
+        # Breadth-first search one whole level at a time
+        depth = np.full(nodes, -1, dtype=np.int64)
+        if self.root is not None:
+            row_of = np.full(nodes, -1, dtype=np.int64)
+            row_of[sources] = np.arange(len(sources))
+            depth[self.root] = 0
+            frontier = np.array([self.root])
+            level = 0
+            while frontier.size:
+                rows = row_of[frontier]
+                rows = rows[rows >= 0]
+                starts = offsets[rows]
+                lengths = offsets[rows + 1] - starts
+                total = int(lengths.sum())
+                if total == 0:
+                    break
+                # Gather the target slices of every frontier row in one indexing operation
+                index = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+                neighbours = targets[index]
+                frontier = np.unique(neighbours[depth[neighbours] < 0])
+                level += 1
+                depth[frontier] = level
+        return LinkMetrics(inbound, outbound, depth)
+
+    def _python_metrics(self):
+        nodes = len(self._urls)
+        inbound = [0] * nodes
+        for target in self._targets:
+            inbound[target] += 1
+        outbound = [-1] * nodes
+        rows = {}
+        for row, source in enumerate(self._sources):
+            outbound[source] = self._offsets[row + 1] - self._offsets[row]
+            rows[source] = row
+
+        depth = [-1] * nodes
+        if self.root is not None:
+            depth[self.root] = 0
+            queue = collections.deque([self.root])
+            while queue:
+                node = queue.popleft()
+                row = rows.get(node)
+                if row is None:
+                    continue
+                for target in self._targets[self._offsets[row]:self._offsets[row + 1]]:
+                    if depth[target] < 0:
+                        depth[target] = depth[node] + 1
+                        queue.append(target)
+        return LinkMetrics(inbound, outbound, depth)
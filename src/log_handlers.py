@@ -0,0 +1,122 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+# Seconds between progress lines of long-running checks
+PROGRESS_INTERVAL = 5.0
+
+# Messages per second each message template may log before being suppressed
+MESSAGE_RATE = 5.0
+
+# Messages of one template logged in a burst before the rate applies
+MESSAGE_BURST = 20
+
+# Message templates whose token buckets are kept; the least recently logged go first
+MAX_TEMPLATES = 1024
+
+
+class RateLimitFilter(logging.Filter):
+    """Drops records of a message template that logs faster than ``rate`` per second.
+
+    Records are grouped by logger, level and unformatted message, so lazily
+    formatted calls such as ``logger.warning("Broken link: %s", url)`` share one
+    token bucket however many URLs they report. The next record of a template that
+    passes mentions how many were suppressed. ERROR and CRITICAL records always pass.
+    Only the ``max_templates`` most recently logged templates keep a bucket, so
+    messages formatted before logging cannot grow the filter without bound.
+
+    Args:
+        rate: Records per second allowed per template
+        burst: Records of a template allowed at once before the rate applies
+        max_templates: Templates tracked at once
+    """
+
+    def __init__(self, rate=MESSAGE_RATE, burst=MESSAGE_BURST, max_templates=MAX_TEMPLATES):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.max_templates = max_templates
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.ERROR:
+            return True
+        key = (record.name, record.levelno, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated, suppressed = self._buckets.pop(key, (self.burst, now, 0))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if len(self._buckets) >= self.max_templates:
+                self._buckets.popitem(last=False)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now, suppressed + 1)
+                return False
+            self._buckets[key] = (tokens - 1, now, 0)
+        if suppressed:
+            record.msg = f"{record.getMessage()} ({suppressed} similar messages suppressed)"
+            record.args = None
+        return True
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting the message to the background thread."""
+
+    def prepare(self, record):
+        # The queue never leaves this process, so the record can travel as it is
+        return record
+
+
+class _Listener(logging.handlers.QueueListener):
+    """QueueListener that can be stopped more than once (explicitly and again at exit)."""
+
+    def stop(self):
+        if self._thread is not None:
+            super().stop()
+
+
+def queued_handler(*handlers, rate=MESSAGE_RATE, burst=MESSAGE_BURST):
+    """Returns a handler that queues records for ``handlers`` to write on a background thread.
+
+    Logging threads only put the record on an unbounded queue; formatting the
+    message, slow consoles and disk writes never hold them up. Records are
+    rate-limited per message template before being queued (``rate=None`` disables
+    that). The background thread is stopped, after writing out everything queued,
+    when the interpreter exits.
+    """
+    records = queue.SimpleQueue()
+    handler = _DeferredQueueHandler(records)
+    if rate is not None:
+        handler.addFilter(RateLimitFilter(rate, burst))
+    listener = _Listener(records, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    handler.listener = listener
+    return handler
+
+
+class Progress:
+    """Logs "done/total" progress of a long-running loop at most once per ``interval`` seconds.
+
+    Args:
+        logger: Logger progress lines go to
+        message: Format string with ``{done}`` and ``{total}`` placeholders
+        interval: Minimum seconds between two progress lines
+    """
+
+    def __init__(self, logger, message, interval=PROGRESS_INTERVAL):
+        self.logger = logger
+        self.message = message
+        self.interval = interval
+        self._last = time.monotonic()
+
+    def update(self, done, total=None):
+        """Reports that ``done`` of ``total`` items are finished, if the last report is old enough."""
+        now = time.monotonic()
+        if now - self._last >= self.interval:
+            self._last = now
+            self.logger.info(self.message.format(done=done, total=total))
@@ -0,0 +1,196 @@
+import bisect
+import contextlib
+import threading
+import time
+
+# Upper bounds in seconds of the request latency histogram buckets (Prometheus defaults)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Upper bounds in seconds of the page parse time histogram buckets
+PARSE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Prefix of every exported metric name
+PROMETHEUS_PREFIX = "sitemap_analyzer"
+
+
+def status_class(status_code):
+    """Groups a response status into "2xx", "3xx", ...; "error" when the request failed in transit."""
+    return f"{status_code // 100}xx" if status_code else "error"
+
+
+class Histogram:
+    """Counts observations into fixed buckets, the way Prometheus histograms do.
+
+    Args:
+        buckets: Sorted upper bounds of the buckets; a final +Inf bucket is implied
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """Returns (upper bound, observations at or below it) pairs ending with +Inf."""
+        pairs = []
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+    def quantile(self, fraction):
+        """Estimates a quantile as the upper bound of the bucket holding it (None when empty)."""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        for bound, total in self.cumulative():
+            if total >= rank:
+                return bound if bound != float('inf') else self.buckets[-1]
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "buckets": {_format_bound(bound): total for bound, total in self.cumulative()},
+        }
+
+
+class Metrics:
+    """Thread-safe counters, gauges and histograms collected while an analysis runs.
+
+    Every recording method is cheap enough for the per-request and per-page hot
+    paths: one lock and a few additions. Values accumulate over the lifetime of
+    the object; read them with ``snapshot()`` or export them with ``to_prometheus()``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.phases = {}
+        self.requests = {}
+        self.bytes_received = 0
+        self.queues = {}
+        self.caches = {}
+        self.parse = Histogram(PARSE_BUCKETS)
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Adds the wall-clock time spent inside the block to phase ``name``."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            with self._lock:
+                self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def observe_request(self, host, status_code, seconds, size=0):
+        """Records one request: its latency, outcome (None for a transport failure) and body bytes."""
+        key = (host, status_class(status_code))
+        with self._lock:
+            histogram = self.requests.get(key)
+            if histogram is None:
+                histogram = self.requests[key] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(seconds)
+            self.bytes_received += size
+
+    def observe_parse(self, seconds):
+        """Records the time spent extracting the facts of one page."""
+        with self._lock:
+            self.parse.observe(seconds)
+
+    def observe_queue(self, name, depth):
+        """Records the current depth of a queue, keeping the peak as well."""
+        with self._lock:
+            _, peak = self.queues.get(name, (0, 0))
+            self.queues[name] = (depth, max(peak, depth))
+
+    def cache_lookup(self, name, hit):
+        """Counts a hit or a miss of cache ``name``."""
+        with self._lock:
+            hits, misses = self.caches.get(name, (0, 0))
+            self.caches[name] = (hits + 1, misses) if hit else (hits, misses + 1)
+
+    def snapshot(self):
+        """Returns every metric as plain, JSON-serializable dicts."""
+        with self._lock:
+            requests = {}
+            for (host, outcome), histogram in sorted(self.requests.items()):
+                requests.setdefault(host, {})[outcome] = histogram.as_dict()
+            return {
+                "phases": {name: round(seconds, 6) for name, seconds in self.phases.items()},
+                "requests": requests,
+                "bytes_received": self.bytes_received,
+                "queues": {name: {"depth": depth, "peak": peak} for name, (depth, peak) in self.queues.items()},
+                "caches": {
+                    name: {"hits": hits, "misses": misses,
+                           "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else None}
+                    for name, (hits, misses) in self.caches.items()
+                },
+                "parse": self.parse.as_dict(),
+            }
+
+    def to_prometheus(self):
+        """Renders every metric in the Prometheus text exposition format."""
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {PROMETHEUS_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{name} {kind}")
+
+        def sample(name, labels, value):
+            label_text = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+            lines.append(f"{PROMETHEUS_PREFIX}_{name}{{{label_text}}} {value}" if label_text
+                         else f"{PROMETHEUS_PREFIX}_{name} {value}")
+
+        def histogram(name, labels, values):
+            for bound, total in values.cumulative():
+                sample(f"{name}_bucket", {**labels, "le": _format_bound(bound)}, total)
+            sample(f"{name}_sum", labels, repr(values.sum))
+            sample(f"{name}_count", labels, values.count)
+
+        with self._lock:
+            family("phase_seconds", "gauge", "Wall-clock seconds spent in each analysis phase.")
+            for name, seconds in sorted(self.phases.items()):
+                sample("phase_seconds", {"phase": name}, repr(seconds))
+
+            family("request_duration_seconds", "histogram", "Latency of HTTP requests by host and status class.")
+            for (host, outcome), values in sorted(self.requests.items()):
+                histogram("request_duration_seconds", {"host": host, "status_class": outcome}, values)
+
+            family("response_bytes_total", "counter", "Response body bytes received.")
+            sample("response_bytes_total", {}, self.bytes_received)
+
+            family("queue_depth", "gauge", "Current depth of internal work queues.")
+            for name, (depth, _) in sorted(self.queues.items()):
+                sample("queue_depth", {"queue": name}, depth)
+            family("queue_depth_peak", "gauge", "Largest depth internal work queues reached.")
+            for name, (_, peak) in sorted(self.queues.items()):
+                sample("queue_depth_peak", {"queue": name}, peak)
+
+            family("cache_hits_total", "counter", "Lookups answered by a cache.")
+            for name, (hits, _) in sorted(self.caches.items()):
+                sample("cache_hits_total", {"cache": name}, hits)
+            family("cache_misses_total", "counter", "Lookups a cache could not answer.")
+            for name, (_, misses) in sorted(self.caches.items()):
+                sample("cache_misses_total", {"cache": name}, misses)
+
+            family("parse_duration_seconds", "histogram", "Time spent extracting the facts of a page.")
+            histogram("parse_duration_seconds", {}, self.parse)
+        return "\n".join(lines) + "\n"
+
+
+def _format_bound(bound):
+    return "+Inf" if bound == float('inf') else repr(bound)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,359 @@
+import requests
+import collections
+import concurrent.futures
+import threading
+import time
+from .html_extractor import extract_facts
+
+# Statuses servers use to reject HEAD requests
+HEAD_REJECTED_STATUSES = (405, 501)
+
+# Bytes of a page body read per step
+BODY_CHUNK_SIZE = 64 * 1024
+
+# Default cap on the bytes of a page body that are downloaded
+DEFAULT_MAX_BODY_BYTES = 5 * 1024 * 1024
+
+# Markers after which a head-only read stops; the facts SEO checks need all live in <head>
+HEAD_END_MARKERS = (b'</head', b'<body')
+
+
+def is_html(content_type):
+    """Whether a Content-Type names an HTML page (a missing type may be one too)."""
+    return not content_type or 'html' in content_type.lower()
+
+
+class BodyReader:
+    """Collects the chunks of a page body, stopping once the checks have what they need.
+
+    Reading stops after ``max_bytes`` (the body is then marked truncated) and, with
+    ``head_only``, as soon as the end of the document's <head> has arrived.
+    ``received`` counts every byte fed, including those past the cap.
+
+    Args:
+        max_bytes: Most bytes kept from the body (None for unlimited)
+        head_only: Stop at </head> or <body>
+    """
+
+    def __init__(self, max_bytes=None, head_only=False):
+        self.max_bytes = max_bytes
+        self.head_only = head_only
+        self.truncated = False
+        self.received = 0
+        self._chunks = []
+        self._size = 0
+        self._tail = b''
+
+    @property
+    def content(self):
+        return b''.join(self._chunks)
+
+    def feed(self, chunk):
+        """Adds the next chunk; returns False once no more of the body is wanted."""
+        self.received += len(chunk)
+        if self.max_bytes is not None and self._size + len(chunk) > self.max_bytes:
+            chunk = chunk[:self.max_bytes - self._size]
+            self.truncated = True
+        self._chunks.append(chunk)
+        self._size += len(chunk)
+        if self.truncated:
+            return False
+        if self.head_only:
+            # Keep a few bytes of the previous chunk so markers split across chunks are found
+            window = (self._tail + chunk).lower()
+            if any(marker in window for marker in HEAD_END_MARKERS):
+                return False
+            self._tail = chunk[-8:]
+        return True
+
+
+class Page:
+    """A fetched page shared by every check of a single analysis run.
+
+    Pages revalidated from the HTTP cache carry their facts (links, meta description)
+    but no content. With ``metrics`` set, the time spent parsing the page is recorded.
+    ``truncated`` pages hold only the start of a body that was too large to read in full.
+    """
+
+    def __init__(self, url, status_code=None, headers=None, content=b'', error=None, redirects=None,
+                 facts=None, from_cache=False, metrics=None, truncated=False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = content
+        self.error = error
+        self.redirects = redirects or []
+        self.from_cache = from_cache
+        self.metrics = metrics
+        self.truncated = truncated
+        self._facts = facts
+        self._pending = None
+        self._lock = threading.Lock()
+
+    @property
+    def ok(self):
+        """True when the page was fetched and did not return a 4xx/5xx status."""
+        return self.error is None and self.status_code < 400
+
+    @property
+    def facts(self):
+        """Every fact the checks read from the page, extracted once on first access."""
+        return self._extract(with_links=True)
+
+    @property
+    def links(self):
+        """Absolute URLs of every <a href> on the page."""
+        return self._extract(with_links=True)["links"]
+
+    @property
+    def meta_description(self):
+        """Content of the <meta name="description"> tag, or None."""
+        return self._extract(with_links=False).get("meta_description")
+
+    @property
+    def title(self):
+        """Text of the <title> tag, or None."""
+        return self._extract(with_links=False).get("title")
+
+    @property
+    def canonical(self):
+        """Absolute URL of the <link rel="canonical"> tag, or None."""
+        return self._extract(with_links=False).get("canonical")
+
+    @property
+    def robots(self):
+        """Content of the <meta name="robots"> tag, or None."""
+        return self._extract(with_links=False).get("robots")
+
+    def _extract(self, with_links):
+        """Runs the single-pass extractor, stopping after </head> when links are not needed."""
+        with self._lock:
+            if self._pending is not None:
+                self._resolve_pending()
+            if self._facts is None or (with_links and self._facts.get("links") is None):
+                content_type = self.headers.get('content-type', '')
+                started = time.perf_counter()
+                self._facts = extract_facts(self.url, self.content, content_type, with_links)
+                if self.metrics is not None:
+                    self.metrics.observe_parse(time.perf_counter() - started)
+            return self._facts
+
+    def _resolve_pending(self):
+        """Takes the facts of a deferred parse, waiting for it if needed (the lock is held)."""
+        pending, self._pending = self._pending, None
+        try:
+            self._facts = pending.result()
+        except Exception:
+            # The worker failed; the body is still here, so _extract() parses it in-process
+            return
+        self.content = b''
+
+    def set_facts(self, facts):
+        """Stores facts extracted elsewhere (see ParsePool) and drops the body."""
+        with self._lock:
+            self._facts = facts
+            self.content = b''
+
+    def defer_facts(self, future):
+        """Lets a future (see ParsePool) deliver the facts; the body is kept until it does."""
+        with self._lock:
+            self._pending = future
+        future.add_done_callback(self._parsed)
+
+    def when_parsed(self, callback):
+        """Calls ``callback(page)`` once reading the facts no longer waits for a deferred parse."""
+        with self._lock:
+            pending = self._pending
+        if pending is None:
+            callback(self)
+        else:
+            pending.add_done_callback(lambda future: callback(self))
+
+    def _parsed(self, future):
+        with self._lock:
+            if self._pending is future:
+                self._resolve_pending()
+
+    def compact(self):
+        """Extracts every fact now and drops the body to free its memory.
+
+        A page whose facts are deferred drops its body when they arrive instead.
+        """
+        with self._lock:
+            if self._pending is not None:
+                return
+        self._extract(with_links=True)
+        self.content = b''
+
+    def estimated_size(self):
+        """Rough number of bytes the page keeps in memory."""
+        links = (self._facts or {}).get("links") or []
+        return 512 + len(self.content) + sum(len(link) + 64 for link in links)
+
+
+def _redirect_chain(response):
+    """Lists the redirects requests followed to reach a response."""
+    return [{"url": hop.url, "status_code": hop.status_code} for hop in response.history]
+
+
+class PageStore:
+    """Fetches every URL at most once per run and shares the result between callers.
+
+    Concurrent callers asking for a URL that is already being downloaded wait on
+    the same in-flight request instead of issuing their own. Stored pages keep only
+    their status, headers and facts: each body is parsed and dropped as soon as it
+    is fetched. With ``max_bytes`` set, the oldest pages are also forgotten (and
+    fetched again if asked for) when the store outgrows the budget.
+    With a ``parse_pool`` each page is handed to a worker process right after its
+    download and get() returns without waiting for it. Reading the page's facts
+    waits for the worker, so callers that must not block use Page.when_parsed();
+    the body is dropped once the facts arrive. With ``metrics`` set, reuse of
+    stored pages and of HTTP cache entries is counted.
+
+    Bodies are streamed: only successful HTML responses are downloaded, and at most
+    ``max_body_bytes`` of each.
+    """
+
+    def __init__(self, session, timeout=5, cache=None, max_bytes=None, parse_pool=None, metrics=None,
+                 max_body_bytes=DEFAULT_MAX_BODY_BYTES):
+        self.session = session
+        self.timeout = timeout
+        self.cache = cache
+        self.max_bytes = max_bytes
+        self.parse_pool = parse_pool
+        self.metrics = metrics
+        self.max_body_bytes = max_body_bytes
+        self._pages = {}
+        self._partials = {}
+        self._heads = {}
+        self._stored = collections.OrderedDict()
+        self._stored_bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._pages)
+
+    def get(self, url, head_only=False):
+        """Returns the Page for a URL, fetching it if no caller has done so yet.
+
+        With ``head_only`` the download may stop after the page's <head>, which holds
+        everything the SEO checks read; a full page already stored is reused.
+        """
+        if head_only:
+            with self._lock:
+                future = self._pages.get(url)
+            if future is not None:
+                return future.result()
+            return self._shared(self._partials, url, lambda url: self._fetch(url, head_only=True))
+        return self._shared(self._pages, url, self._fetch)
+
+    def head(self, url):
+        """Returns a bodyless Page carrying only the status, headers and redirect chain of a URL.
+
+        A page already stored by get() is reused. Otherwise a HEAD request is sent,
+        falling back to a streamed GET that is closed after the headers when the
+        server rejects HEAD.
+        """
+        with self._lock:
+            future = self._pages.get(url)
+        if future is not None:
+            return future.result()
+        return self._shared(self._heads, url, self._fetch_head)
+
+    def clear(self):
+        """Drops every stored page."""
+        with self._lock:
+            self._pages = {}
+            self._partials = {}
+            self._heads = {}
+            self._stored = collections.OrderedDict()
+            self._stored_bytes = 0
+
+    def _shared(self, table, url, fetch):
+        with self._lock:
+            future = table.get(url)
+            owner = future is None
+            if owner:
+                future = concurrent.futures.Future()
+                table[url] = future
+        if self.metrics is not None:
+            self.metrics.cache_lookup("page_store", not owner)
+
+        if owner:
+            try:
+                page = fetch(url)
+                # Checks only read facts, so no body outlives its parse
+                page.compact()
+                future.set_result(page)
+            except Exception as e:
+                # Never leave waiters blocked on a request that blew up
+                future.set_exception(e)
+            else:
+                if self.max_bytes is not None:
+                    self._remember(table, url, page)
+        return future.result()
+
+    def _remember(self, table, url, page):
+        """Accounts for a stored page, forgetting the oldest ones while over budget."""
+        with self._lock:
+            size = page.estimated_size()
+            self._stored[(id(table), url)] = (table, size)
+            self._stored_bytes += size
+            while self._stored_bytes > self.max_bytes and len(self._stored) > 1:
+                (_, evicted_url), (evicted_table, size) = self._stored.popitem(last=False)
+                self._stored_bytes -= size
+                evicted_table.pop(evicted_url, None)
+
+    def _fetch(self, url, head_only=False):
+        entry = self.cache.lookup(url) if self.cache else None
+        try:
+            headers = self._conditional_headers(entry)
+            with self.session.get(url, timeout=self.timeout, headers=headers, stream=True) as response:
+                if self.cache and self.metrics is not None:
+                    self.metrics.cache_lookup("http", entry is not None and response.status_code == 304)
+                if entry is not None and response.status_code == 304:
+                    self.cache.hit(url)
+                    return Page(url, entry.status_code, response.headers, redirects=entry.redirects,
+                                facts=entry.facts, from_cache=True)
+                reader = self._read_body(response, head_only)
+        except requests.exceptions.RequestException as e:
+            return Page(url, error=e)
+
+        page = Page(url, response.status_code, response.headers, reader.content,
+                    redirects=_redirect_chain(response), metrics=self.metrics, truncated=reader.truncated)
+        if self.parse_pool is not None:
+            self.parse_pool.parse(page)
+        # Facts of a partly read page would miss links later in the body
+        if self.cache and response.status_code == 200 and not head_only and not page.truncated:
+            page.when_parsed(lambda page: self.cache.store(url, response.headers, page.status_code,
+                                                           page.facts, page.redirects))
+        return page
+
+    def _read_body(self, response, head_only):
+        """Streams as much of a response body as the checks need; error pages and non-HTML bodies are skipped."""
+        reader = BodyReader(self.max_body_bytes, head_only)
+        if response.status_code < 400 and is_html(response.headers.get('content-type')):
+            for chunk in response.iter_content(BODY_CHUNK_SIZE):
+                if not reader.feed(chunk):
+                    break
+        return reader
+
+    def _fetch_head(self, url):
+        entry = self.cache.lookup(url) if self.cache else None
+        try:
+            headers = self._conditional_headers(entry)
+            response = self.session.head(url, timeout=self.timeout, allow_redirects=True, headers=headers)
+            if response.status_code in HEAD_REJECTED_STATUSES:
+                # Closing the unread stream drops the connection right after the headers
+                with self.session.get(url, timeout=self.timeout, stream=True, headers=headers) as response:
+                    pass
+        except requests.exceptions.RequestException as e:
+            return Page(url, error=e)
+
+        if entry is not None and response.status_code == 304:
+            self.cache.hit(url)
+            return Page(url, entry.status_code, response.headers, redirects=entry.redirects, from_cache=True)
+        return Page(url, response.status_code, response.headers, redirects=_redirect_chain(response))
+
+    def _conditional_headers(self, entry):
+        return self.cache.conditional_headers(entry) if self.cache else None
@@ -0,0 +1,118 @@
+import asyncio
+import concurrent.futures
+import functools
+import multiprocessing
+import os
+import threading
+import time
+
+from .host_scheduler import ASYNC_POLL_INTERVAL
+from .html_extractor import extract_facts
+
+
+def _timed_extract_facts(url, content, content_type):
+    """Runs in a worker process; returns the facts of a page and the seconds spent parsing it."""
+    started = time.perf_counter()
+    facts = extract_facts(url, content, content_type, True)
+    return facts, time.perf_counter() - started
+
+
+class ParsePool:
+    """Process pool that extracts page facts away from the threads doing network I/O.
+
+    Fetching threads hand over raw bodies and move on to their next download while
+    the pool parses on every core, so the GIL no longer caps parsing throughput.
+    The analyzer's checks and crawl use each page's facts in a callback once they
+    arrive; coroutines await them without blocking the event loop. At most
+    ``max_pending`` pages are queued or being parsed; callers beyond that wait for
+    a free slot before submitting, which holds back further fetches and keeps the
+    bodies in memory bounded.
+
+    Worker processes are started on first use with the "spawn" method, which is
+    safe to use from a process that already runs threads.
+
+    Args:
+        processes: Number of parser processes (defaults to the number of CPUs)
+        max_pending: Pages handed over but not yet parsed (defaults to 4 per process)
+        metrics: Metrics that parse times and the number of pending pages are recorded in
+    """
+
+    def __init__(self, processes=None, max_pending=None, metrics=None):
+        self.processes = processes or os.cpu_count() or 1
+        self.max_pending = max_pending or self.processes * 4
+        self.metrics = metrics
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def parse(self, page):
+        """Hands a fetched page to a worker process and returns without waiting for it.
+
+        The page's facts are filled in when they are first read, waiting for the
+        worker only if it has not finished yet; the body is dropped once they arrive.
+        """
+        if self._needs_parsing(page):
+            self._slots.acquire()
+            page.defer_facts(self._submit(page))
+        return page
+
+    async def parse_async(self, page):
+        """Coroutine version of parse() that awaits the facts without blocking the event loop."""
+        if self._needs_parsing(page):
+            while not self._slots.acquire(blocking=False):
+                await asyncio.sleep(ASYNC_POLL_INTERVAL)
+            page.set_facts(await asyncio.wrap_future(self._submit(page)))
+        return page
+
+    def shutdown(self):
+        """Stops the worker processes; they are started again on next use."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    def _needs_parsing(self, page):
+        # Error pages are never parsed and cached pages arrive with their facts
+        return page.ok and page.content and not page.from_cache
+
+    def _submit(self, page):
+        """Submits a page holding a slot; returns a future of its facts.
+
+        The slot is released when parsing finishes.
+        """
+        try:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = concurrent.futures.ProcessPoolExecutor(
+                        max_workers=self.processes, mp_context=multiprocessing.get_context('spawn')
+                    )
+                future = self._executor.submit(
+                    _timed_extract_facts, page.url, page.content, page.headers.get('content-type', '')
+                )
+                self._pending += 1
+                pending = self._pending
+        except Exception:
+            self._slots.release()
+            raise
+        if self.metrics is not None:
+            self.metrics.observe_queue("parse_pending", pending)
+        facts = concurrent.futures.Future()
+        future.add_done_callback(functools.partial(self._finished, facts))
+        return facts
+
+    def _finished(self, facts, future):
+        with self._lock:
+            self._pending -= 1
+            pending = self._pending
+        if self.metrics is not None:
+            self.metrics.observe_queue("parse_pending", pending)
+        self._slots.release()
+        try:
+            result, seconds = future.result()
+        except BaseException as e:
+            facts.set_exception(e)
+            return
+        if self.metrics is not None:
+            self.metrics.observe_parse(seconds)
+        facts.set_result(result)
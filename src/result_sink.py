@@ -0,0 +1,179 @@
+import collections
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Report keys, in the order analyze() produces them
+RESULT_KINDS = ("broken_links", "orphan_pages", "seo_issues", "weakly_linked_pages", "link_metrics")
+
+
+class ResultSink:
+    """Destination that receives findings one at a time as an analysis produces them.
+
+    ``write()`` is thread-safe; subclasses implement ``_write()`` and, if they
+    buffer, ``_flush()``. Buffered output is flushed at most every
+    ``flush_interval`` seconds, so readers can follow a running analysis.
+
+    Args:
+        flush_interval: Seconds between flushes of buffered findings
+    """
+
+    def __init__(self, flush_interval=1.0):
+        self.flush_interval = flush_interval
+        self.counts = collections.Counter()
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, kind, finding):
+        """Records one finding of ``kind`` (one of RESULT_KINDS)."""
+        with self._lock:
+            self.counts[kind] += 1
+            self._write(kind, finding)
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush()
+                self._last_flush = time.monotonic()
+
+    def flush(self):
+        """Writes out buffered findings."""
+        with self._lock:
+            self._flush()
+            self._last_flush = time.monotonic()
+
+    def close(self):
+        """Flushes buffered findings and releases the destination."""
+        self.flush()
+
+    def _write(self, kind, finding):
+        raise NotImplementedError
+
+    def _flush(self):
+        pass
+
+
+def _record(kind, finding):
+    """Returns a finding as a flat dict tagged with its kind (orphan pages are bare URLs)."""
+    record = {"kind": kind}
+    record.update(finding if isinstance(finding, dict) else {"url": finding})
+    return record
+
+
+class ListSink(ResultSink):
+    """Keeps findings in memory, one list per kind; backs the report dict of analyze().
+
+    Args:
+        kinds: Kinds of findings to keep (None keeps every kind)
+    """
+
+    def __init__(self, kinds=None):
+        super().__init__()
+        self.kinds = kinds
+        self.results = {kind: [] for kind in RESULT_KINDS}
+
+    def _write(self, kind, finding):
+        if self.kinds is None or kind in self.kinds:
+            self.results.setdefault(kind, []).append(finding)
+
+
+class TeeSink(ResultSink):
+    """Passes every finding on to several sinks."""
+
+    def __init__(self, *sinks):
+        super().__init__()
+        self.sinks = sinks
+
+    def _write(self, kind, finding):
+        for sink in self.sinks:
+            sink.write(kind, finding)
+
+    def _flush(self):
+        for sink in self.sinks:
+            sink.flush()
+
+
+class JsonlSink(ResultSink):
+    """Appends findings to a JSON Lines file, one ``{"kind": ..., "url": ...}`` object per line.
+
+    Args:
+        path: File to write (truncated unless ``append`` is True)
+        append: Add to an existing file instead of replacing it
+        flush_interval: Seconds between flushes to disk
+    """
+
+    def __init__(self, path, append=False, flush_interval=1.0):
+        super().__init__(flush_interval)
+        self.path = path
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8')
+
+    def _write(self, kind, finding):
+        self._file.write(json.dumps(_record(kind, finding)) + '\n')
+
+    def _flush(self):
+        if not self._file.closed:
+            self._file.flush()
+
+    def close(self):
+        super().close()
+        with self._lock:
+            self._file.close()
+
+
+class SqliteSink(ResultSink):
+    """Stores findings in an SQLite database indexed by kind and URL.
+
+    Each finding is a row of the ``findings`` table with its kind, URL and the full
+    finding as JSON, so large result sets can be queried without loading them.
+
+    Args:
+        path: SQLite database file (existing findings are kept unless ``clear`` is True)
+        clear: Delete findings left by a previous run
+        flush_interval: Seconds between commits
+    """
+
+    def __init__(self, path, clear=True, flush_interval=1.0):
+        super().__init__(flush_interval)
+        self.path = path
+        self._pending = []
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS findings (id INTEGER PRIMARY KEY, kind TEXT, url TEXT, finding TEXT)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS findings_kind ON findings (kind)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS findings_url ON findings (url)")
+        if clear:
+            self._db.execute("DELETE FROM findings")
+        self._db.commit()
+
+    def _write(self, kind, finding):
+        record = _record(kind, finding)
+        self._pending.append((kind, record["url"], json.dumps(record)))
+
+    def _flush(self):
+        if self._pending:
+            self._db.executemany("INSERT INTO findings (kind, url, finding) VALUES (?, ?, ?)", self._pending)
+            self._db.commit()
+            self._pending = []
+
+    def close(self):
+        super().close()
+        with self._lock:
+            self._db.close()
+
+
+def open_sink(path):
+    """Opens a JsonlSink or SqliteSink depending on the file extension of ``path``."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.jsonl', '.ndjson'):
+        return JsonlSink(path)
+    if extension in ('.db', '.sqlite', '.sqlite3'):
+        return SqliteSink(path)
+    raise ValueError(f"Unknown result file type: {path!r} (expected .jsonl or .db)")
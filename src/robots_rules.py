@@ -0,0 +1,187 @@
+import requests
+import collections
+import concurrent.futures
+import re
+import threading
+from urllib.parse import urlsplit
+from .host_scheduler import host_of
+
+RobotsGroup = collections.namedtuple('RobotsGroup', ['agents', 'rules', 'crawl_delay'])
+RobotsGroup.__doc__ = """One user-agent group of a robots.txt: its agents, (allow, path) rules and Crawl-delay."""
+
+
+def parse_robots(text):
+    """Parses robots.txt into its user-agent groups and Sitemap declarations.
+
+    Consecutive User-agent lines share the rules that follow them. Sitemap lines
+    are collected wherever they appear.
+
+    Returns:
+        A (groups, sitemaps) tuple of RobotsGroup objects and sitemap URLs.
+    """
+    groups = []
+    sitemaps = []
+    agents, rules, crawl_delay = [], [], None
+    in_rules = False
+    for line in text.splitlines():
+        line = line.split('#', 1)[0].strip()
+        if ':' not in line:
+            continue
+        field, value = (part.strip() for part in line.split(':', 1))
+        field = field.lower()
+        if field == 'sitemap':
+            if value:
+                sitemaps.append(value)
+        elif field == 'user-agent':
+            if in_rules:
+                groups.append(RobotsGroup(agents, rules, crawl_delay))
+                agents, rules, crawl_delay = [], [], None
+                in_rules = False
+            agents.append(value.lower())
+        elif field in ('allow', 'disallow'):
+            in_rules = True
+            if agents:
+                rules.append((field == 'allow', value))
+        elif field == 'crawl-delay':
+            in_rules = True
+            try:
+                crawl_delay = float(value)
+            except ValueError:
+                pass
+    if agents:
+        groups.append(RobotsGroup(agents, rules, crawl_delay))
+    return groups, sitemaps
+
+
+def _compile_pattern(path):
+    """Compiles a robots.txt path pattern, returning None for plain prefixes."""
+    if '*' not in path and not path.endswith('$'):
+        return None
+    anchored = path.endswith('$')
+    if anchored:
+        path = path[:-1]
+    regex = '.*'.join(re.escape(part) for part in path.split('*'))
+    return re.compile(regex + ('$' if anchored else ''))
+
+
+class RobotsRules:
+    """Compiled robots.txt rules of one host for one user agent.
+
+    Rules are kept sorted by pattern length (Allow first on ties), so the first rule
+    that matches a path is the longest match and decides whether it is allowed.
+    Plain paths are matched with a prefix test and only ``*``/``$`` patterns use a
+    regular expression.
+    """
+
+    def __init__(self, rules=(), crawl_delay=None, sitemaps=()):
+        self.crawl_delay = crawl_delay
+        self.sitemaps = list(sitemaps)
+        compiled = []
+        for allow, path in rules:
+            if not path:
+                # An empty Disallow allows everything and an empty Allow says nothing
+                continue
+            compiled.append((len(path), allow, path, _compile_pattern(path)))
+        compiled.sort(key=lambda rule: (-rule[0], not rule[1]))
+        self._rules = [(allow, path, pattern) for _, allow, path, pattern in compiled]
+
+    @classmethod
+    def from_text(cls, text, user_agent):
+        """Compiles the rules robots.txt sets for a user agent.
+
+        Groups naming the agent's product token take precedence over the ``*`` group;
+        several matching groups are merged.
+        """
+        token = user_agent.split('/')[0].strip().lower()
+        groups, sitemaps = parse_robots(text)
+        matching = [group for group in groups if token in group.agents]
+        if not matching:
+            matching = [group for group in groups if '*' in group.agents]
+        rules = [rule for group in matching for rule in group.rules]
+        delays = [group.crawl_delay for group in matching if group.crawl_delay is not None]
+        return cls(rules, delays[0] if delays else None, sitemaps)
+
+    def allowed(self, url):
+        """Whether the rules allow fetching a URL."""
+        parts = urlsplit(url)
+        path = parts.path or '/'
+        if path == '/robots.txt':
+            return True
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        for allow, prefix, pattern in self._rules:
+            matched = pattern.match(path) if pattern is not None else path.startswith(prefix)
+            if matched:
+                return allow
+        return True
+
+
+class RobotsCache:
+    """Fetches and compiles robots.txt once per host, sharing the rules between threads.
+
+    A robots.txt that cannot be fetched or returns an error status allows everything.
+    With a ``scheduler`` (HostScheduler), the Crawl-delay of every host's rules is
+    passed on to it as soon as the rules are compiled or added.
+    """
+
+    def __init__(self, session, user_agent, timeout=10, scheduler=None):
+        self.session = session
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.scheduler = scheduler
+        self._rules = {}
+        self._lock = threading.Lock()
+
+    def add(self, site, rules):
+        """Stores rules compiled from a robots.txt already fetched for a site (scheme://host)."""
+        future = concurrent.futures.Future()
+        future.set_result(rules)
+        with self._lock:
+            self._rules[site] = future
+        self._seed_crawl_delay(site, rules)
+
+    def cached(self, url):
+        """Returns the rules for a URL's site if they are already known, otherwise None."""
+        with self._lock:
+            future = self._rules.get(_site(url))
+        if future is not None and future.done():
+            return future.result()
+        return None
+
+    def rules_for(self, url):
+        """Returns the rules for a URL's site, fetching its robots.txt on first use."""
+        site = _site(url)
+        with self._lock:
+            future = self._rules.get(site)
+            owner = future is None
+            if owner:
+                future = concurrent.futures.Future()
+                self._rules[site] = future
+
+        if owner:
+            rules = self._fetch(site)
+            self._seed_crawl_delay(site, rules)
+            future.set_result(rules)
+        return future.result()
+
+    def allowed(self, url):
+        """Whether robots.txt of a URL's site allows fetching it."""
+        return self.rules_for(url).allowed(url)
+
+    def _seed_crawl_delay(self, site, rules):
+        if self.scheduler is not None and rules.crawl_delay is not None:
+            self.scheduler.set_crawl_delay(host_of(site), rules.crawl_delay)
+
+    def _fetch(self, site):
+        try:
+            response = self.session.get(f"{site}/robots.txt", timeout=self.timeout)
+        except requests.exceptions.RequestException:
+            return RobotsRules()
+        if not response.ok:
+            return RobotsRules()
+        return RobotsRules.from_text(response.text, self.user_agent)
+
+
+def _site(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
@@ -0,0 +1,88 @@
+import json
+import os
+import random
+from datetime import datetime, timezone
+
+
+def parse_lastmod(value):
+    """Parses a W3C datetime sitemap <lastmod> into an aware UTC datetime, or None."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+class RunManifest:
+    """Record of a previous analysis run used by incremental mode.
+
+    For every sitemap URL the manifest keeps its <lastmod> and the broken link and
+    SEO findings of the last time it was checked, so unchanged URLs can be carried
+    forward instead of being fetched again.
+    """
+
+    def __init__(self, path, started_at=None, urls=None):
+        self.path = path
+        self.started_at = started_at
+        self.urls = urls or {}
+
+    @classmethod
+    def load(cls, path):
+        """Loads the manifest at path, or returns an empty one if there is none yet."""
+        if not os.path.exists(path):
+            return cls(path)
+        with open(path) as f:
+            data = json.load(f)
+        return cls(path, parse_lastmod(data.get("started_at")), data.get("urls", {}))
+
+    def needs_check(self, url, lastmod, recheck_fraction=0.0):
+        """Decides whether a URL has to be rechecked in an incremental run.
+
+        URLs are rechecked when they are new, have no <lastmod>, or their <lastmod>
+        changed or moved past the previous run. A random ``recheck_fraction`` of the
+        remaining URLs is rechecked as well so stale results are eventually refreshed.
+        """
+        previous = self.urls.get(url)
+        if previous is None or self.started_at is None or not lastmod:
+            return True
+        if lastmod != previous.get("lastmod"):
+            return True
+        modified = parse_lastmod(lastmod)
+        if modified is None or modified > self.started_at:
+            return True
+        return random.random() < recheck_fraction
+
+    def carried_forward(self, url):
+        """Returns the (broken_link, seo_issue) findings recorded for a URL last time."""
+        previous = self.urls.get(url, {})
+        return previous.get("broken_link"), previous.get("seo_issue")
+
+    def save(self, started_at, lastmods, broken_links, seo_issues):
+        """Writes the manifest for a finished run.
+
+        Args:
+            started_at: Aware datetime the run started at
+            lastmods: Mapping of every sitemap URL to its <lastmod> (or None)
+            broken_links: Broken link findings of the run, including carried-forward ones
+            seo_issues: SEO findings of the run, including carried-forward ones
+        """
+        broken_by_url = {finding["url"]: finding for finding in broken_links}
+        seo_by_url = {finding["url"]: finding for finding in seo_issues}
+        urls = {}
+        for url, lastmod in lastmods.items():
+            urls[url] = {
+                "lastmod": lastmod,
+                "broken_link": broken_by_url.get(url),
+                "seo_issue": seo_by_url.get(url),
+            }
+
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, 'w') as f:
+            json.dump({"started_at": started_at.isoformat(), "urls": urls}, f)
+        os.replace(temporary_path, self.path)
+        self.started_at = started_at
+        self.urls = urls
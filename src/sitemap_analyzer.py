@@ -1,33 +1,188 @@
 import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urlparse, urljoin
+from urllib.parse import urlparse
+import collections
 import concurrent.futures
+import contextlib
+import itertools
 import logging
+import threading
 import time
+import xml.etree.ElementTree as ET
+import zlib
+from datetime import datetime, timezone
+from .async_engine import AsyncEngine
+from .checkpoint import Checkpoint
+from .crawl_frontier import FRONTIER_BYTES_PER_ENTRY, SpillingQueue, VisitedSet
+from .host_scheduler import HostScheduler, SchedulingAdapter, host_of
+from .http_archive import HttpArchive, RecordingAdapter, ReplayAdapter
+from .http_cache import HttpCache
+from .link_graph import LinkGraph
+from .log_handlers import Progress, queued_handler
+from .metrics import Metrics
+from .page_store import DEFAULT_MAX_BODY_BYTES, PageStore
+from .parse_pool import ParsePool
+from .result_sink import RESULT_KINDS, ListSink, TeeSink
+from .robots_rules import RobotsCache, RobotsRules, parse_robots
+from .run_manifest import RunManifest
+from .sitemap_parser import CHUNK_SIZE, SitemapEntry, UrlStream, iter_sitemap
+from .url_normalizer import normalize_url, url_key
 
 class SitemapAnalyzer:
-    def __init__(self, sitemap_url):
-        """Initializes the SitemapAnalyzer with the sitemap URL."""
-        # Set up logging
+    def __init__(self, sitemap_url, crawl_workers=10, max_crawl_depth=None, max_crawl_pages=None,
+                 engine="thread", max_concurrency=100, max_connections_per_host=10, sitemap_workers=8,
+                 cache_path=None, cache_max_bytes=256 * 1024 * 1024,
+                 incremental=False, manifest_path=None, recheck_fraction=0.05,
+                 rate_limit=None, max_retries=3, respect_robots=True, weak_link_threshold=1,
+                 memory_budget=None, checkpoint_path=None, checkpoint_interval=30, parse_workers=0,
+                 record_path=None, replay_path=None, replay_timing=False, max_body_bytes=DEFAULT_MAX_BODY_BYTES):
+        """Initializes the SitemapAnalyzer with the sitemap URL.
+
+        Args:
+            sitemap_url: Sitemap, robots.txt or any page URL of the site to analyze
+            crawl_workers: Number of threads fetching pages during the crawl
+            max_crawl_depth: Maximum link depth from the base URL to crawl (None for unlimited)
+            max_crawl_pages: Maximum number of pages to fetch during the crawl (None for unlimited)
+            engine: "thread" to run the checks on thread pools, or "async" to run them on a
+                single asyncio event loop (requires aiohttp)
+            max_concurrency: Maximum number of requests in flight with the async engine
+            max_connections_per_host: Upper bound of the adaptive number of concurrent
+                requests to a single host
+            sitemap_workers: Number of child sitemaps of a sitemap index fetched concurrently
+            cache_path: SQLite file for a persistent HTTP cache; pages are then revalidated
+                with conditional requests and reused on 304 (None disables caching)
+            cache_max_bytes: Size budget of the HTTP cache before old entries are evicted
+            incremental: Only recheck URLs whose <lastmod> changed since the previous run
+                recorded in manifest_path, carrying forward results for the rest
+            manifest_path: JSON file where each run records per-URL lastmod and findings
+            recheck_fraction: Share of unchanged URLs rechecked anyway in incremental mode
+            rate_limit: Requests per second per host when robots.txt sets no Crawl-delay
+                (None for unlimited)
+            max_retries: Retries for 429/5xx responses, timeouts and connection errors
+            respect_robots: Skip URLs robots.txt disallows for the analyzer's user agent;
+                sitemap URLs it disallows are reported as SEO issues instead of fetched
+            weak_link_threshold: Sitemap pages with at least one but no more than this many
+                inbound internal links are reported as weakly linked
+            memory_budget: Approximate bytes the crawl state may use (None for unbounded).
+                When set, the crawl frontier spills to disk, visited URLs move to a Bloom
+                filter on large sites and fetched pages are kept without their bodies
+            checkpoint_path: SQLite file where analyze() periodically records its progress
+                so resume() can continue an interrupted run (None disables checkpoints)
+            checkpoint_interval: Seconds between checkpoint flushes
+            parse_workers: Number of processes parsing fetched pages while the I/O
+                threads keep downloading (0 parses on the I/O threads themselves)
+            record_path: SQLite file where every HTTP request and response of the run is
+                archived for later replay
+            replay_path: Archive to answer every request from instead of the network,
+                for deterministic offline runs and profiling (thread engine only)
+            replay_timing: When replaying, wait each response's recorded latency
+                instead of answering at full speed
+            max_body_bytes: Most bytes downloaded from a single page body (None for
+                unlimited); only successful HTML responses are downloaded at all
+        """
+        if engine not in ("thread", "async"):
+            raise ValueError(f"Unknown engine: {engine!r} (expected 'thread' or 'async')")
+        if incremental and not manifest_path:
+            raise ValueError("Incremental mode requires a manifest_path")
+        if record_path and replay_path:
+            raise ValueError("record_path and replay_path cannot be used together")
+        if (record_path or replay_path) and engine == "async":
+            raise ValueError("Recording and replaying HTTP traffic requires the thread engine")
+
+        # Set up logging; records are written on a background thread so fetching threads never wait on the console
         self.logger = logging.getLogger(__name__)
         if not self.logger.handlers:
             handler = logging.StreamHandler()
             formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
             handler.setFormatter(formatter)
-            self.logger.addHandler(handler)
+            self.logger.addHandler(queued_handler(handler))
             self.logger.setLevel(logging.INFO)
         
+        # Phase timings, request latencies, queue depths and cache use of every run
+        self.metrics = Metrics()
+
         # Initialize session first (needed for sitemap discovery)
         self.session = requests.Session()
         self.session.headers.update({'User-Agent': 'SitemapAnalyzerBot/1.0'})
+        # Every request goes through the per-host politeness scheduler
+        self.scheduler = HostScheduler(max_connections_per_host, rate_limit=rate_limit,
+                                       max_retries=max_retries, logger=self.logger, metrics=self.metrics)
+        adapter = SchedulingAdapter(self.scheduler)
+        self.http_archive = None
+        if replay_path:
+            # Replayed responses come straight from the archive, so there is nothing to schedule
+            self.http_archive = HttpArchive(replay_path, read_only=True)
+            adapter = ReplayAdapter(self.http_archive, timing=replay_timing)
+        elif record_path:
+            self.http_archive = HttpArchive(record_path, clear=True)
+            adapter = RecordingAdapter(adapter, self.http_archive)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        user_agent = self.session.headers['User-Agent']
+        self.robots = RobotsCache(self.session, user_agent, scheduler=self.scheduler) if respect_robots else None
         self.visited = set()
-        
-        # Find the actual sitemap URL (handle robots.txt, common locations, etc.)
-        self.sitemap_url = self._find_sitemap_url(sitemap_url)
-        self.base_url = self._get_base_url(self.sitemap_url)
-        
-        self.logger.info(f"Initialized SitemapAnalyzer for {self.sitemap_url}")
-        self.logger.info(f"Base URL extracted: {self.base_url}")
+        self.crawl_workers = crawl_workers
+        self.max_crawl_depth = max_crawl_depth
+        self.max_crawl_pages = max_crawl_pages
+        self.engine = engine
+        self.max_concurrency = max_concurrency
+        self.max_connections_per_host = max_connections_per_host
+        self.sitemap_workers = sitemap_workers
+        self.http_cache = HttpCache(cache_path, cache_max_bytes) if cache_path else None
+        self.incremental = incremental
+        self.manifest_path = manifest_path
+        self.recheck_fraction = recheck_fraction
+        self.weak_link_threshold = weak_link_threshold
+        self.link_graph = None
+        self.memory_budget = memory_budget
+        self.max_body_bytes = max_body_bytes
+        self.parse_pool = ParsePool(parse_workers, metrics=self.metrics) if parse_workers else None
+        self.page_store = self._new_page_store()
+        self.checkpoint = Checkpoint(checkpoint_path, checkpoint_interval) if checkpoint_path else None
+
+        # The actual sitemap URL (robots.txt, common locations, etc.) is discovered
+        # lazily on first use, so creating an analyzer does not touch the network
+        self.input_url = sitemap_url
+        self._sitemap_url = None
+        self._base_url = None
+        self._sitemap_response = None
+        self._discovery_lock = threading.RLock()
+
+    @property
+    def sitemap_url(self):
+        """The discovered sitemap URL; discovery runs on first access."""
+        if self._sitemap_url is None:
+            self._discover()
+        return self._sitemap_url
+
+    @sitemap_url.setter
+    def sitemap_url(self, url):
+        self._sitemap_url = url
+        self._base_url = self._get_base_url(url)
+
+    @property
+    def base_url(self):
+        """The scheme and host of the discovered sitemap URL."""
+        if self._base_url is None:
+            self._discover()
+        return self._base_url
+
+    def _discover(self, keep_response=False):
+        """Runs sitemap discovery once.
+
+        The winning response is only left open, for _analyze() to read, with
+        ``keep_response``: an open response holds its host's slot, so callers that
+        only need the URL must not leave it behind.
+        """
+        with self._discovery_lock:
+            if self._sitemap_url is None:
+                with self.metrics.phase("discovery"):
+                    self._sitemap_url = self._find_sitemap_url(self.input_url)
+                self._base_url = self._get_base_url(self._sitemap_url)
+                self.logger.info(f"Initialized SitemapAnalyzer for {self._sitemap_url}")
+                self.logger.info(f"Base URL extracted: {self._base_url}")
+            if not keep_response and self._sitemap_response is not None:
+                self._sitemap_response.close()
+                self._sitemap_response = None
 
     def set_log_level(self, level):
         """Set the logging level for the analyzer.
@@ -42,43 +197,49 @@ class SitemapAnalyzer:
 
     def _get_base_url(self, url):
         """Extracts the base URL from a given URL."""
-        parsed_url = urlparse(url)
+        parsed_url = urlparse(normalize_url(url))
         return f"{parsed_url.scheme}://{parsed_url.netloc}"
 
+    def _is_sitemap_response(self, url, response):
+        """Checks whether a response looks like an XML or gzip-compressed sitemap."""
+        content_type = response.headers.get('content-type', '').lower()
+        return 'xml' in content_type or 'gzip' in content_type or urlparse(url).path.endswith('.gz')
+
     def _parse_robots_content(self, content):
         """Parse robots.txt content and extract URLs for analysis."""
         self.logger.info("Parsing robots.txt content for URLs")
         urls = []
-        
-        for line in content.split('\n'):
-            line = line.strip()
-            
-            # Extract URLs from various robots.txt directives
-            if line.lower().startswith(('allow:', 'disallow:')):
-                # Extract path from Allow/Disallow directives
-                path = line.split(':', 1)[1].strip()
-                if path and path != '/' and not path.startswith('*'):
-                    # Convert relative path to absolute URL
-                    if path.startswith('/'):
-                        full_url = f"{self.base_url}{path}"
-                        urls.append(full_url)
-                        self.logger.debug(f"Extracted URL from robots.txt: {full_url}")
-            
-            elif line.lower().startswith('sitemap:'):
-                # Still try to extract sitemap URLs even if we're using robots.txt
-                sitemap_url = line.split(':', 1)[1].strip()
-                self.logger.info(f"Found sitemap reference in robots.txt: {sitemap_url}")
-                
-                # Try to fetch and parse the sitemap
-                try:
-                    response = self.session.get(sitemap_url, timeout=10)
+        groups, sitemaps = parse_robots(content)
+
+        # Extract URLs from the Allow/Disallow paths of every group, skipping wildcard
+        # patterns and paths the analyzer itself is not allowed to fetch
+        for group in groups:
+            for _, path in group.rules:
+                if not path.startswith('/') or path == '/' or '*' in path or path.endswith('$'):
+                    continue
+                full_url = f"{self.base_url}{path}"
+                if full_url in urls or not self._allowed(full_url):
+                    continue
+                urls.append(full_url)
+                self.logger.debug("Extracted URL from robots.txt: %s", full_url)
+
+        for sitemap_url in sitemaps:
+            # Still try to extract sitemap URLs even if we're using robots.txt
+            self.logger.info(f"Found sitemap reference in robots.txt: {sitemap_url}")
+
+            # Try to fetch and parse the sitemap
+            try:
+                with self.session.get(sitemap_url, timeout=10, stream=True) as response:
                     response.raise_for_status()
-                    if 'xml' in response.headers.get('content-type', '').lower():
-                        sitemap_urls = self._parse_sitemap_content(response.content, response.headers.get('content-type', ''))
+                    if self._is_sitemap_response(sitemap_url, response):
+                        entries = self._iter_xml_sitemap_entries(response.iter_content(CHUNK_SIZE))
+                        sitemap_urls = [entry.loc for entry in entries]
                         urls.extend(sitemap_urls)
                         self.logger.info(f"Added {len(sitemap_urls)} URLs from referenced sitemap")
-                except requests.exceptions.RequestException as e:
-                    self.logger.warning(f"Could not fetch referenced sitemap {sitemap_url}: {e}")
+            except requests.exceptions.RequestException as e:
+                self.logger.warning(f"Could not fetch referenced sitemap {sitemap_url}: {e}")
+            except (ET.ParseError, zlib.error) as e:
+                self.logger.warning(f"Could not parse referenced sitemap {sitemap_url}: {e}")
         
         # If no URLs found from robots.txt, add common pages
         if not urls:
@@ -92,64 +253,191 @@ class SitemapAnalyzer:
 
     def _parse_sitemap_content(self, content, content_type):
         """Parse sitemap content and extract URLs, handling both regular sitemaps and sitemap indexes."""
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        return [entry.loc for entry in self._iter_sitemap_entries([content], content_type)]
+
+    def _iter_sitemap_entries(self, chunks, content_type):
+        """Yields SitemapEntry objects from a sitemap or robots.txt body as its chunks are parsed."""
         # Check if this is robots.txt content
         if 'robots.txt' in self.sitemap_url or 'text/plain' in content_type.lower():
             self.logger.info("Detected robots.txt file, extracting URLs from robots directives")
-            return self._parse_robots_content(content.decode('utf-8') if isinstance(content, bytes) else content)
-        
-        # Handle XML sitemaps
-        soup = BeautifulSoup(content, 'xml')
-        urls = []
-        
-        # Check if this is a sitemap index (contains sitemapindex tag)
-        if soup.find('sitemapindex'):
-            self.logger.info("Detected sitemap index file")
-            # Extract sitemap URLs from the index
-            sitemap_locs = soup.find_all('loc')
-            sitemap_urls = [loc.text for loc in sitemap_locs]
-            self.logger.info(f"Found {len(sitemap_urls)} sitemaps in index")
-            
-            # Fetch and parse each individual sitemap
-            for sitemap_url in sitemap_urls:
-                try:
-                    self.logger.debug(f"Fetching individual sitemap: {sitemap_url}")
-                    response = self.session.get(sitemap_url, timeout=10)
-                    response.raise_for_status()
-                    
-                    # Parse the individual sitemap
-                    individual_soup = BeautifulSoup(response.content, 'xml')
-                    individual_urls = [loc.text for loc in individual_soup.find_all('loc')]
-                    urls.extend(individual_urls)
-                    self.logger.debug(f"Added {len(individual_urls)} URLs from {sitemap_url}")
-                    
-                except requests.exceptions.RequestException as e:
-                    self.logger.warning(f"Failed to fetch individual sitemap {sitemap_url}: {e}")
-                    continue
-        else:
-            # Regular sitemap - extract URLs directly
-            self.logger.info("Detected regular sitemap file")
-            urls = [loc.text for loc in soup.find_all('loc')]
-        
-        return urls
+            content = b''.join(chunks).decode('utf-8', errors='replace')
+            for url in self._parse_robots_content(content):
+                yield SitemapEntry('url', url, None, None, None)
+            return
+
+        yield from self._iter_xml_sitemap_entries(chunks)
+
+    def _iter_xml_sitemap_entries(self, chunks):
+        """Yields the <url> entries of an XML sitemap, fetching the children of a sitemap index."""
+        sitemap_urls = []
+        url_count = 0
+        for entry in iter_sitemap(chunks):
+            if entry.kind == 'sitemap':
+                sitemap_urls.append(entry.loc)
+                continue
+            if url_count == 0:
+                self.logger.info("Detected regular sitemap file")
+            url_count += 1
+            yield entry
 
-    def analyze(self):
-        """Analyzes the sitemap and returns a report of issues."""
+        if not sitemap_urls:
+            return
+
+        self.logger.info("Detected sitemap index file")
+        self.logger.info(f"Found {len(sitemap_urls)} sitemaps in index")
+        yield from self._iter_sitemap_index_entries(sitemap_urls)
+
+    def _iter_sitemap_index_entries(self, sitemap_urls):
+        """Fetches the sitemaps of an index concurrently, yielding entries as each one completes.
+
+        Nested sitemap indexes are followed recursively; sitemaps that were already
+        scheduled are skipped so reference cycles terminate.
+        """
+        seen = {self.sitemap_url}
+        queue = collections.deque()
+        pending = {}
+
+        def schedule(locs):
+            for loc in locs:
+                if loc not in seen:
+                    seen.add(loc)
+                    queue.append(loc)
+
+        schedule(sitemap_urls)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.sitemap_workers) as executor:
+            while queue or pending:
+                while queue and len(pending) < self.sitemap_workers:
+                    sitemap_url = queue.popleft()
+                    pending[executor.submit(self._fetch_child_sitemap, sitemap_url)] = sitemap_url
+
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    sitemap_url = pending.pop(future)
+                    entries, child_sitemaps = future.result()
+                    if child_sitemaps:
+                        self.logger.info(f"Found {len(child_sitemaps)} nested sitemaps in {sitemap_url}")
+                        schedule(child_sitemaps)
+                    yield from entries
+
+    def _fetch_child_sitemap(self, sitemap_url):
+        """Fetches one sitemap referenced from an index.
+
+        Returns:
+            A (entries, sitemap_urls) tuple with the <url> entries it lists and, for a
+            nested index, the sitemaps it references.
+        """
+        self.logger.debug("Fetching individual sitemap: %s", sitemap_url)
+        entries = []
+        sitemap_urls = []
+        try:
+            with self.session.get(sitemap_url, timeout=10, stream=True) as response:
+                response.raise_for_status()
+                for entry in iter_sitemap(response.iter_content(CHUNK_SIZE)):
+                    if entry.kind == 'sitemap':
+                        sitemap_urls.append(entry.loc)
+                    else:
+                        entries.append(entry)
+        except requests.exceptions.RequestException as e:
+            self.logger.warning("Failed to fetch individual sitemap %s: %s", sitemap_url, e)
+        except (ET.ParseError, zlib.error) as e:
+            self.logger.warning("Failed to parse individual sitemap %s: %s", sitemap_url, e)
+        self.logger.debug("Added %d URLs from %s", len(entries), sitemap_url)
+        return entries, sitemap_urls
+
+    def analyze(self, resume=False, sink=None):
+        """Analyzes the sitemap and returns a report of issues.
+
+        With ``incremental=True`` only URLs whose <lastmod> changed since the run
+        recorded in ``manifest_path`` (plus a random ``recheck_fraction`` of the rest)
+        are checked for broken links and SEO issues; findings for the other URLs are
+        carried forward from the manifest. Orphan detection always covers every URL,
+        since link structure can change without any <lastmod> moving.
+
+        With a ``checkpoint_path`` the run records its progress as it goes; a fresh
+        run discards any earlier checkpoint, while ``resume=True`` continues from it.
+
+        Phase timings, request latencies, queue depths and cache hit ratios of the
+        run are collected in ``self.metrics`` (see Metrics.snapshot() and
+        Metrics.to_prometheus()).
+
+        Args:
+            resume: Continue the run recorded in the checkpoint
+            sink: ResultSink that receives each finding as soon as it is produced. The
+                returned report then holds the number of findings of each kind instead
+                of the findings themselves, so large runs never keep them in memory.
+        """
         self.logger.info("Starting sitemap analysis")
         start_time = time.time()
-        
+        started_at = datetime.now(timezone.utc)
+        replay = False
+        if self.checkpoint is not None:
+            if resume and self.checkpoint.load(self.input_url):
+                started_at = self.checkpoint.started_at
+                replay = self.checkpoint.sitemap_complete
+                if replay and self._sitemap_url is None and self.checkpoint.sitemap_url:
+                    # The crawl needs the base URL; take it from the checkpoint instead of discovering it again
+                    self.sitemap_url = self.checkpoint.sitemap_url
+                self.logger.info(f"Resuming analysis started at {started_at.isoformat()} from {self.checkpoint.path}")
+            else:
+                if resume:
+                    self.logger.info(f"No checkpoint of {self.input_url} found, starting a new analysis")
+                self.checkpoint.start(self.input_url, started_at)
         try:
-            self.logger.info(f"Fetching sitemap from {self.sitemap_url}")
-            response = self.session.get(self.sitemap_url, timeout=10)
-            response.raise_for_status()
-            
-            content_type = response.headers.get('content-type', '').lower()
-            self.logger.debug(f"Content type: {content_type}")
-            
-            # Parse sitemap content (handles both regular sitemaps and sitemap indexes)
-            urls = self._parse_sitemap_content(response.content, content_type)
-            self.logger.info(f"Found {len(urls)} URLs in total from sitemap(s)")
+            with self.metrics.phase("total"):
+                return self._analyze(start_time, started_at, replay, sink)
+        finally:
+            if self.checkpoint is not None:
+                self.checkpoint.flush()
+            if self.parse_pool is not None:
+                self.parse_pool.shutdown()
+            if self.http_archive is not None:
+                self.http_archive.flush()
+
+    def resume(self, sink=None):
+        """Resumes an interrupted analyze() run from its checkpoint and returns its report.
+
+        Sitemap URLs, finished checks and crawled pages are read back from the
+        checkpoint instead of being fetched again; the crawl frontier is rebuilt from
+        the links of the crawled pages. Once the checkpoint holds the whole sitemap,
+        sitemap discovery is skipped too. Falls back to a new run if the checkpoint
+        holds no run of this analyzer's URL.
+        """
+        if self.checkpoint is None:
+            raise ValueError("Resuming requires a checkpoint_path")
+        return self.analyze(resume=True, sink=sink)
+
+    def _analyze(self, start_time, started_at, replay, sink):
+        """Runs the analysis; ``replay`` reads the sitemap URLs from the checkpoint instead of the network."""
+        response = first_entry = None
+        try:
+            if replay:
+                self.logger.info(f"Reading sitemap URLs from checkpoint {self.checkpoint.path}")
+                entries = (SitemapEntry('url', url, lastmod, None, None)
+                           for url, lastmod in self.checkpoint.iter_urls())
+            else:
+                self._discover(keep_response=True)
+                sitemap_url = self._sitemap_url
+                if self.checkpoint is not None:
+                    self.checkpoint.record_sitemap_url(sitemap_url)
+                # Reuse the response discovery already opened instead of downloading it again
+                response, self._sitemap_response = self._sitemap_response, None
+                if response is None:
+                    self.logger.info(f"Fetching sitemap from {sitemap_url}")
+                    response = self.session.get(sitemap_url, timeout=10, stream=True)
+                    response.raise_for_status()
+                else:
+                    self.logger.info(f"Reading sitemap from {sitemap_url}")
+
+                content_type = response.headers.get('content-type', '').lower()
+                self.logger.debug(f"Content type: {content_type}")
+
+                # Parse sitemap content incrementally (handles both regular sitemaps and sitemap indexes)
+                entries = self._iter_sitemap_entries(response.iter_content(CHUNK_SIZE), content_type)
+            first_entry = next(entries, None)
             
-            if not urls:
+            if first_entry is None:
                 error_msg = "No URLs found in sitemap"
                 self.logger.error(error_msg)
                 return {"error": error_msg}
@@ -160,207 +448,638 @@ class SitemapAnalyzer:
         except Exception as e:
             self.logger.error(f"Error parsing sitemap: {e}")
             return {"error": f"Error parsing sitemap: {e}"}
+        finally:
+            # An open response holds its host's slot until it is closed
+            if response is not None and first_entry is None:
+                response.close()
 
-        self.logger.info("Starting parallel analysis tasks")
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            self.logger.info("Submitting broken links detection task")
-            broken_links_future = executor.submit(self.detect_broken_links, urls)
-            
-            self.logger.info("Submitting orphan pages detection task")
-            orphan_pages_future = executor.submit(self.detect_orphan_pages, urls)
-            
-            self.logger.info("Submitting SEO issues detection task")
-            seo_issues_future = executor.submit(self.detect_seo_issues, urls)
+        manifest = RunManifest.load(self.manifest_path) if self.manifest_path else None
+        incremental = self.incremental and manifest.started_at is not None
+        if self.incremental and not incremental:
+            self.logger.info("No previous run manifest found, running a full analysis")
+
+        # Every check reads from the same store so each page is downloaded once
+        self.page_store = self._new_page_store()
+        urls = UrlStream()
+        check_urls = UrlStream() if incremental else urls
+        # <lastmod> values are only needed to write the run manifest
+        lastmods = {} if manifest is not None else None
+        entries = itertools.chain([first_entry], entries)
+        if sink is None:
+            collected = ListSink()
+        else:
+            # The run manifest needs this run's findings; everything else is only streamed
+            collected = ListSink(kinds=("broken_links", "seo_issues")) if manifest is not None else None
+        findings = TeeSink(*[target for target in (sink, collected) if target is not None])
+
+        with response if response is not None else contextlib.nullcontext():
+            if self.engine == "async":
+                error = self._fill_url_stream(entries, urls, check_urls, lastmods, manifest if incremental else None)
+                if error:
+                    return {"error": error}
+                self.logger.info("Starting analysis tasks on the async engine")
+                engine = AsyncEngine(self, self.max_concurrency, self.max_connections_per_host)
+                engine.run(list(urls), list(check_urls), findings)
+            else:
+                self.logger.info("Starting parallel analysis tasks")
+                with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
+                    self.logger.info("Submitting broken links detection task")
+                    broken_links_future = executor.submit(self.detect_broken_links, check_urls, findings, head_first=False)
+
+                    self.logger.info("Submitting orphan pages detection task")
+                    orphan_pages_future = executor.submit(self.detect_orphan_pages, urls, findings)
+
+                    self.logger.info("Submitting SEO issues detection task")
+                    seo_issues_future = executor.submit(self.detect_seo_issues, check_urls, findings, head_only=False)
+
+                    # The checks consume URLs while the rest of the sitemap is still being read
+                    error = self._fill_url_stream(entries, urls, check_urls, lastmods, manifest if incremental else None)
+
+                    broken_links_future.result()
+                    orphan_pages_future.result()
+                    seo_issues_future.result()
+                if error:
+                    return {"error": error}
 
-            broken_links = broken_links_future.result()
-            orphan_pages = orphan_pages_future.result()
-            seo_issues = seo_issues_future.result()
+        self._link_graph_result(urls, self.link_graph, findings)
+
+        if incremental:
+            checked = set(check_urls)
+            for url in lastmods:
+                if url in checked:
+                    continue
+                broken_link, seo_issue = manifest.carried_forward(url)
+                if broken_link:
+                    findings.write("broken_links", broken_link)
+                if seo_issue:
+                    findings.write("seo_issues", seo_issue)
+            self.logger.info(f"Carried forward results for {len(lastmods) - len(checked)} unchanged URLs")
+
+        if manifest is not None:
+            manifest.save(started_at, lastmods, collected.results["broken_links"], collected.results["seo_issues"])
+            self.logger.info(f"Saved run manifest to {self.manifest_path}")
 
         end_time = time.time()
         self.logger.info(f"Analysis completed in {end_time - start_time:.2f} seconds")
-        self.logger.info(f"Found {len(broken_links)} broken links, {len(orphan_pages)} orphan pages, {len(seo_issues)} SEO issues")
+        counts = findings.counts
+        self.logger.info(f"Found {counts['broken_links']} broken links, {counts['orphan_pages']} orphan pages, "
+                         f"{counts['seo_issues']} SEO issues")
 
-        return {
-            "broken_links": broken_links,
-            "orphan_pages": orphan_pages,
-            "seo_issues": seo_issues
-        }
+        if sink is not None:
+            findings.flush()
+            return {kind: counts[kind] for kind in RESULT_KINDS}
+        return collected.results
 
-    def _check_link(self, url):
+    def _fill_url_stream(self, entries, urls, check_urls, lastmods, manifest=None):
+        """Feeds parsed sitemap entries into the URL streams; returns an error message if reading fails.
+
+        Every URL is normalized, and entries repeating a URL already seen (for example
+        in several children of a sitemap index) are dropped. Each remaining URL goes to
+        ``urls`` and, unless ``lastmods`` is None, has its <lastmod> recorded there.
+        When a previous run ``manifest`` is given, only URLs that need rechecking go to
+        ``check_urls``.
+        """
+        # Exact, unlike the crawl's visited set: a false positive would drop a sitemap URL from every check
+        seen = set()
+        duplicates = 0
         try:
-            response = self.session.get(url, timeout=5)
-            if response.status_code >= 400:
-                self.logger.warning(f"Broken link detected: {url} (Status: {response.status_code})")
-                return {"url": url, "status_code": response.status_code}
-            else:
-                self.logger.debug(f"Link OK: {url} (Status: {response.status_code})")
+            with self.metrics.phase("sitemap_parse"):
+                for entry in entries:
+                    url = normalize_url(entry.loc)
+                    key = url_key(url)
+                    if key in seen:
+                        duplicates += 1
+                        continue
+                    seen.add(key)
+                    if lastmods is not None:
+                        lastmods[url] = entry.lastmod
+                    if self.checkpoint is not None:
+                        self.checkpoint.record_url(url, entry.lastmod)
+                    urls.add(url)
+                    # URLs a resumed run already checked keep the decision of the first attempt
+                    if check_urls is not urls and (manifest.needs_check(url, entry.lastmod, self.recheck_fraction)
+                                                   or self._recorded_finding("broken_links", url)[0]):
+                        check_urls.add(url)
         except requests.exceptions.RequestException as e:
-            self.logger.warning(f"Connection error for {url}: {e}")
+            self.logger.error(f"Error fetching sitemap: {e}")
+            return f"Error fetching sitemap: {e}"
+        except Exception as e:
+            self.logger.error(f"Error parsing sitemap: {e}")
+            return f"Error parsing sitemap: {e}"
+        finally:
+            urls.close()
+            check_urls.close()
+        if self.checkpoint is not None:
+            self.checkpoint.mark_sitemap_complete()
+        self.logger.info(f"Found {len(urls)} URLs in total from sitemap(s)")
+        if duplicates:
+            self.logger.info(f"Dropped {duplicates} duplicate sitemap entries")
+        if check_urls is not urls:
+            self.logger.info(f"Rechecking {len(check_urls)} new or changed URLs")
+        return None
+
+    def _memory_share(self):
+        """Bytes of memory_budget granted to each bounded structure (None when unbounded).
+
+        The budget is split evenly between the crawl frontier, the crawl's visited
+        set and the page store.
+        """
+        return self.memory_budget // 3 if self.memory_budget is not None else None
+
+    def _new_page_store(self):
+        return PageStore(self.session, cache=self.http_cache, max_bytes=self._memory_share(),
+                         parse_pool=self.parse_pool, metrics=self.metrics, max_body_bytes=self.max_body_bytes)
+
+    def _new_visited_set(self):
+        return VisitedSet(self._memory_share())
+
+    def _new_frontier(self):
+        share = self._memory_share()
+        # However small the budget, one entry stays in memory so the queue can refill from disk
+        return SpillingQueue(max(1, share // FRONTIER_BYTES_PER_ENTRY) if share is not None else None)
+
+    def _allowed(self, url):
+        """Whether robots.txt allows fetching a URL (always True with respect_robots=False)."""
+        return self.robots is None or self.robots.allowed(url)
+
+    def _recorded_finding(self, kind, url):
+        """Returns a (found, finding) tuple for a check a resumed run already finished."""
+        if self.checkpoint is None:
+            return False, None
+        return self.checkpoint.finding(kind, url)
+
+    def _record_finding(self, kind, url, finding):
+        """Records the result of a finished check in the checkpoint, if there is one."""
+        if self.checkpoint is not None:
+            self.checkpoint.record_finding(kind, url, finding)
+
+    def _check_link(self, url, head_first=True):
+        found, finding = self._recorded_finding("broken_links", url)
+        if not found:
+            finding = self._link_finding(url, head_first)
+            self._record_finding("broken_links", url, finding)
+        return finding
+
+    def _link_finding(self, url, head_first):
+        if not self._allowed(url):
+            self.logger.debug("Skipping link check for %s: disallowed by robots.txt", url)
+            return None
+        if head_first:
+            return self._link_result(url, self.page_store.head(url))
+        return self._link_result(url, self.page_store.get(url))
+
+    def _link_result(self, url, page):
+        """Returns a broken link finding for a fetched page, or None if the link works.
+
+        Only broken links carry the redirect chain that led to them; redirects ending
+        in a working page are logged at DEBUG level and not reported.
+        """
+        if page.error is not None:
+            self.logger.warning("Connection error for %s: %s", url, page.error)
             return {"url": url, "status_code": "Connection Error"}
+        if page.redirects:
+            self.logger.debug("Followed %d redirect(s) for %s", len(page.redirects), url)
+        if page.status_code >= 400:
+            self.logger.warning("Broken link detected: %s (Status: %s)", url, page.status_code)
+            finding = {"url": url, "status_code": page.status_code}
+            if page.redirects:
+                finding["redirects"] = page.redirects
+            return finding
+        self.logger.debug("Link OK: %s (Status: %s)", url, page.status_code)
         return None
 
-    def detect_broken_links(self, urls):
-        """Identifies and reports broken links."""
+    def detect_broken_links(self, urls, sink=None, *, head_first=True):
+        """Identifies and reports broken links.
+
+        Args:
+            urls: URLs to check
+            sink: ResultSink to stream broken links to as they are found
+            head_first: Check links with HEAD requests (falling back to a bodyless GET)
+                instead of downloading every page. analyze() turns this off because the
+                SEO check downloads the same pages anyway.
+
+        Returns:
+            The list of broken links, or their number when streaming to ``sink``
+        """
         self.logger.info(f"Starting broken links detection for {len(urls)} URLs")
-        broken_links = []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            futures = [executor.submit(self._check_link, url) for url in urls]
+        findings = sink if sink is not None else ListSink()
+        found = 0
+        with self.metrics.phase("broken_links"), concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
+            futures = [executor.submit(self._check_link, url, head_first) for url in urls]
+            progress = Progress(self.logger, "Checked {done}/{total} links for broken status")
             for i, future in enumerate(concurrent.futures.as_completed(futures)):
-                if (i + 1) % 10 == 0:
-                    self.logger.info(f"Checked {i + 1}/{len(urls)} links for broken status")
+                progress.update(i + 1, len(urls))
                 result = future.result()
                 if result:
-                    broken_links.append(result)
-        self.logger.info(f"Broken links detection completed. Found {len(broken_links)} broken links")
-        return broken_links
+                    found += 1
+                    findings.write("broken_links", result)
+        self.logger.info(f"Broken links detection completed. Found {found} broken links")
+        return found if sink is not None else findings.results["broken_links"]
+
+    def detect_orphan_pages(self, urls, sink=None):
+        """Identifies and reports orphan pages.
 
-    def detect_orphan_pages(self, urls):
-        """Identifies and reports orphan pages."""
+        Returns:
+            The list of orphan pages, or their number when streaming to ``sink``
+        """
         self.logger.info(f"Starting orphan pages detection for {len(urls)} URLs")
         self.logger.info("Crawling website to discover internal links")
-        internal_links = self.crawl_website()
-        self.logger.info(f"Found {len(internal_links)} internal links during crawling")
-        orphan_pages = [url for url in urls if url not in internal_links]
-        self.logger.info(f"Orphan pages detection completed. Found {len(orphan_pages)} orphan pages")
-        if orphan_pages:
-            self.logger.warning(f"Orphan pages found: {orphan_pages[:5]}{'...' if len(orphan_pages) > 5 else ''}")
-        return orphan_pages
-
-    def _check_seo(self, url):
-        try:
-            response = self.session.get(url, timeout=5)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            description_tag = soup.find('meta', attrs={'name': 'description'})
-            description_content = description_tag.get('content') if description_tag else None
-            if not description_content or not description_content.strip():
-                self.logger.debug(f"SEO issue detected: Missing meta description for {url}")
-                return {"url": url, "issue": "Missing meta description"}
-            else:
-                self.logger.debug(f"SEO check passed: {url} has meta description")
-        except requests.exceptions.RequestException as e:
-            self.logger.warning(f"Error fetching page for SEO check {url}: {e}")
+        link_graph = self.crawl_website()
+        return self._orphan_result(urls, link_graph, sink)
+
+    def _orphan_result(self, urls, link_graph, sink=None):
+        """Reports the sitemap URLs that were never linked from another crawled page."""
+        self.logger.info(f"Link graph holds {len(link_graph)} URLs and {link_graph.link_count} internal links")
+        inbound = link_graph.metrics().inbound
+        findings = sink if sink is not None else ListSink()
+        examples = []
+        found = 0
+        for url in urls:
+            node = link_graph.lookup(url)
+            if node is None or inbound[node] == 0:
+                found += 1
+                findings.write("orphan_pages", url)
+                if len(examples) < 5:
+                    examples.append(url)
+        self.logger.info(f"Orphan pages detection completed. Found {found} orphan pages")
+        if found:
+            self.logger.warning(f"Orphan pages found: {examples}{'...' if found > 5 else ''}")
+        return found if sink is not None else findings.results["orphan_pages"]
+
+    def _link_graph_result(self, urls, link_graph, sink):
+        """Reports per-URL link metrics and the weakly linked pages among the sitemap URLs.
+
+        Outbound links and click depth are None for pages the crawl did not fetch or reach.
+        """
+        metrics = link_graph.metrics()
+        weakly_linked = 0
+        for url in urls:
+            node = link_graph.lookup(url)
+            inbound = outbound = depth = None
+            if node is not None:
+                inbound = int(metrics.inbound[node])
+                outbound = int(metrics.outbound[node])
+                depth = int(metrics.depth[node])
+            sink.write("link_metrics", {
+                "url": url,
+                "inbound_links": inbound or 0,
+                "outbound_links": outbound if outbound is not None and outbound >= 0 else None,
+                "click_depth": depth if depth is not None and depth >= 0 else None,
+            })
+            if inbound and inbound <= self.weak_link_threshold:
+                weakly_linked += 1
+                sink.write("weakly_linked_pages", {"url": url, "inbound_links": inbound})
+        self.logger.info(f"Found {weakly_linked} weakly linked pages")
+
+    def _check_seo(self, url, head_only=False):
+        """Returns the SEO finding of a URL, or a future of it while its page is being parsed."""
+        found, finding = self._recorded_finding("seo_issues", url)
+        if found:
+            return finding
+        if not self._allowed(url):
+            finding = self._disallowed_result(url)
+            self._record_finding("seo_issues", url, finding)
+            return finding
+        return self._after_parse(self.page_store.get(url, head_only=head_only),
+                                 lambda page: self._record_seo_result(url, page))
+
+    def _record_seo_result(self, url, page):
+        finding = self._seo_result(url, page)
+        self._record_finding("seo_issues", url, finding)
+        return finding
+
+    def _disallowed_result(self, url):
+        """Returns the SEO finding for a sitemap URL that robots.txt disallows."""
+        self.logger.debug("SEO issue detected: %s is listed in the sitemap but disallowed by robots.txt", url)
+        return {"url": url, "issue": "Disallowed by robots.txt"}
+
+    def _seo_result(self, url, page):
+        """Returns an SEO finding for a fetched page, or None if it passes."""
+        if not page.ok:
+            error = page.error or f"HTTP {page.status_code}"
+            self.logger.warning("Error fetching page for SEO check %s: %s", url, error)
             return {"url": url, "issue": "Error fetching page"}
+        description_content = page.meta_description
+        if not description_content or not description_content.strip():
+            self.logger.debug("SEO issue detected: Missing meta description for %s", url)
+            return {"url": url, "issue": "Missing meta description"}
+        self.logger.debug("SEO check passed: %s has meta description", url)
         return None
 
-    def detect_seo_issues(self, urls):
-        """Identifies and reports potential SEO issues (missing descriptions)."""
+    def detect_seo_issues(self, urls, sink=None, *, head_only=True):
+        """Identifies and reports potential SEO issues (missing descriptions).
+
+        Args:
+            urls: URLs to check
+            sink: ResultSink to stream SEO issues to as they are found
+            head_only: Stop downloading each page once its <head> has arrived.
+                analyze() turns this off because the crawl needs the full pages anyway.
+
+        Returns:
+            The list of SEO issues, or their number when streaming to ``sink``
+        """
         self.logger.info(f"Starting SEO issues detection for {len(urls)} URLs")
-        seo_issues = []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            futures = [executor.submit(self._check_seo, url) for url in urls]
+        findings = sink if sink is not None else ListSink()
+        found = 0
+        with self.metrics.phase("seo"), concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
+            futures = [self._submit(executor, self._check_seo, url, head_only) for url in urls]
+            progress = Progress(self.logger, "Checked {done}/{total} pages for SEO issues")
             for i, future in enumerate(concurrent.futures.as_completed(futures)):
-                if (i + 1) % 10 == 0:
-                    self.logger.info(f"Checked {i + 1}/{len(urls)} pages for SEO issues")
+                progress.update(i + 1, len(urls))
                 result = future.result()
                 if result:
-                    seo_issues.append(result)
-        self.logger.info(f"SEO issues detection completed. Found {len(seo_issues)} SEO issues")
-        return seo_issues
+                    found += 1
+                    findings.write("seo_issues", result)
+        self.logger.info(f"SEO issues detection completed. Found {found} SEO issues")
+        return found if sink is not None else findings.results["seo_issues"]
 
     def crawl_website(self):
-      """Crawls the entire website to extract internal links."""
-      self.logger.info(f"Starting website crawl from {self.base_url}")
-      internal_links = set()
-      self.visited = set()
-      self.crawl_page(self.base_url, internal_links)
-      self.logger.info(f"Website crawl completed. Discovered {len(internal_links)} internal links")
-      return internal_links
-
-    def crawl_page(self, url, internal_links):
-      """Recursively crawls a single page and extracts links."""
-      if url in self.visited:
-        return
-
-      self.visited.add(url)
-      self.logger.debug(f"Crawling page: {url}")
-      
-      if len(self.visited) % 10 == 0:
-          self.logger.info(f"Crawled {len(self.visited)} pages so far")
-      
-      try:
-          response = self.session.get(url, timeout=5)
-          response.raise_for_status()
-          soup = BeautifulSoup(response.content, 'html.parser')
-          links_found = 0
-          for link in soup.find_all('a', href=True):
-              absolute_url = urljoin(url, link['href'])
-              if absolute_url.startswith(self.base_url):
-                  if absolute_url not in internal_links:
-                      internal_links.add(absolute_url)
-                      links_found += 1
-                  self.crawl_page(absolute_url, internal_links)
-          self.logger.debug(f"Found {links_found} new internal links on {url}")
-      except requests.exceptions.RequestException as e:
-          self.logger.warning(f"Error crawling {url}: {e}")
+        """Crawls the website breadth-first from the base URL and returns its LinkGraph.
+
+        Pages are fetched by a pool of ``crawl_workers`` threads fed from an explicit
+        frontier queue, bounded by ``max_crawl_depth`` and ``max_crawl_pages``. With a
+        ``memory_budget`` the frontier spills to disk and ``visited`` may become a
+        Bloom filter.
+        """
+        self.logger.info(f"Starting website crawl from {self.base_url}")
+        start_url = normalize_url(self.base_url)
+        link_graph = self.link_graph = LinkGraph(start_url)
+        # visited holds url_key() identities so URL variants are fetched only once
+        self.visited = self._new_visited_set()
+        self.visited.add(url_key(start_url))
+        if not self._allowed(start_url):
+            self.logger.warning(f"robots.txt disallows crawling {self.base_url}")
+            return link_graph
+        frontier = self._new_frontier()
+        for link, depth in self._restore_crawl(link_graph):
+            if self._allowed(link):
+                frontier.append((link, depth))
+        pages_crawled = link_graph.page_count
+        if not pages_crawled:
+            frontier.append((start_url, 0))
+        in_flight = {}
+        progress = Progress(self.logger, "Crawled {done} pages so far")
+
+        with self.metrics.phase("crawl"), frontier, \
+                concurrent.futures.ThreadPoolExecutor(max_workers=self.crawl_workers) as executor:
+            while frontier or in_flight:
+                # Keep the pool busy without materialising the whole frontier as futures
+                while frontier and len(in_flight) < self.crawl_workers * 2:
+                    if self.max_crawl_pages is not None and pages_crawled >= self.max_crawl_pages:
+                        self.logger.info(f"Reached crawl limit of {self.max_crawl_pages} pages")
+                        frontier.clear()
+                        break
+                    url, depth = frontier.popleft()
+                    in_flight[self._submit(executor, self._crawl_page, url)] = (url, depth)
+                    pages_crawled += 1
+                    progress.update(pages_crawled)
+                self.metrics.observe_queue("crawl_frontier", len(frontier))
+                self.metrics.observe_queue("crawl_in_flight", len(in_flight))
+
+                if not in_flight:
+                    break
+                done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    url, depth = in_flight.pop(future)
+                    links = future.result()
+                    link_graph.add_page(url, links)
+                    if self.checkpoint is not None:
+                        self.checkpoint.record_page(url, depth, links)
+                    for link in links:
+                        key = url_key(link)
+                        if key in self.visited:
+                            continue
+                        if self.max_crawl_depth is not None and depth + 1 > self.max_crawl_depth:
+                            continue
+                        if not self._allowed(link):
+                            continue
+                        self.visited.add(key)
+                        frontier.append((link, depth + 1))
+
+        self.logger.info(f"Website crawl completed. Crawled {link_graph.page_count} pages "
+                         f"with {link_graph.link_count} internal links")
+        return link_graph
+
+    def _restore_crawl(self, link_graph):
+        """Replays the crawled pages a resumed run recorded into link_graph and ``visited``.
+
+        Yields:
+            (link, depth) pairs for the links of those pages that were never crawled,
+            which make up the frontier the interrupted crawl left behind
+        """
+        if self.checkpoint is None:
+            return
+        for url, depth, links in self.checkpoint.iter_pages():
+            link_graph.add_page(url, links)
+            self.visited.add(url_key(url))
+        if not link_graph.page_count:
+            return
+        self.logger.info(f"Restored {link_graph.page_count} crawled pages from checkpoint")
+        for url, depth, links in self.checkpoint.iter_pages():
+            if self.max_crawl_depth is not None and depth + 1 > self.max_crawl_depth:
+                continue
+            for link in links:
+                key = url_key(link)
+                if key not in self.visited:
+                    self.visited.add(key)
+                    yield link, depth + 1
+
+    def crawl_page(self, url):
+        """Fetches a single page and returns the internal links found on it."""
+        links = self._crawl_page(url)
+        return links.result() if isinstance(links, concurrent.futures.Future) else links
+
+    def _crawl_page(self, url):
+        """Fetches a page for the crawl; returns its links, or a future of them while it is being parsed."""
+        if not self._allowed(url):
+            self.logger.debug("Skipping crawl of %s: disallowed by robots.txt", url)
+            return []
+        self.logger.debug("Crawling page: %s", url)
+        return self._after_parse(self.page_store.get(url), lambda page: self._page_links(url, page))
+
+    @staticmethod
+    def _after_parse(page, consume):
+        """Returns a future of ``consume(page)``, called once reading the page's facts no longer waits.
+
+        With a parse pool the facts arrive from a worker process, so the thread that
+        fetched the page does not wait for them.
+        """
+        result = concurrent.futures.Future()
+
+        def deliver(page):
+            try:
+                result.set_result(consume(page))
+            except Exception as e:
+                result.set_exception(e)
+
+        page.when_parsed(deliver)
+        return result
+
+    @staticmethod
+    def _submit(executor, fn, *args):
+        """Runs ``fn(*args)`` on executor; returns a future of its result.
+
+        ``fn`` may return a future of its result instead (see _after_parse), which
+        frees the executor thread for its next task before that future completes.
+        """
+        result = concurrent.futures.Future()
+
+        def settle(future):
+            try:
+                value = future.result()
+            except BaseException as e:
+                result.set_exception(e)
+                return
+            if isinstance(value, concurrent.futures.Future):
+                value.add_done_callback(settle)
+            else:
+                result.set_result(value)
+
+        executor.submit(fn, *args).add_done_callback(settle)
+        return result
+
+    def _page_links(self, url, page):
+        """Returns the normalized internal links of a fetched page."""
+        if not page.ok:
+            self.logger.warning("Error crawling %s: %s", url, page.error or f"HTTP {page.status_code}")
+            return []
+
+        links = []
+        site_prefix = f"{self.base_url}/"
+        for absolute_url in page.links:
+            absolute_url = normalize_url(absolute_url)
+            if absolute_url.startswith(site_prefix):
+                links.append(absolute_url)
+        self.logger.debug("Found %d internal links on %s", len(links), url)
+        return links
 
     def _find_sitemap_url(self, url):
-        """Find the actual sitemap URL by checking robots.txt or common locations."""
+        """Find the actual sitemap URL by checking robots.txt or common locations.
+
+        All candidate locations are probed concurrently with streamed requests, so only
+        headers are read until a winner is chosen. The winning response is kept open
+        for analyze() to read; the others are closed without downloading their bodies
+        as soon as a better candidate has answered.
+        """
         self.logger.info(f"Attempting to find sitemap URL from: {url}")
-        
-        # If URL already ends with sitemap.xml, try it first
-        if url.endswith('sitemap.xml'):
-            try:
-                response = self.session.get(url, timeout=10)
-                response.raise_for_status()
-                # Check if it's actually XML content
-                if 'xml' in response.headers.get('content-type', '').lower():
-                    self.logger.info(f"Found valid sitemap at: {url}")
-                    return url
-            except requests.exceptions.RequestException as e:
-                self.logger.warning(f"Failed to fetch sitemap at {url}: {e}")
-        
-        # Try to find sitemap from robots.txt
         base_url = self._get_base_url(url)
         robots_url = f"{base_url}/robots.txt"
-        
-        self.logger.info(f"Checking robots.txt at: {robots_url}")
-        try:
-            response = self.session.get(robots_url, timeout=10)
-            response.raise_for_status()
-            robots_content = response.text
-            
-            # Look for sitemap declarations in robots.txt
-            for line in robots_content.split('\n'):
-                line = line.strip()
-                if line.lower().startswith('sitemap:'):
-                    sitemap_url = line.split(':', 1)[1].strip()
-                    self.logger.info(f"Found sitemap URL in robots.txt: {sitemap_url}")
-                    
-                    # Verify the sitemap URL works
-                    try:
-                        sitemap_response = self.session.get(sitemap_url, timeout=10)
-                        sitemap_response.raise_for_status()
-                        if 'xml' in sitemap_response.headers.get('content-type', '').lower():
-                            return sitemap_url
-                    except requests.exceptions.RequestException:
-                        self.logger.warning(f"Sitemap URL from robots.txt is not accessible: {sitemap_url}")
-                        continue
-        
-        except requests.exceptions.RequestException as e:
-            self.logger.warning(f"Failed to fetch robots.txt: {e}")
-        
-        # Try common sitemap locations
+
+        # If URL already ends with sitemap.xml, it takes precedence over everything else
+        direct_urls = [url] if url.endswith(('sitemap.xml', '.xml.gz')) else []
+
+        # Common sitemap locations, tried after the ones declared in robots.txt
         common_sitemap_paths = [
             '/sitemap.xml',
             '/sitemap_index.xml',
             '/sitemaps.xml',
-            '/sitemap1.xml'
+            '/sitemap1.xml',
+            '/sitemap.xml.gz'
         ]
-        
-        self.logger.info("Trying common sitemap locations")
-        for path in common_sitemap_paths:
-            test_url = f"{base_url}{path}"
-            try:
-                response = self.session.get(test_url, timeout=10)
-                response.raise_for_status()
-                if 'xml' in response.headers.get('content-type', '').lower():
-                    self.logger.info(f"Found sitemap at common location: {test_url}")
-                    return test_url
-            except requests.exceptions.RequestException:
-                self.logger.debug(f"No sitemap found at: {test_url}")
-                continue
-        
+        common_urls = [f"{base_url}{path}" for path in common_sitemap_paths]
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(common_urls) + 2) as executor:
+            self.logger.info(f"Checking robots.txt at: {robots_url}")
+            robots_future = executor.submit(self._fetch_robots, robots_url)
+            probes = {}
+            for candidate in dict.fromkeys(direct_urls + common_urls):
+                probes[executor.submit(self._probe_sitemap, candidate)] = candidate
+
+            # Probes are taken as they finish, keeping only the best response so far open:
+            # an open response holds its host's slot, which a pending probe may still need
+            robots_urls = []
+            winner = None
+            discarded = set()
+            failed = set()
+            pending = set(probes) | {robots_future}
+            while pending:
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    if future is robots_future:
+                        robots_response = future.result()
+                        robots_urls = self._read_robots(base_url, robots_url, robots_response)
+                        for sitemap_url in dict.fromkeys(robots_urls):
+                            if sitemap_url in failed:
+                                self.logger.warning(f"Sitemap URL from robots.txt is not accessible: {sitemap_url}")
+                            # Probe again a location closed before robots.txt ranked it higher
+                            elif sitemap_url not in probes.values() or sitemap_url in discarded:
+                                discarded.discard(sitemap_url)
+                                probe = executor.submit(self._probe_sitemap, sitemap_url)
+                                probes[probe] = sitemap_url
+                                pending.add(probe)
+                        continue
+
+                    candidate = probes[future]
+                    response = future.result()
+                    if response is None:
+                        failed.add(candidate)
+                        if candidate in robots_urls:
+                            self.logger.warning(f"Sitemap URL from robots.txt is not accessible: {candidate}")
+                        continue
+                    ranking = list(dict.fromkeys(direct_urls + robots_urls + common_urls))
+                    if winner is not None and ranking.index(winner) <= ranking.index(candidate):
+                        response.close()
+                        discarded.add(candidate)
+                        continue
+                    if winner is not None:
+                        self._sitemap_response.close()
+                        discarded.add(winner)
+                    winner = candidate
+                    self._sitemap_response = response
+
+        if winner in direct_urls:
+            self.logger.info(f"Found valid sitemap at: {winner}")
+        elif winner in common_urls and winner not in robots_urls:
+            self.logger.info(f"Found sitemap at common location: {winner}")
+        if winner is not None:
+            return winner
+
         # Final fallback: use robots.txt as source for URLs if no sitemap found
         self.logger.warning("No sitemap found, falling back to robots.txt for URL extraction")
-        return robots_url
\ No newline at end of file
+        self._sitemap_response = robots_response
+        return robots_url
+
+    def _read_robots(self, base_url, robots_url, robots_response):
+        """Compiles a fetched robots.txt for the crawl and checks; returns the sitemaps it declares."""
+        if robots_response is None:
+            if self.robots is not None:
+                # Nothing to obey; remember that instead of fetching robots.txt again later
+                self.robots.add(base_url, RobotsRules())
+            return []
+        # robots.txt is compiled once; the crawl and checks reuse the rules
+        rules = RobotsRules.from_text(robots_response.text, self.session.headers['User-Agent'])
+        if self.robots is not None:
+            # The cache also passes the rules' Crawl-delay on to the scheduler
+            self.robots.add(base_url, rules)
+        elif rules.crawl_delay is not None:
+            self.scheduler.set_crawl_delay(host_of(robots_url), rules.crawl_delay)
+        for sitemap_url in rules.sitemaps:
+            self.logger.info(f"Found sitemap URL in robots.txt: {sitemap_url}")
+        return list(rules.sitemaps)
+
+    def _fetch_robots(self, robots_url):
+        """Fetches robots.txt, returning the response or None if it is not available."""
+        try:
+            response = self.session.get(robots_url, timeout=10)
+            response.raise_for_status()
+            return response
+        except requests.exceptions.RequestException as e:
+            self.logger.warning(f"Failed to fetch robots.txt: {e}")
+            return None
+
+    def _probe_sitemap(self, url):
+        """Opens a streamed request to a candidate sitemap URL.
+
+        Returns:
+            The open response if it looks like a sitemap, otherwise None.
+        """
+        try:
+            response = self.session.get(url, timeout=10, stream=True)
+        except requests.exceptions.RequestException as e:
+            self.logger.debug("No sitemap found at: %s (%s)", url, e)
+            return None
+        if response.ok and self._is_sitemap_response(url, response):
+            return response
+        self.logger.debug("No sitemap found at: %s (Status: %s)", url, response.status_code)
+        response.close()
+        return None
@@ -0,0 +1,165 @@
+import collections
+import itertools
+import threading
+import xml.etree.ElementTree as ET
+import zlib
+
+# Bytes read from a sitemap response per parser feed
+CHUNK_SIZE = 64 * 1024
+GZIP_MAGIC = b'\x1f\x8b'
+
+SitemapEntry = collections.namedtuple('SitemapEntry', ['kind', 'loc', 'lastmod', 'changefreq', 'priority'])
+SitemapEntry.__doc__ = """A single <url> ("url") or <sitemap> ("sitemap") entry of a sitemap document."""
+
+ENTRY_TAGS = {'url', 'sitemap'}
+FIELD_TAGS = {'loc', 'lastmod', 'changefreq', 'priority'}
+
+
+def _split_tag(tag):
+    """Splits an ElementTree tag into its (namespace, local name) parts."""
+    if tag.startswith('{'):
+        namespace, name = tag[1:].split('}', 1)
+        return namespace, name
+    return '', tag
+
+
+class SitemapParser:
+    """Incremental parser for sitemap and sitemap index documents.
+
+    Raw bytes are fed as they arrive and every completed <url> or <sitemap> entry
+    is returned as a SitemapEntry. Entries are discarded from the tree once read,
+    so memory stays flat regardless of document size.
+    """
+
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=('start', 'end'))
+        self._root = None
+        self._depth = 0
+
+    def feed(self, data):
+        """Feeds a chunk of the document and returns the entries completed by it."""
+        self._parser.feed(data)
+        return list(self._read_events())
+
+    def close(self):
+        """Finishes parsing and returns any remaining entries."""
+        self._parser.close()
+        return list(self._read_events())
+
+    def _read_events(self):
+        for event, element in self._parser.read_events():
+            if event == 'start':
+                self._depth += 1
+                if self._root is None:
+                    self._root = element
+                continue
+
+            self._depth -= 1
+            if self._depth != 1:
+                continue
+
+            namespace, kind = _split_tag(element.tag)
+            if kind in ENTRY_TAGS:
+                fields = {}
+                for child in element:
+                    child_namespace, name = _split_tag(child.tag)
+                    # Skip extension tags such as <image:loc> or <xhtml:link>
+                    if child_namespace == namespace and name in FIELD_TAGS and child.text:
+                        fields[name] = child.text.strip()
+                if fields.get('loc'):
+                    yield SitemapEntry(
+                        kind,
+                        fields['loc'],
+                        fields.get('lastmod'),
+                        fields.get('changefreq'),
+                        fields.get('priority'),
+                    )
+            # Drop finished entries so the tree never grows past one entry
+            self._root.clear()
+
+
+def iter_decompressed(chunks):
+    """Yields the chunks of a body, gunzipping them on the fly if the body is gzip-compressed.
+
+    Decompressed output is produced in pieces of at most CHUNK_SIZE bytes, so a large
+    compressed sitemap never has to sit fully in memory.
+    """
+    chunks = iter(chunks)
+    first = b''
+    for first in chunks:
+        if first:
+            break
+    if not first.startswith(GZIP_MAGIC):
+        if first:
+            yield first
+        yield from chunks
+        return
+
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    for data in itertools.chain([first], chunks):
+        while data:
+            output = decompressor.decompress(data, CHUNK_SIZE)
+            if output:
+                yield output
+            if not decompressor.eof:
+                data = decompressor.unconsumed_tail
+            elif decompressor.unused_data.startswith(GZIP_MAGIC):
+                # Concatenated gzip members
+                data = decompressor.unused_data
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            else:
+                # Ignore trailing padding after the last member
+                data = b''
+    tail = decompressor.flush()
+    if tail:
+        yield tail
+
+
+def iter_sitemap(chunks):
+    """Yields SitemapEntry objects from an iterable of raw (optionally gzipped) byte chunks."""
+    parser = SitemapParser()
+    for chunk in iter_decompressed(chunks):
+        if chunk:
+            yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+class UrlStream:
+    """Thread-safe URL list that consumers can iterate while it is still being filled.
+
+    Iteration blocks until the next URL arrives and ends once close() has been
+    called, so check workers can start before the whole sitemap is downloaded.
+    Every consumer sees every URL.
+    """
+
+    def __init__(self, urls=()):
+        self._urls = list(urls)
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def __len__(self):
+        return len(self._urls)
+
+    def __iter__(self):
+        index = 0
+        while True:
+            with self._condition:
+                while index >= len(self._urls) and not self._closed:
+                    self._condition.wait()
+                if index >= len(self._urls):
+                    return
+                url = self._urls[index]
+            index += 1
+            yield url
+
+    def add(self, url):
+        """Appends a URL and wakes up waiting consumers."""
+        with self._condition:
+            self._urls.append(url)
+            self._condition.notify_all()
+
+    def close(self):
+        """Marks the stream as complete so consumers stop once they have read every URL."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
@@ -0,0 +1,55 @@
+import functools
+from urllib.parse import urlsplit, urlunsplit
+
+# Number of distinct URLs whose normalized forms are memoized
+MEMO_SIZE = 64 * 1024
+
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+# Query parameters that only track campaigns and never change the page served
+TRACKING_PARAMETERS = frozenset({
+    'gclid', 'dclid', 'fbclid', 'msclkid', 'yclid', 'mc_cid', 'mc_eid', '_ga', '_hsenc', '_hsmi',
+})
+TRACKING_PREFIXES = ('utm_',)
+
+
+def _is_tracking_parameter(pair):
+    name = pair.split('=', 1)[0].lower()
+    return name in TRACKING_PARAMETERS or name.startswith(TRACKING_PREFIXES)
+
+
+@functools.lru_cache(maxsize=MEMO_SIZE)
+def normalize_url(url):
+    """Returns the canonical form of a URL used for fetching and reporting.
+
+    Lowercases the scheme and host, drops default ports, fragments and tracking
+    parameters, and turns an empty path into "/". Path case and trailing slashes
+    are kept because servers may treat them differently.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    userinfo, at, host = parts.netloc.rpartition('@')
+    host = host.lower()
+    port = DEFAULT_PORTS.get(scheme)
+    if port and host.endswith(f":{port}"):
+        host = host[:-len(port) - 1]
+    query = parts.query
+    if query:
+        query = '&'.join(pair for pair in query.split('&') if pair and not _is_tracking_parameter(pair))
+    path = parts.path or ('/' if host else '')
+    return urlunsplit((scheme, f"{userinfo}{at}{host}", path, query, ''))
+
+
+@functools.lru_cache(maxsize=MEMO_SIZE)
+def url_key(url):
+    """Returns the identity of a URL: its normalized form without a trailing slash.
+
+    Two URLs with the same key are treated as the same page when deduplicating
+    sitemap entries, deciding what the crawler still has to visit and comparing
+    the sitemap with the crawl.
+    """
+    parts = urlsplit(normalize_url(url))
+    path = parts.path
+    if len(path) > 1 and path.endswith('/'):
+        path = path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme, parts.netloc, path, parts.query, ''))
@@ -0,0 +1,75 @@
+"""
+Stub transport adapter shared by the offline test scripts: requests are answered
+by a routing function instead of the network.
+"""
+
+import io
+import threading
+import time
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+
+def stub_response(request, status_code=200, headers=None, body=b""):
+    """Returns a requests.Response to ``request`` whose body streams from memory."""
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers = CaseInsensitiveDict(headers or {})
+    response.raw = io.BytesIO(body)
+    response.url = request.url
+    response.request = request
+    return response
+
+
+class StubAdapter(BaseAdapter):
+    """Answers every request with ``route(request)``, a (status_code, headers, body) tuple.
+
+    The adapter keeps every request it got and response it returned, and counts
+    the most requests it served at once.
+
+    Args:
+        route: Function from a PreparedRequest to its (status_code, headers, body)
+        delay: Seconds each answer takes, or a function from the request to them
+    """
+
+    def __init__(self, route, delay=0.0):
+        super().__init__()
+        self.route = route
+        self.delay = delay
+        self.requests = []
+        self.responses = []
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        with self._lock:
+            self.requests.append(request)
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            delay = self.delay(request) if callable(self.delay) else self.delay
+            if delay:
+                time.sleep(delay)
+            status_code, headers, body = self.route(request)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        response = stub_response(request, status_code, headers, body)
+        with self._lock:
+            self.responses.append(response)
+        return response
+
+    def close(self):
+        pass
+
+
+def stub_session(route, delay=0.0):
+    """Returns a (session, adapter) pair with a StubAdapter mounted for http and https."""
+    session = requests.Session()
+    adapter = StubAdapter(route, delay)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session, adapter
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test script for the multi-site batch mode. Runs offline, against local synthetic sites.
+"""
+
+import contextlib
+import tempfile
+
+from benchmarks.synthetic_site import SiteSpec, SyntheticSite
+from src.batch import _results_path, read_sites, run_batch, summarize
+
+SPEC = SiteSpec(pages=30, fan_out=3, orphans=2, broken=2, sitemap_size=10, page_bytes=256)
+
+
+def test_read_sites_skips_blanks_and_comments():
+    """One site per line; blank lines and # comments are ignored."""
+    lines = ["# shops\n", "https://a.example\n", "\n", "  https://b.example/sitemap.xml  # index\n"]
+    assert read_sites(lines) == ["https://a.example", "https://b.example/sitemap.xml"]
+
+
+def test_results_paths_are_unique_per_site():
+    """The same host listed twice still gets two result files."""
+    first = _results_path("out", 0, "https://a.example:8443/sitemap.xml")
+    second = _results_path("out", 1, "https://a.example:8443/")
+    assert first.endswith("0000-a.example_8443.jsonl")
+    assert first != second
+
+
+def test_summary_totals_successful_sites():
+    """Counts are summed over the sites that succeeded; failures are counted separately."""
+    summary = summarize([
+        {"site": "https://a.example", "counts": {"broken_links": 2, "orphan_pages": 1}},
+        {"site": "https://b.example", "counts": {"broken_links": 3, "seo_issues": 4}},
+        {"site": "https://c.example", "error": "No URLs found in sitemap"},
+    ], seconds=12.345)
+
+    assert (summary["sites"], summary["succeeded"], summary["failed"]) == (3, 2, 1)
+    assert summary["totals"]["broken_links"] == 5
+    assert summary["totals"]["seo_issues"] == 4
+    assert summary["seconds"] == 12.35
+
+
+def test_batch_shares_one_small_budget():
+    """Sites finish in fresh workers under a global budget smaller than their per-host limits."""
+    with contextlib.ExitStack() as stack, tempfile.TemporaryDirectory() as directory:
+        sites = [stack.enter_context(SyntheticSite(SPEC, in_process=True)) for _ in range(3)]
+        summary = run_batch([site.url for site in sites], directory, processes=2, max_concurrency=3)
+
+    assert summary["failed"] == 0, summary["results"]
+    for site, result in zip(sites, summary["results"]):
+        assert {kind: result["counts"][kind] for kind in site.expected} == site.expected
+
+
+if __name__ == "__main__":
+    test_read_sites_skips_blanks_and_comments()
+    test_results_paths_are_unique_per_site()
+    test_summary_totals_successful_sites()
+    test_batch_shares_one_small_budget()
+    print("✓ Batch tests passed")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test script for the streamed, size-capped page reads of the page store.
+Runs offline against a local synthetic site with large pages.
+"""
+
+import requests
+
+from benchmarks.synthetic_site import SiteSpec, SyntheticSite
+from src.host_scheduler import HostScheduler, SchedulingAdapter
+from src.metrics import Metrics
+from src.page_store import BodyReader, PageStore
+
+SPEC = SiteSpec(pages=5, fan_out=4, orphans=0, broken=1, sitemap_size=2, page_bytes=512 * 1024)
+
+
+def test_body_reader_stops_at_the_end_of_head():
+    """Head-only reads stop at </head>, even when the marker is split across chunks."""
+    reader = BodyReader(head_only=True)
+    assert reader.feed(b'<html><head><title>T</title></he')
+    assert not reader.feed(b'ad><body>')
+
+    capped = BodyReader(max_bytes=10)
+    assert not capped.feed(b'0123456789abcdef')
+    assert capped.content == b'0123456789' and capped.truncated
+    assert capped.received == 16
+
+
+def test_page_store_reads_only_what_checks_need():
+    """Large pages are capped, head-only reads stop early and non-HTML or error bodies are skipped."""
+    with SyntheticSite(SPEC, in_process=True) as site:
+        store = PageStore(requests.Session(), max_body_bytes=100 * 1024)
+
+        page = store.get(f"{site.url}/page/1")
+        assert page.truncated and page.content == b''
+        assert page.meta_description == "Synthetic page"
+
+        head = store.get(f"{site.url}/page/2", head_only=True)
+        assert not head.truncated
+        assert head.meta_description == "Synthetic page"
+        # A full page already fetched is reused by head-only callers
+        assert store.get(f"{site.url}/page/1", head_only=True) is page
+
+        sitemap = store.get(f"{site.url}/sitemap-0.xml.gz")
+        assert sitemap.status_code == 200 and sitemap.content == b''
+        gone = store.get(f"{site.url}/gone/0")
+        assert gone.status_code == 404 and gone.content == b''
+
+
+def test_metrics_count_bytes_actually_read():
+    """Capped and head-only reads report the bytes they downloaded, not the announced Content-Length."""
+    with SyntheticSite(SPEC, in_process=True) as site:
+        metrics = Metrics()
+        session = requests.Session()
+        session.mount("http://", SchedulingAdapter(HostScheduler(metrics=metrics)))
+        store = PageStore(session, max_body_bytes=100 * 1024)
+
+        store.get(f"{site.url}/page/1")
+        capped = metrics.snapshot()["bytes_received"]
+        assert 100 * 1024 <= capped < 256 * 1024
+
+        store.get(f"{site.url}/page/2", head_only=True)
+        store.get(f"{site.url}/gone/0")
+        assert metrics.snapshot()["bytes_received"] - capped < 100 * 1024
+
+
+if __name__ == "__main__":
+    test_body_reader_stops_at_the_end_of_head()
+    test_page_store_reads_only_what_checks_need()
+    test_metrics_count_bytes_actually_read()
+    print("✓ Body limit tests passed")
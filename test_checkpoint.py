@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script for run checkpoints and resuming an interrupted crawl. Runs offline
+against a checkpoint written to a temporary directory and a local synthetic site.
+"""
+
+import logging
+import os
+import tempfile
+from datetime import datetime, timezone
+
+from benchmarks.synthetic_site import SiteSpec, SyntheticSite
+from src.checkpoint import Checkpoint
+from src.link_graph import LinkGraph
+from src.sitemap_analyzer import SitemapAnalyzer
+
+HOME = "https://example.com/"
+STARTED = datetime(2025, 7, 10, tzinfo=timezone.utc)
+
+
+def test_progress_survives_reopening():
+    """Recorded URLs, findings and pages are read back by a new Checkpoint on the same file."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "run.db")
+        checkpoint = Checkpoint(path, interval=3600)
+        checkpoint.start(HOME, STARTED)
+        checkpoint.record_url(HOME + "a", "2025-07-01")
+        checkpoint.record_url(HOME + "b", None)
+        checkpoint.record_sitemap_url(HOME + "sitemap.xml")
+        checkpoint.mark_sitemap_complete()
+        checkpoint.record_url(HOME + "late", None)
+        checkpoint.record_finding("broken_links", HOME + "a", None)
+        checkpoint.record_finding("seo_issues", HOME + "b", {"url": HOME + "b", "issue": "Missing meta description"})
+        checkpoint.record_page(HOME, 0, [HOME + "a"])
+        checkpoint.close()
+
+        resumed = Checkpoint(path)
+        assert not resumed.load("https://other.example/")
+        assert resumed.load(HOME)
+        assert resumed.started_at == STARTED
+        assert resumed.sitemap_complete
+        assert resumed.sitemap_url == HOME + "sitemap.xml"
+        assert list(resumed.iter_urls()) == [(HOME + "a", "2025-07-01"), (HOME + "b", None)]
+        assert resumed.finding("broken_links", HOME + "a") == (True, None)
+        assert resumed.finding("broken_links", HOME + "b") == (False, None)
+        assert resumed.finding("seo_issues", HOME + "b")[1]["issue"] == "Missing meta description"
+        assert list(resumed.iter_pages()) == [(HOME, 0, [HOME + "a"])]
+
+        resumed.start(HOME, STARTED)
+        assert not resumed.sitemap_complete
+        assert list(resumed.iter_pages()) == []
+        resumed.close()
+
+
+def test_crawl_frontier_is_rebuilt_from_recorded_pages():
+    """Crawled pages go back into the link graph and only their uncrawled links are queued."""
+    with tempfile.TemporaryDirectory() as directory:
+        analyzer = SitemapAnalyzer(HOME, checkpoint_path=os.path.join(directory, "run.db"), max_crawl_depth=2)
+        analyzer.checkpoint.start(HOME, STARTED)
+        analyzer.checkpoint.record_page(HOME, 0, [HOME + "a", HOME + "b"])
+        analyzer.checkpoint.record_page(HOME + "a", 1, [HOME + "b", HOME + "c"])
+        analyzer.checkpoint.record_page(HOME + "c", 2, [HOME + "d"])
+
+        link_graph = LinkGraph(HOME)
+        analyzer.visited = analyzer._new_visited_set()
+        frontier = list(analyzer._restore_crawl(link_graph))
+
+        assert link_graph.page_count == 3
+        assert frontier == [(HOME + "b", 1)]
+        analyzer.checkpoint.close()
+
+
+def test_resume_skips_discovery_once_the_sitemap_is_recorded():
+    """A resumed run takes the sitemap URL from the checkpoint and leaves no host slot held."""
+    spec = SiteSpec(pages=20, fan_out=3, orphans=1, broken=1, sitemap_size=0, page_bytes=64)
+    with tempfile.TemporaryDirectory() as directory, SyntheticSite(spec, in_process=True) as site:
+        path = os.path.join(directory, "run.db")
+        url = f"{site.url}/sitemap.xml"
+        analyzer = SitemapAnalyzer(url, checkpoint_path=path)
+        analyzer.set_log_level(logging.ERROR)
+        analyzer.analyze()
+
+        def rediscover(url):
+            raise AssertionError("discovery ran again")
+
+        resumed = SitemapAnalyzer(url, checkpoint_path=path)
+        resumed.set_log_level(logging.ERROR)
+        resumed._find_sitemap_url = rediscover
+        report = resumed.resume()
+        assert {kind: len(report[kind]) for kind in site.expected} == site.expected
+
+        # Discovery that ran before resuming leaves no open response behind
+        early = SitemapAnalyzer(url, checkpoint_path=path)
+        early.set_log_level(logging.ERROR)
+        assert early.sitemap_url == url
+        assert early._sitemap_response is None
+        early.resume()
+        assert all(state.in_flight == 0 for state in early.scheduler._hosts.values())
+
+
+if __name__ == "__main__":
+    test_progress_survives_reopening()
+    test_crawl_frontier_is_rebuilt_from_recorded_pages()
+    test_resume_skips_discovery_once_the_sitemap_is_recorded()
+    print("✓ Checkpoint tests passed")
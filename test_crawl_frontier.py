@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test script for the memory-bounded crawl structures: the disk-spilling frontier
+and the visited set that falls back to a Bloom filter. Runs offline.
+"""
+
+import logging
+
+from benchmarks.synthetic_site import SiteSpec, SyntheticSite
+from src.async_engine import AsyncEngine
+from src.crawl_frontier import BloomFilter, SpillingQueue, VisitedSet
+from src.sitemap_analyzer import SitemapAnalyzer
+from src.sitemap_parser import SitemapEntry, UrlStream
+
+
+def test_frontier_spills_to_disk_in_order():
+    """Entries beyond max_items go to disk and come back in FIFO order."""
+    with SpillingQueue(max_items=3) as frontier:
+        for i in range(10):
+            frontier.append((f"https://example.com/p{i}", i))
+        assert len(frontier) == 10
+        assert len(frontier._memory) == 3
+
+        popped = [frontier.popleft() for _ in range(5)]
+        frontier.append(("https://example.com/late", 99))
+        popped += [frontier.popleft() for _ in range(len(frontier))]
+
+    assert [url for url, _ in popped] == [f"https://example.com/p{i}" for i in range(10)] + ["https://example.com/late"]
+    assert popped[4] == ("https://example.com/p4", 4)
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """Every added item is found and unseen items are rarely reported."""
+    bloom = BloomFilter(max_bytes=4096, error_rate=0.01)
+    added = [f"https://example.com/p{i}" for i in range(bloom.capacity)]
+    for url in added:
+        bloom.add(url)
+
+    assert all(url in bloom for url in added)
+    false_positives = sum(f"https://example.com/other{i}" in bloom for i in range(2000))
+    assert false_positives < 2000 * 0.03
+
+
+def test_visited_set_switches_to_bloom_filter():
+    """Small sites are tracked exactly; past the budget the set becomes a Bloom filter."""
+    visited = VisitedSet(max_bytes=128 * 50)
+    for i in range(50):
+        visited.add(f"https://example.com/p{i}")
+    assert visited.exact
+
+    for i in range(50, 200):
+        visited.add(f"https://example.com/p{i}")
+    assert not visited.exact
+    assert all(f"https://example.com/p{i}" in visited for i in range(200))
+    assert len(visited) == 200
+
+    assert VisitedSet().exact_limit is None
+
+
+def test_sitemap_dedup_stays_exact_under_a_memory_budget():
+    """However small the budget, no unique sitemap URL is mistaken for a duplicate."""
+    analyzer = SitemapAnalyzer("https://example.com/sitemap.xml", memory_budget=64 * 1024)
+    analyzer.set_log_level(logging.ERROR)
+    locs = [f"https://example.com/p{i}" for i in range(20000)] + ["https://example.com/p7"]
+    entries = (SitemapEntry("url", loc, None, None, None) for loc in locs)
+    urls = UrlStream()
+
+    assert analyzer._fill_url_stream(entries, urls, urls, None) is None
+    assert len(urls) == 20000
+
+
+def test_tiny_budget_still_crawls_everything():
+    """A budget too small for a single frontier entry still keeps one in memory and crawls the whole site."""
+    spec = SiteSpec(pages=20, fan_out=3, orphans=0, broken=0, sitemap_size=0, page_bytes=64)
+    with SyntheticSite(spec, in_process=True) as site:
+        analyzer = SitemapAnalyzer(f"{site.url}/sitemap.xml", memory_budget=512)
+        analyzer.set_log_level(logging.ERROR)
+        assert analyzer._new_frontier().max_items == 1
+        link_graph = analyzer.crawl_website()
+
+    assert link_graph.page_count == spec.pages
+
+
+def test_async_page_store_honours_the_memory_budget():
+    """The async engine's page store drops bodies and forgets old pages just like PageStore."""
+    spec = SiteSpec(pages=60, fan_out=4, orphans=0, broken=0, sitemap_size=0, page_bytes=8 * 1024)
+    with SyntheticSite(spec, in_process=True) as site:
+        analyzer = SitemapAnalyzer(f"{site.url}/sitemap.xml", engine="async", memory_budget=3 * 16 * 1024)
+        analyzer.set_log_level(logging.ERROR)
+        engine = AsyncEngine(analyzer)
+        report = engine.run([f"{site.url}/page/{i}" for i in range(spec.pages)])
+
+    store = engine.store
+    assert report["broken_links"] == []
+    assert store._stored_bytes <= store.max_bytes == 16 * 1024
+    assert 0 < len(store._tasks) < spec.pages
+    assert all(task.result().content == b'' for task in store._tasks.values())
+
+
+if __name__ == "__main__":
+    test_frontier_spills_to_disk_in_order()
+    test_bloom_filter_has_no_false_negatives()
+    test_visited_set_switches_to_bloom_filter()
+    test_sitemap_dedup_stays_exact_under_a_memory_budget()
+    test_tiny_budget_still_crawls_everything()
+    test_async_page_store_honours_the_memory_budget()
+    print("✓ Crawl frontier tests passed")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test script for the iterative frontier crawler: sites deeper than the recursion
+limit, and the depth and page limits. Runs offline against a stub transport adapter.
+"""
+
+import logging
+import sys
+
+from src.sitemap_analyzer import SitemapAnalyzer
+from stub_transport import StubAdapter
+
+SITE = "https://example.com"
+CHAIN_LENGTH = 1200
+FAN_OUT = 20
+
+
+def chain(request):
+    """Every page links only to the next one: /, /p1, /p2, ... /p{CHAIN_LENGTH}."""
+    number = 0 if request.path_url == "/" else int(request.path_url[2:])
+    link = f'<a href="/p{number + 1}">next</a>' if number < CHAIN_LENGTH else ""
+    return 200, {"Content-Type": "text/html"}, f"<html><head></head><body>{link}</body></html>".encode()
+
+
+def wide(request):
+    """The home page links to FAN_OUT pages that link nowhere."""
+    links = "".join(f'<a href="/w{number}">w</a>' for number in range(FAN_OUT)) if request.path_url == "/" else ""
+    return 200, {"Content-Type": "text/html"}, f"<html><head></head><body>{links}</body></html>".encode()
+
+
+def crawling_analyzer(route, **options):
+    analyzer = SitemapAnalyzer(f"{SITE}/sitemap.xml", respect_robots=False, **options)
+    analyzer.set_log_level(logging.ERROR)
+    adapter = StubAdapter(route)
+    analyzer.session.mount("https://", adapter)
+    analyzer.sitemap_url = f"{SITE}/sitemap.xml"
+    return analyzer, adapter
+
+
+def test_chain_deeper_than_the_recursion_limit():
+    """A chain of pages longer than the recursion limit is crawled to its end."""
+    assert CHAIN_LENGTH > sys.getrecursionlimit()
+    analyzer, adapter = crawling_analyzer(chain)
+    link_graph = analyzer.crawl_website()
+
+    assert link_graph.page_count == CHAIN_LENGTH + 1
+    assert int(link_graph.metrics().depth[link_graph.lookup(f"{SITE}/p{CHAIN_LENGTH}")]) == CHAIN_LENGTH
+    assert len(adapter.requests) == CHAIN_LENGTH + 1
+
+
+def test_depth_limit_stops_the_crawl():
+    """Pages deeper than max_crawl_depth are never fetched."""
+    analyzer, adapter = crawling_analyzer(chain, max_crawl_depth=5)
+    link_graph = analyzer.crawl_website()
+
+    assert link_graph.page_count == 6
+    assert [request.path_url for request in adapter.requests] == ["/"] + [f"/p{number}" for number in range(1, 6)]
+
+
+def test_page_limit_stops_the_crawl():
+    """No more than max_crawl_pages pages are fetched, however many links are queued."""
+    analyzer, adapter = crawling_analyzer(wide, max_crawl_pages=7)
+    link_graph = analyzer.crawl_website()
+
+    assert link_graph.page_count == 7
+    assert len(adapter.requests) == 7
+
+
+if __name__ == "__main__":
+    test_chain_deeper_than_the_recursion_limit()
+    test_depth_limit_stops_the_crawl()
+    test_page_limit_stops_the_crawl()
+    print("✓ Crawler tests passed")
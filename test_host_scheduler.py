@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Test script for the per-host politeness scheduler. Runs offline; the adapter test
+talks to a local server only.
+"""
+
+import contextlib
+import http.server
+import threading
+import time
+
+import requests
+
+from src.host_scheduler import HostScheduler, SchedulingAdapter, host_of, parse_retry_after
+
+
+class _TruncatingHandler(http.server.BaseHTTPRequestHandler):
+    """Answers /truncated with a chunked body cut off mid-chunk, anything else with a short page."""
+
+    def do_GET(self):
+        self.send_response(200)
+        if self.path == "/truncated":
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            self.wfile.write(b"400\r\n<html>")
+        else:
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+        self.close_connection = True
+
+    def log_message(self, *args):
+        pass
+
+
+@contextlib.contextmanager
+def _local_server():
+    """Serves _TruncatingHandler on a free port, yielding its base URL."""
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _TruncatingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_retry_after_formats():
+    """Retry-After accepts delta-seconds and HTTP dates."""
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_concurrency_adapts_to_back_pressure():
+    """Healthy responses grow the per-host limit; a 429 halves it and blocks the host."""
+    scheduler = HostScheduler(max_connections_per_host=8, initial_concurrency=4, max_retries=2)
+    host = "example.com"
+
+    for _ in range(20):
+        scheduler.acquire(host)
+        scheduler.release(host, 200, 0.01)
+    grown = scheduler._hosts[host].limit
+    assert grown > 4
+
+    scheduler.acquire(host)
+    scheduler.release(host, 429, 0.01, retry_after="30")
+    state = scheduler._hosts[host]
+    assert state.limit == max(1.0, grown / 2)
+    assert state.blocked_until - time.monotonic() > 25
+    assert scheduler._try_acquire(host) > 25
+
+    assert scheduler.should_retry(429, 0)
+    assert scheduler.should_retry(None, 1)
+    assert not scheduler.should_retry(429, 2)
+    assert not scheduler.should_retry(404, 0)
+
+
+def test_crawl_delay_spaces_requests():
+    """A Crawl-delay turns into a token bucket of one request per delay."""
+    scheduler = HostScheduler()
+    scheduler.set_crawl_delay("example.com", 10)
+
+    assert scheduler._try_acquire("example.com") == 0
+    scheduler.release("example.com", 200, 0.01)
+    assert scheduler._try_acquire("example.com") > 9
+
+
+def test_malformed_body_frees_the_slot():
+    """A body cut off mid-transfer is retried, then raised without leaving the host's slot taken."""
+    with _local_server() as url:
+        scheduler = HostScheduler(max_connections_per_host=1, initial_concurrency=1, max_retries=1,
+                                  backoff_factor=0.01)
+        session = requests.Session()
+        session.mount("http://", SchedulingAdapter(scheduler))
+
+        try:
+            session.get(f"{url}/truncated", timeout=5)
+        except requests.exceptions.ChunkedEncodingError:
+            pass
+        else:
+            raise AssertionError("a truncated body must raise")
+        assert scheduler._hosts[host_of(url)].in_flight == 0
+        # With one slot per host, a leaked slot would block this request forever
+        assert session.get(f"{url}/page", timeout=5).text == "ok"
+
+
+def test_streamed_response_holds_the_slot_until_read():
+    """A streamed body counts against the host's concurrency until it is read to the end or closed."""
+    with _local_server() as url:
+        scheduler = HostScheduler()
+        session = requests.Session()
+        session.mount("http://", SchedulingAdapter(scheduler))
+        host = host_of(url)
+
+        response = session.get(f"{url}/page", timeout=5, stream=True)
+        assert scheduler._hosts[host].in_flight == 1
+        assert response.content == b"ok"
+        assert scheduler._hosts[host].in_flight == 0
+
+        response = session.get(f"{url}/page", timeout=5, stream=True)
+        assert scheduler._hosts[host].in_flight == 1
+        response.close()
+        response.close()
+        assert scheduler._hosts[host].in_flight == 0
+
+
+def test_shared_slots_cap_requests_across_schedulers():
+    """Schedulers sharing a semaphore take one of its slots per request, whatever the host."""
+    slots = threading.BoundedSemaphore(2)
+    first, second = HostScheduler(shared_slots=slots), HostScheduler(shared_slots=slots)
+    first.acquire("a.example")
+    second.acquire("b.example")
+
+    acquired = threading.Event()
+    waiter = threading.Thread(target=lambda: (first.acquire("c.example"), acquired.set()))
+    waiter.start()
+    assert not acquired.wait(0.2)
+    second.release("b.example", 200, 0.01)
+    assert acquired.wait(5)
+    waiter.join()
+
+    first.cancel("a.example")
+    first.release("c.example", 200, 0.01)
+    assert all(slots.acquire(blocking=False) for _ in range(2))
+
+
+if __name__ == "__main__":
+    test_retry_after_formats()
+    test_concurrency_adapts_to_back_pressure()
+    test_crawl_delay_spaces_requests()
+    test_malformed_body_frees_the_slot()
+    test_streamed_response_holds_the_slot_until_read()
+    test_shared_slots_cap_requests_across_schedulers()
+    print("✓ Host scheduler tests passed")
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Test script for the single-pass HTML extractor. Runs offline against inline pages.
+"""
+
+from src.html_extractor import extract_facts
+
+PAGE = b"""<!DOCTYPE html>
+<html>
+<head>
+  <base href="https://example.com/blog/">
+  <title>Caf\xc3\xa9 &amp; Bar</title>
+  <meta name="Description" content="Coffee and more">
+  <meta name="robots" content="noindex, follow">
+  <link rel="canonical" href="/cafe">
+</head>
+<body>
+  <a href="post-1">Post</a>
+  <a href=" https://example.com/about ">About</a>
+  <a name="anchor-without-href">Skip</a>
+</body>
+</html>
+"""
+
+
+def test_facts_are_extracted_in_one_pass():
+    """Links resolve against <base> and head facts are decoded with the page charset."""
+    facts = extract_facts("https://example.com/", PAGE, "text/html; charset=utf-8")
+
+    assert facts["links"] == ["https://example.com/blog/post-1", "https://example.com/about"]
+    assert facts["title"] == "Café & Bar"
+    assert facts["meta_description"] == "Coffee and more"
+    assert facts["robots"] == "noindex, follow"
+    assert facts["canonical"] == "https://example.com/cafe"
+
+
+def test_head_only_extraction_skips_links():
+    """Without links the extractor stops at </head> and still finds every head fact."""
+    facts = extract_facts("https://example.com/", PAGE, "text/html", with_links=False)
+
+    assert facts["links"] is None
+    assert facts["meta_description"] == "Coffee and more"
+    assert facts["canonical"] == "https://example.com/cafe"
+
+
+def test_missing_description():
+    """Pages without a description report None rather than an empty string."""
+    facts = extract_facts("https://example.com/", b"<html><head><title>x</title></head><body></body></html>")
+
+    assert facts["meta_description"] is None
+    assert facts["links"] == []
+
+
+if __name__ == "__main__":
+    test_facts_are_extracted_in_one_pass()
+    test_head_only_extraction_skips_links()
+    test_missing_description()
+    print("✓ HTML extractor tests passed")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test script for recording a run's HTTP traffic and replaying it offline. Records
+an analysis of a local synthetic site, stops the site, then replays the archive.
+"""
+
+import json
+import logging
+import os
+import tempfile
+
+import requests
+
+from benchmarks.synthetic_site import SiteSpec, SyntheticSite
+from src.http_archive import HttpArchive, ReplayAdapter
+from src.sitemap_analyzer import SitemapAnalyzer
+
+SPEC = SiteSpec(pages=40, fan_out=4, orphans=2, broken=2, rate_limited_every=9, sitemap_size=15, page_bytes=256)
+
+
+def analyze(url, **options):
+    analyzer = SitemapAnalyzer(url, **options)
+    analyzer.set_log_level(logging.ERROR)
+    return analyzer.analyze()
+
+
+def normalized(report):
+    # Findings arrive in completion order, which depends on thread scheduling
+    return {kind: sorted(json.dumps(finding, sort_keys=True) for finding in findings)
+            for kind, findings in report.items()}
+
+
+def test_replay_reproduces_the_recorded_run():
+    """A replayed run needs no server and reports exactly what the recorded run found."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "run.db")
+        with SyntheticSite(SPEC, in_process=True) as site:
+            url = f"{site.url}/sitemap.xml"
+            recorded = analyze(url, record_path=path)
+
+        replayed = analyze(url, replay_path=path)
+
+    assert {kind: len(recorded[kind]) for kind in site.expected} == site.expected
+    assert normalized(replayed) == normalized(recorded)
+
+
+def test_replay_serves_exchanges_in_order():
+    """Repeated requests get the recorded responses in turn; unknown URLs fail like the network would."""
+    with tempfile.TemporaryDirectory() as directory:
+        archive = HttpArchive(os.path.join(directory, "run.db"))
+        for status_code, body in ((429, b''), (200, b'<html>ok</html>')):
+            response = requests.Response()
+            response.status_code = status_code
+            response.headers["Content-Type"] = "text/html"
+            archive.record("GET", "https://example.com/", response, body, elapsed=0.01)
+
+        session = requests.Session()
+        session.mount("https://", ReplayAdapter(archive))
+        assert [session.get("https://example.com/").status_code for _ in range(3)] == [429, 200, 200]
+        assert session.get("https://example.com/").text == "<html>ok</html>"
+        try:
+            session.get("https://example.com/missing")
+            raise AssertionError("expected a ConnectionError")
+        except requests.exceptions.ConnectionError:
+            pass
+        archive.close()
+
+
+def test_recording_keeps_the_body_cap():
+    """Only the part of a streamed body the page store read is archived, so capped runs replay identically."""
+    spec = SiteSpec(pages=5, fan_out=4, orphans=0, broken=1, sitemap_size=0, page_bytes=512 * 1024)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "run.db")
+        with SyntheticSite(spec, in_process=True) as site:
+            url = f"{site.url}/sitemap.xml"
+            recorded = analyze(url, record_path=path, max_body_bytes=100 * 1024)
+
+        archive = HttpArchive(path)
+        bodies = [archive.exchange(exchange_id)[3] for exchange_id in archive.exchange_ids("GET", f"{site.url}/page/1")]
+        assert bodies and all(100 * 1024 <= len(body) < 256 * 1024 for body in bodies)
+        assert all(archive.exchange(exchange_id)[3] == b''
+                   for exchange_id in archive.exchange_ids("GET", f"{site.url}/gone/0"))
+        archive.close()
+
+        replayed = analyze(url, replay_path=path, max_body_bytes=100 * 1024)
+    assert normalized(replayed) == normalized(recorded)
+
+
+def test_replaying_a_missing_archive_fails():
+    """A mistyped replay_path raises instead of replaying an empty archive as a site full of broken links."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "typo.db")
+        try:
+            SitemapAnalyzer("https://example.com/sitemap.xml", replay_path=path)
+            raise AssertionError("expected a FileNotFoundError")
+        except FileNotFoundError:
+            pass
+        assert not os.path.exists(path)
+
+
+if __name__ == "__main__":
+    test_replay_reproduces_the_recorded_run()
+    test_replay_serves_exchanges_in_order()
+    test_recording_keeps_the_body_cap()
+    test_replaying_a_missing_archive_fails()
+    print("✓ HTTP archive tests passed")
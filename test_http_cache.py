@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for the persistent HTTP cache: conditional revalidation of stored
+pages and least-recently-used eviction. Runs offline against a stub transport adapter.
+"""
+
+import os
+import tempfile
+import time
+
+from src.http_cache import HttpCache
+from src.page_store import PageStore
+from stub_transport import stub_session
+
+URL = "https://example.com/page"
+ETAG = '"v1"'
+LAST_MODIFIED = "Wed, 01 Oct 2025 07:28:00 GMT"
+PAGE = b'<html><head><meta name="description" content="Cached"></head><body><a href="/next">n</a></body></html>'
+
+
+def revalidate(request):
+    """Serves PAGE with validators, or a bodyless 304 when the request carries a matching ETag."""
+    headers = {"Content-Type": "text/html", "ETag": ETAG, "Last-Modified": LAST_MODIFIED}
+    if request.headers.get("If-None-Match") == ETAG:
+        return 304, headers, b""
+    return 200, headers, PAGE
+
+
+def test_revalidation_rebuilds_the_page_from_cached_facts():
+    """A second run sends the stored validators and rebuilds the page from cached facts on a 304."""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = HttpCache(os.path.join(directory, "cache.db"))
+        session, adapter = stub_session(revalidate)
+
+        first = PageStore(session, cache=cache).get(URL)
+        assert not first.from_cache
+        assert "If-None-Match" not in adapter.requests[0].headers
+
+        # A new run starts with an empty page store but the same cache
+        second = PageStore(session, cache=cache).get(URL)
+        assert adapter.requests[1].headers["If-None-Match"] == ETAG
+        assert adapter.requests[1].headers["If-Modified-Since"] == LAST_MODIFIED
+        assert second.from_cache and second.status_code == 200
+        assert second.meta_description == "Cached"
+        assert second.links == first.links == ["https://example.com/next"]
+        assert cache.hits == 1
+        cache.close()
+
+
+def test_least_recently_used_entries_are_evicted():
+    """Over budget, the entries used longest ago go first; a revalidated entry counts as recently used."""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = HttpCache(os.path.join(directory, "cache.db"))
+        headers = {"ETag": ETAG}
+        cache.store("https://example.com/0", headers, 200, {"links": []}, [])
+        entry_bytes = cache._total_bytes
+        cache.close()
+
+        # Room for three entries; storing a fourth evicts down to 90% of the budget
+        cache = HttpCache(os.path.join(directory, "cache.db"), max_bytes=3 * entry_bytes)
+        for number in range(1, 3):
+            time.sleep(0.01)
+            cache.store(f"https://example.com/{number}", headers, 200, {"links": []}, [])
+        time.sleep(0.01)
+        cache.hit("https://example.com/0")
+        time.sleep(0.01)
+        cache.store("https://example.com/3", headers, 200, {"links": []}, [])
+
+        kept = [number for number in range(4) if cache.lookup(f"https://example.com/{number}") is not None]
+        assert kept == [0, 3]
+        assert cache._total_bytes == 2 * entry_bytes <= cache.max_bytes
+        cache.close()
+
+
+if __name__ == "__main__":
+    test_revalidation_rebuilds_the_page_from_cached_facts()
+    test_least_recently_used_entries_are_evicted()
+    print("✓ HTTP cache tests passed")
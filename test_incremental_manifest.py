@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test script for the run manifest behind incremental analysis. Runs offline
+against a manifest written to a temporary directory.
+"""
+
+import os
+import tempfile
+from datetime import datetime, timezone
+
+from src.run_manifest import RunManifest
+
+PREVIOUS_RUN = datetime(2025, 7, 10, tzinfo=timezone.utc)
+
+
+def saved_manifest(directory):
+    path = os.path.join(directory, "manifest.json")
+    manifest = RunManifest.load(path)
+    manifest.save(
+        PREVIOUS_RUN,
+        {"https://example.com/a": "2025-07-01", "https://example.com/b": "2025-07-01"},
+        broken_links=[{"url": "https://example.com/b", "status_code": 404}],
+        seo_issues=[],
+    )
+    return RunManifest.load(path)
+
+
+def test_only_changed_urls_need_checking():
+    """New URLs, URLs without lastmod and URLs whose lastmod moved are rechecked."""
+    with tempfile.TemporaryDirectory() as directory:
+        manifest = saved_manifest(directory)
+
+        assert not manifest.needs_check("https://example.com/a", "2025-07-01")
+        assert manifest.needs_check("https://example.com/a", "2025-07-11T08:00:00Z")
+        assert manifest.needs_check("https://example.com/a", None)
+        assert manifest.needs_check("https://example.com/new", "2025-07-01")
+        assert manifest.needs_check("https://example.com/a", "2025-07-01", recheck_fraction=1.0)
+
+
+def test_findings_are_carried_forward():
+    """Findings recorded for a URL are returned for carrying forward."""
+    with tempfile.TemporaryDirectory() as directory:
+        manifest = saved_manifest(directory)
+
+        assert manifest.started_at == PREVIOUS_RUN
+        assert manifest.carried_forward("https://example.com/b") == (
+            {"url": "https://example.com/b", "status_code": 404}, None
+        )
+        assert manifest.carried_forward("https://example.com/a") == (None, None)
+
+
+if __name__ == "__main__":
+    test_only_changed_urls_need_checking()
+    test_findings_are_carried_forward()
+    print("✓ Incremental manifest tests passed")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test script for the compact link graph behind orphan, inbound-link and click-depth
+analysis. Runs offline on a hand-built graph, with and without numpy.
+"""
+
+import src.link_graph as link_graph_module
+from src.link_graph import LinkGraph
+
+HOME = "https://example.com/"
+
+
+def build_graph():
+    graph = LinkGraph(HOME)
+    graph.add_page(HOME, [HOME + "a", HOME + "b", HOME + "b/", HOME])
+    graph.add_page(HOME + "a", [HOME + "b", HOME + "c"])
+    graph.add_page(HOME + "b", [HOME + "a"])
+    graph.add_page(HOME + "c", [])
+    graph.add_page(HOME + "island", [HOME + "island", HOME + "d"])
+    return graph
+
+
+def check_metrics(graph):
+    metrics = graph.metrics()
+
+    def node(path):
+        return graph.lookup(HOME + path)
+
+    assert graph.link_count == 6
+    assert [int(metrics.inbound[node(path)]) for path in ("", "a", "b", "c", "island", "d")] == [0, 2, 2, 1, 0, 1]
+    assert int(metrics.outbound[node("")]) == 2
+    assert int(metrics.outbound[node("d")]) == -1
+    assert [int(metrics.depth[node(path)]) for path in ("", "a", "b", "c", "island", "d")] == [0, 1, 1, 2, -1, -1]
+
+
+def test_graph_metrics_with_numpy():
+    """Self-links and slash variants are collapsed; degrees and depths match the hand count."""
+    if link_graph_module.np is None:
+        return
+    check_metrics(build_graph())
+
+
+def test_graph_metrics_without_numpy():
+    """The pure-Python fallback computes the same metrics."""
+    numpy = link_graph_module.np
+    link_graph_module.np = None
+    try:
+        check_metrics(build_graph())
+    finally:
+        link_graph_module.np = numpy
+
+
+def test_each_node_holds_one_url_string():
+    """A node's URL is its url_key(), the same string object the ID table is keyed by."""
+    graph = build_graph()
+    node = graph.lookup(HOME + "b/")
+    assert graph.url(node) == HOME + "b"
+    assert all(graph.url(node) is key for key, node in graph._ids.items())
+
+
+if __name__ == "__main__":
+    test_graph_metrics_with_numpy()
+    test_graph_metrics_without_numpy()
+    test_each_node_holds_one_url_string()
+    print("✓ Link graph tests passed")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test script for the queued, rate-limited logging handler and time-throttled progress lines.
+"""
+
+import logging
+import time
+
+from src.log_handlers import Progress, RateLimitFilter, queued_handler
+
+
+class _Collect(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+
+
+def _logger(name, handler):
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+    return logger
+
+
+def test_queued_handler_writes_on_a_background_thread():
+    """Records reach the real handler once the listener drains the queue, formatted there."""
+    collected = _Collect()
+    handler = queued_handler(collected, rate=None)
+    logger = _logger("test_log_handlers.queued", handler)
+    for number in range(50):
+        logger.info("Checked page %d", number)
+    handler.listener.stop()
+    assert collected.messages == [f"Checked page {number}" for number in range(50)]
+
+
+def test_rate_limit_groups_by_message_template():
+    """A flood of one template is cut to the burst; the next passing record reports the suppressed count."""
+    collected = _Collect()
+    collected.addFilter(RateLimitFilter(rate=0.0001, burst=3))
+    logger = _logger("test_log_handlers.limited", collected)
+    for number in range(10):
+        logger.warning("Broken link detected: %s", f"https://example.com/{number}")
+    logger.warning("Other message")
+    logger.error("Errors always pass: %s", "one")
+    logger.error("Errors always pass: %s", "two")
+    assert len(collected.messages) == 3 + 1 + 2
+
+    limiter = collected.filters[0]
+    limiter.rate = 1000.0
+    time.sleep(0.01)
+    logger.warning("Broken link detected: %s", "https://example.com/again")
+    assert collected.messages[-1] == "Broken link detected: https://example.com/again (7 similar messages suppressed)"
+
+
+def test_rate_limit_keeps_a_bounded_number_of_templates():
+    """Messages formatted before logging each get a bucket, but only the most recent ones are kept."""
+    collected = _Collect()
+    limiter = RateLimitFilter(rate=0.0001, burst=1, max_templates=8)
+    collected.addFilter(limiter)
+    logger = _logger("test_log_handlers.bounded", collected)
+    for number in range(1000):
+        logger.warning(f"Broken link detected: https://example.com/{number}")
+    assert len(collected.messages) == 1000
+    assert len(limiter._buckets) == 8
+
+    # A template still tracked keeps its bucket; the oldest one was forgotten
+    logger.warning("Broken link detected: https://example.com/999")
+    logger.warning("Broken link detected: https://example.com/0")
+    assert collected.messages[-1] == "Broken link detected: https://example.com/0"
+    assert len(collected.messages) == 1001
+
+
+def test_progress_is_throttled_by_time():
+    """Progress only logs once the interval has passed since the last line."""
+    collected = _Collect()
+    logger = _logger("test_log_handlers.progress", collected)
+    progress = Progress(logger, "Checked {done}/{total} links", interval=3600)
+    for done in range(1, 1001):
+        progress.update(done, 1000)
+    assert collected.messages == []
+
+    progress = Progress(logger, "Checked {done}/{total} links", interval=0)
+    progress.update(5, 10)
+    assert collected.messages == ["Checked 5/10 links"]
+
+
+if __name__ == "__main__":
+    test_queued_handler_writes_on_a_background_thread()
+    test_rate_limit_groups_by_message_template()
+    test_rate_limit_keeps_a_bounded_number_of_templates()
+    test_progress_is_throttled_by_time()
+    print("✓ Log handler tests passed")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test script for the metrics collected during an analysis and their Prometheus export.
+Runs offline against a local synthetic site.
+"""
+
+import logging
+
+from benchmarks.synthetic_site import SiteSpec, SyntheticSite
+from src.metrics import Metrics
+from src.sitemap_analyzer import SitemapAnalyzer
+
+
+def test_histograms_and_prometheus_export():
+    """Latencies land in cumulative buckets per host and status class; the export is well formed."""
+    metrics = Metrics()
+    metrics.observe_request("example.com", 200, 0.02, size=100)
+    metrics.observe_request("example.com", 200, 0.3, size=50)
+    metrics.observe_request("example.com", None, 1.5)
+    metrics.cache_lookup("http", True)
+    metrics.cache_lookup("http", False)
+    metrics.observe_queue("crawl_frontier", 7)
+    metrics.observe_queue("crawl_frontier", 2)
+    with metrics.phase("crawl"):
+        pass
+
+    snapshot = metrics.snapshot()
+    assert snapshot["requests"]["example.com"]["2xx"]["count"] == 2
+    assert snapshot["requests"]["example.com"]["2xx"]["buckets"]["0.025"] == 1
+    assert snapshot["requests"]["example.com"]["error"]["buckets"]["+Inf"] == 1
+    assert snapshot["bytes_received"] == 150
+    assert snapshot["caches"]["http"]["hit_ratio"] == 0.5
+    assert snapshot["queues"]["crawl_frontier"] == {"depth": 2, "peak": 7}
+    assert "crawl" in snapshot["phases"]
+
+    text = metrics.to_prometheus()
+    assert '# TYPE sitemap_analyzer_request_duration_seconds histogram' in text
+    assert 'sitemap_analyzer_request_duration_seconds_bucket{host="example.com",status_class="2xx",le="+Inf"} 2' in text
+    assert 'sitemap_analyzer_request_duration_seconds_count{host="example.com",status_class="error"} 1' in text
+    assert 'sitemap_analyzer_cache_hits_total{cache="http"} 1' in text
+    assert 'sitemap_analyzer_queue_depth_peak{queue="crawl_frontier"} 7' in text
+    assert 'sitemap_analyzer_response_bytes_total 150' in text
+
+
+def test_analysis_records_every_stage():
+    """A real run times each phase, sees every request and counts pages shared between checks."""
+    spec = SiteSpec(pages=30, fan_out=4, orphans=2, broken=2, sitemap_size=0, page_bytes=256)
+    with SyntheticSite(spec, in_process=True) as site:
+        analyzer = SitemapAnalyzer(f"{site.url}/sitemap.xml")
+        analyzer.set_log_level(logging.ERROR)
+        analyzer.analyze()
+
+    snapshot = analyzer.metrics.snapshot()
+    assert set(snapshot["phases"]) == {"discovery", "sitemap_parse", "broken_links", "seo", "crawl", "total"}
+    statuses = snapshot["requests"][site.url[len("http://"):]]
+    assert statuses["4xx"]["count"] >= spec.broken
+    assert statuses["2xx"]["count"] >= spec.pages + spec.orphans
+    assert snapshot["bytes_received"] > 0
+    assert snapshot["caches"]["page_store"]["hits"] > 0
+    assert snapshot["parse"]["count"] >= spec.pages
+    assert snapshot["queues"]["crawl_in_flight"]["peak"] > 0
+
+
+if __name__ == "__main__":
+    test_histograms_and_prometheus_export()
+    test_analysis_records_every_stage()
+    print("✓ Metrics tests passed")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test script for the link checks of the page store: HEAD requests, their GET
+fallback and redirect chains. Runs offline against a stub transport adapter.
+"""
+
+import logging
+
+from src.page_store import PageStore
+from src.sitemap_analyzer import SitemapAnalyzer
+from stub_transport import StubAdapter, stub_session
+
+SITE = "https://example.com"
+
+
+def route(request):
+    """Rejects HEAD for /no-head/ paths, redirects /moved to /gone (404) and answers 200 otherwise."""
+    path = request.path_url
+    headers = {"Content-Type": "text/html"}
+    if request.method == "HEAD" and path.startswith("/no-head/"):
+        status_code = 405 if path.endswith("405") else 501
+    elif path == "/moved":
+        status_code = 301
+        headers["Location"] = f"{SITE}/gone"
+    elif path in ("/gone", "/robots.txt"):
+        status_code = 404
+    else:
+        status_code = 200
+    return status_code, headers, b"" if request.method == "HEAD" else b"<html><head></head></html>"
+
+
+def sent(adapter):
+    return [(request.method, request.path_url) for request in adapter.requests]
+
+
+def test_rejected_head_falls_back_to_a_closed_get():
+    """405 and 501 answers to HEAD are retried as a streamed GET whose body is never read."""
+    session, adapter = stub_session(route)
+    store = PageStore(session)
+
+    for status in ("405", "501"):
+        page = store.head(f"{SITE}/no-head/{status}")
+        assert page.status_code == 200 and page.ok
+        assert sent(adapter)[-2:] == [("HEAD", f"/no-head/{status}"), ("GET", f"/no-head/{status}")]
+        # Response.close() only closes the raw stream of a body that was not read
+        assert adapter.responses[-1].raw.closed
+
+    store.head(f"{SITE}/plain")
+    assert sent(adapter)[-1] == ("HEAD", "/plain")
+
+
+def test_redirect_chains_are_recorded():
+    """Pages keep the redirects followed to reach them; broken links report the chain."""
+    session, _ = stub_session(route)
+    store = PageStore(session)
+    page = store.head(f"{SITE}/moved")
+    assert page.status_code == 404
+    assert page.redirects == [{"url": f"{SITE}/moved", "status_code": 301}]
+
+    analyzer = SitemapAnalyzer(f"{SITE}/sitemap.xml")
+    analyzer.set_log_level(logging.ERROR)
+    analyzer.session.mount("https://", StubAdapter(route))
+    assert analyzer.detect_broken_links([f"{SITE}/moved", f"{SITE}/plain"]) == [
+        {"url": f"{SITE}/moved", "status_code": 404, "redirects": [{"url": f"{SITE}/moved", "status_code": 301}]}
+    ]
+
+
+if __name__ == "__main__":
+    test_rejected_head_falls_back_to_a_closed_get()
+    test_redirect_chains_are_recorded()
+    print("✓ Page store tests passed")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test script for the process pool that parses fetched pages off the I/O threads.
+Runs offline on hand-built pages and a stub transport adapter.
+"""
+
+import concurrent.futures
+import logging
+import threading
+import time
+
+from src.page_store import Page, PageStore
+from src.parse_pool import ParsePool
+from src.sitemap_analyzer import SitemapAnalyzer
+from stub_transport import StubAdapter, stub_session
+
+HTML = b'<html><head><meta name="description" content="Docs"></head><body><a href="/a">a</a></body></html>'
+
+
+def test_pages_are_parsed_in_worker_processes():
+    """Facts come back from the pool, bodies are dropped and every slot is released."""
+    pool = ParsePool(processes=2, max_pending=2)
+    try:
+        pages = [Page(f"https://example.com/p{i}", 200, {"content-type": "text/html"}, HTML) for i in range(6)]
+        # More callers than slots: the extra ones wait instead of queueing more bodies
+        with concurrent.futures.ThreadPoolExecutor(max_workers=6) as executor:
+            list(executor.map(pool.parse, pages))
+
+        # Reading the facts collects them from the workers, and the bodies go with them
+        assert all(page.links == ["https://example.com/a"] for page in pages)
+        assert all(page.content == b'' for page in pages)
+        assert pages[0].meta_description == "Docs"
+
+        broken = pool.parse(Page("https://example.com/gone", 404, {}, b'<html></html>'))
+        assert broken.content == b'<html></html>'
+        assert all(pool._slots.acquire(blocking=False) for _ in range(pool.max_pending))
+    finally:
+        pool.shutdown()
+
+
+class HeldPool(ParsePool):
+    """Parse pool whose pages stay pending until the test hands out their facts."""
+
+    def __init__(self, max_pending=10):
+        super().__init__(processes=1, max_pending=max_pending)
+        self.held = []
+
+    def _submit(self, page):
+        future = concurrent.futures.Future()
+        self.held.append(future)
+        return future
+
+
+def serve_html(request):
+    return 200, {"Content-Type": "text/html"}, HTML
+
+
+def test_fetches_continue_while_a_parse_is_pending():
+    """The fetching thread moves on to its next download before the previous page is parsed."""
+    session, _ = stub_session(serve_html)
+    pool = HeldPool()
+    store = PageStore(session, parse_pool=pool)
+
+    pages = [store.get(f"https://example.com/p{i}") for i in range(3)]
+    assert len(pool.held) == 3
+    assert all(page.content == HTML for page in pages)
+
+    for future in pool.held:
+        future.set_result({"links": ["https://example.com/a"], "meta_description": "Docs"})
+    assert all(page.content == b'' for page in pages)
+    assert pages[0].links == ["https://example.com/a"]
+    assert pages[0].meta_description == "Docs"
+
+
+def test_seo_checks_do_not_wait_for_parsing():
+    """The SEO check fetches more pages than it has threads before any of them is parsed."""
+    analyzer = SitemapAnalyzer("https://example.com/sitemap.xml", respect_robots=False)
+    analyzer.set_log_level(logging.ERROR)
+    analyzer.session.mount("https://", StubAdapter(serve_html))
+    pool = analyzer.parse_pool = HeldPool(max_pending=30)
+    analyzer.page_store = analyzer._new_page_store()
+    # detect_seo_issues() runs 10 threads
+    urls = [f"https://example.com/p{i}" for i in range(15)]
+    fetched_before_parsing = []
+
+    def parse_once_everything_is_fetched():
+        deadline = time.monotonic() + 5
+        while len(pool.held) < len(urls) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        fetched_before_parsing.append(len(pool.held))
+        for future in pool.held:
+            future.set_result({"links": [], "meta_description": None})
+
+    parser = threading.Thread(target=parse_once_everything_is_fetched)
+    parser.start()
+    issues = analyzer.detect_seo_issues(urls, head_only=False)
+    parser.join()
+
+    assert fetched_before_parsing == [len(urls)]
+    assert sorted(issue["url"] for issue in issues) == sorted(urls)
+
+
+if __name__ == "__main__":
+    test_pages_are_parsed_in_worker_processes()
+    test_fetches_continue_while_a_parse_is_pending()
+    test_seo_checks_do_not_wait_for_parsing()
+    print("✓ Parse pool tests passed")
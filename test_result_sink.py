@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test script for the result sinks that stream findings to JSON Lines and SQLite.
+Runs offline against files in a temporary directory.
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+
+from src.result_sink import JsonlSink, ListSink, TeeSink, open_sink
+
+FINDINGS = [
+    ("broken_links", {"url": "https://example.com/gone", "status_code": 404}),
+    ("orphan_pages", "https://example.com/lonely"),
+    ("seo_issues", {"url": "https://example.com/a", "issue": "Missing meta description"}),
+]
+
+
+def test_jsonl_sink_writes_one_tagged_record_per_line():
+    """Every finding becomes a flat JSON object carrying its kind; bare orphan URLs get a url key."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "results.jsonl")
+        with JsonlSink(path) as sink:
+            for kind, finding in FINDINGS:
+                sink.write(kind, finding)
+            assert sink.counts["broken_links"] == 1
+
+        with open(path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+    assert records[0] == {"kind": "broken_links", "url": "https://example.com/gone", "status_code": 404}
+    assert records[1] == {"kind": "orphan_pages", "url": "https://example.com/lonely"}
+    assert [record["kind"] for record in records] == [kind for kind, _ in FINDINGS]
+
+
+def test_sqlite_sink_is_queryable_by_kind():
+    """Findings land in an indexed table that can be filtered without loading the rest."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "results.db")
+        sink = open_sink(path)
+        for kind, finding in FINDINGS:
+            sink.write(kind, finding)
+        sink.close()
+
+        db = sqlite3.connect(path)
+        rows = db.execute("SELECT url, finding FROM findings WHERE kind = 'broken_links'").fetchall()
+        db.close()
+    assert rows[0][0] == "https://example.com/gone"
+    assert json.loads(rows[0][1])["status_code"] == 404
+
+
+def test_tee_keeps_selected_kinds_in_memory():
+    """A TeeSink feeds every sink; a ListSink limited to some kinds drops the others."""
+    kept = ListSink(kinds=("broken_links",))
+    everything = ListSink()
+    tee = TeeSink(kept, everything)
+    for kind, finding in FINDINGS:
+        tee.write(kind, finding)
+
+    assert tee.counts["orphan_pages"] == 1
+    assert kept.results["broken_links"] == [FINDINGS[0][1]]
+    assert kept.results["orphan_pages"] == []
+    assert everything.results["orphan_pages"] == ["https://example.com/lonely"]
+
+
+if __name__ == "__main__":
+    test_jsonl_sink_writes_one_tagged_record_per_line()
+    test_sqlite_sink_is_queryable_by_kind()
+    test_tee_keeps_selected_kinds_in_memory()
+    print("✓ Result sink tests passed")
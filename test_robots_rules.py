@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script for the compiled robots.txt rule engine. Runs offline against inline
+robots.txt content.
+"""
+
+from src.host_scheduler import HostScheduler
+from src.robots_rules import RobotsCache, RobotsRules, parse_robots
+
+ROBOTS = """
+User-agent: *
+Crawl-delay: 5
+Disallow: /private/
+Allow: /private/press-kit
+Disallow: /*.pdf$
+Disallow: /search?
+
+User-agent: OtherBot
+User-agent: SitemapAnalyzerBot
+Crawl-delay: 0.5
+Disallow: /drafts/
+
+Sitemap: https://example.com/sitemap.xml
+"""
+
+
+def test_groups_and_sitemaps_are_parsed():
+    """Consecutive User-agent lines share one group; Sitemap lines are collected."""
+    groups, sitemaps = parse_robots(ROBOTS)
+
+    assert [group.agents for group in groups] == [["*"], ["otherbot", "sitemapanalyzerbot"]]
+    assert groups[1].rules == [(False, "/drafts/")]
+    assert sitemaps == ["https://example.com/sitemap.xml"]
+
+
+def test_matching_group_takes_precedence():
+    """The group naming our user agent replaces the * group, Crawl-delay included."""
+    ours = RobotsRules.from_text(ROBOTS, "SitemapAnalyzerBot/1.0")
+    assert ours.crawl_delay == 0.5
+    assert not ours.allowed("https://example.com/drafts/post")
+    assert ours.allowed("https://example.com/private/page")
+
+    other = RobotsRules.from_text(ROBOTS, "SomeoneElse/2.0")
+    assert other.crawl_delay == 5.0
+
+
+def test_longest_match_and_wildcards():
+    """The longest matching rule wins and * / $ patterns are honoured."""
+    rules = RobotsRules.from_text(ROBOTS, "SomeoneElse/2.0")
+
+    assert not rules.allowed("https://example.com/private/accounts")
+    assert rules.allowed("https://example.com/private/press-kit/logo.png")
+    assert not rules.allowed("https://example.com/files/report.pdf")
+    assert rules.allowed("https://example.com/files/report.pdf?download=1")
+    assert not rules.allowed("https://example.com/search?q=shoes")
+    assert rules.allowed("https://example.com/search")
+    assert rules.allowed("https://example.com/robots.txt")
+    assert RobotsRules.from_text("User-agent: *\nDisallow:", "Bot").allowed("https://example.com/any")
+
+
+class _StubResponse:
+    ok = True
+    text = ROBOTS
+
+
+class _StubSession:
+    def get(self, url, timeout=None):
+        return _StubResponse()
+
+
+def test_cache_seeds_the_scheduler_with_crawl_delay():
+    """Rules fetched by the cache or added to it pass their Crawl-delay on to the scheduler."""
+    scheduler = HostScheduler()
+    robots = RobotsCache(_StubSession(), "SitemapAnalyzerBot/1.0", scheduler=scheduler)
+
+    assert robots.allowed("https://cdn.example.com/image.png")
+    assert scheduler._rates["cdn.example.com"] == 2.0
+
+    robots.add("https://Example.com", RobotsRules.from_text(ROBOTS, "SomeoneElse/2.0"))
+    assert scheduler._rates["example.com"] == 0.2
+
+
+if __name__ == "__main__":
+    test_groups_and_sitemaps_are_parsed()
+    test_matching_group_takes_precedence()
+    test_longest_match_and_wildcards()
+    test_cache_seeds_the_scheduler_with_crawl_delay()
+    print("✓ Robots rules tests passed")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for lazy, concurrent sitemap discovery. Runs offline against a stub
+transport adapter that answers each candidate location after its own delay, and
+against a local synthetic site.
+"""
+
+import logging
+
+from benchmarks.synthetic_site import SiteSpec, SyntheticSite
+from src.sitemap_analyzer import SitemapAnalyzer
+from stub_transport import StubAdapter
+
+SITE = "https://example.com"
+SITEMAP = b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"><url><loc>https://example.com/</loc></url></urlset>'
+
+# robots.txt declares a sitemap that answers last; the common locations answer first
+ROUTES = {
+    "/robots.txt": (0.0, "text/plain", b"User-agent: *\nSitemap: https://example.com/declared.xml\n"),
+    "/declared.xml": (0.2, "application/xml", SITEMAP),
+    "/sitemap.xml": (0.0, "application/xml", SITEMAP),
+    "/sitemap_index.xml": (0.0, "application/xml", SITEMAP),
+}
+
+
+def route(request):
+    """Serves ROUTES (404 for anything else)."""
+    _, content_type, body = ROUTES.get(request.path_url, (0.0, "text/html", b"not found"))
+    return 200 if request.path_url in ROUTES else 404, {"Content-Type": content_type}, body
+
+
+def route_delay(request):
+    return ROUTES.get(request.path_url, (0.0,))[0]
+
+
+def discovering_analyzer():
+    analyzer = SitemapAnalyzer(SITE)
+    analyzer.set_log_level(logging.ERROR)
+    adapter = StubAdapter(route, delay=route_delay)
+    analyzer.session.mount("https://", adapter)
+    return analyzer, adapter
+
+
+def test_constructor_sends_no_requests():
+    """Creating an analyzer touches no host; discovery waits for the first use of sitemap_url."""
+    analyzer = SitemapAnalyzer(SITE)
+    assert analyzer.scheduler._hosts == {}
+    assert analyzer._sitemap_url is None
+
+
+def test_priority_beats_arrival_order():
+    """The robots.txt sitemap wins over common locations that answered before it."""
+    analyzer, adapter = discovering_analyzer()
+
+    assert analyzer.sitemap_url == f"{SITE}/declared.xml"
+    assert analyzer.base_url == SITE
+
+
+def test_losing_responses_are_closed():
+    """Only the winning response stays open, for analyze() to read; every other one is closed unread."""
+    analyzer, adapter = discovering_analyzer()
+    analyzer._discover(keep_response=True)
+    winner = analyzer.sitemap_url
+
+    probes = [response for response in adapter.responses if response.url != f"{SITE}/robots.txt"]
+    open_probes = [response for response in probes if not response.raw.closed]
+    assert [response.url for response in open_probes] == [winner]
+    assert analyzer._sitemap_response is open_probes[0]
+    # Five common locations and the one robots.txt declares
+    assert len(probes) == 6
+
+
+def test_url_lookups_leave_no_response_open():
+    """Reading sitemap_url on its own closes the winning response too, freeing its host slot."""
+    analyzer, adapter = discovering_analyzer()
+    assert analyzer.sitemap_url == f"{SITE}/declared.xml"
+    assert analyzer._sitemap_response is None
+    assert all(response.raw.closed for response in adapter.responses if response.url != f"{SITE}/robots.txt")
+
+
+def test_crawl_without_analyze_on_a_rate_limited_host():
+    """A crawl started directly does not wait on the slot of a sitemap response nobody reads."""
+    spec = SiteSpec(pages=60, rate_limited_every=2, sitemap_size=0)
+    with SyntheticSite(spec, in_process=True) as site:
+        analyzer = SitemapAnalyzer(site.url)
+        analyzer.set_log_level(logging.ERROR)
+        link_graph = analyzer.crawl_website()
+
+        assert link_graph.page_count == spec.pages
+        assert all(state.in_flight == 0 for state in analyzer.scheduler._hosts.values())
+
+
+if __name__ == "__main__":
+    test_constructor_sends_no_requests()
+    test_priority_beats_arrival_order()
+    test_losing_responses_are_closed()
+    test_url_lookups_leave_no_response_open()
+    test_crawl_without_analyze_on_a_rate_limited_host()
+    print("✓ Sitemap discovery tests passed")
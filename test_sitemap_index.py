@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test script for fetching the child sitemaps of a sitemap index. Runs offline
+against sitemap documents served from memory by a stub transport adapter.
+"""
+
+import logging
+
+from src.sitemap_analyzer import SitemapAnalyzer
+from stub_transport import StubAdapter
+
+ROOT = "https://example.com/sitemap_index.xml"
+
+
+def sitemap_index(*locs):
+    entries = "".join(f"<sitemap><loc>{loc}</loc></sitemap>" for loc in locs)
+    return f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</sitemapindex>'.encode()
+
+
+def urlset(*locs):
+    entries = "".join(f"<url><loc>{loc}</loc></url>" for loc in locs)
+    return f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>'.encode()
+
+
+# The index lists itself, and a nested index points back at its ancestor
+DOCUMENTS = {
+    ROOT: sitemap_index(ROOT, "https://example.com/a.xml", "https://example.com/b.xml",
+                        "https://example.com/nested.xml"),
+    "https://example.com/a.xml": urlset("https://example.com/1", "https://example.com/2"),
+    "https://example.com/b.xml": urlset("https://example.com/3"),
+    "https://example.com/nested.xml": sitemap_index(ROOT, "https://example.com/nested.xml",
+                                                    "https://example.com/c.xml"),
+    "https://example.com/c.xml": urlset("https://example.com/4"),
+}
+
+
+def serve_documents(request):
+    return 200 if request.url in DOCUMENTS else 404, {"Content-Type": "application/xml"}, DOCUMENTS.get(request.url, b"")
+
+
+def test_cyclic_index_is_fetched_concurrently_once():
+    """Children are fetched in parallel, each exactly once, and references back up the tree end the walk."""
+    analyzer = SitemapAnalyzer(ROOT)
+    analyzer.set_log_level(logging.ERROR)
+    # A short delay per document lets concurrent fetches overlap
+    adapter = StubAdapter(serve_documents, delay=0.05)
+    analyzer.session.mount("https://", adapter)
+    analyzer.sitemap_url = ROOT
+
+    entries = list(analyzer._iter_xml_sitemap_entries([DOCUMENTS[ROOT]]))
+
+    assert sorted(entry.loc for entry in entries) == [f"https://example.com/{n}" for n in range(1, 5)]
+    assert sorted(request.url for request in adapter.requests) == ["https://example.com/a.xml", "https://example.com/b.xml",
+                                        "https://example.com/c.xml", "https://example.com/nested.xml"]
+    assert adapter.peak > 1
+
+
+if __name__ == "__main__":
+    test_cyclic_index_is_fetched_concurrently_once()
+    print("✓ Sitemap index tests passed")
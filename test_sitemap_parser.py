@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for the streaming sitemap parser. Runs offline against
+in-memory sitemap documents split into small chunks.
+"""
+
+import gzip
+
+from src.sitemap_parser import UrlStream, iter_decompressed, iter_sitemap
+
+SITEMAP = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+        xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">
+  <url>
+    <loc> https://example.com/ </loc>
+    <lastmod>2025-07-01</lastmod>
+    <changefreq>daily</changefreq>
+    <priority>1.0</priority>
+  </url>
+  <url>
+    <loc>https://example.com/gallery</loc>
+    <image:image><image:loc>https://example.com/photo.jpg</image:loc></image:image>
+  </url>
+</urlset>
+"""
+
+SITEMAP_INDEX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://example.com/sitemap-1.xml</loc></sitemap>
+  <sitemap><loc>https://example.com/sitemap-2.xml</loc><lastmod>2025-07-02</lastmod></sitemap>
+</sitemapindex>
+"""
+
+
+def chunked(data, size=7):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_url_entries():
+    """Entries keep loc, lastmod, changefreq and priority, ignoring extension tags."""
+    entries = list(iter_sitemap(chunked(SITEMAP)))
+
+    assert [entry.loc for entry in entries] == ["https://example.com/", "https://example.com/gallery"]
+    assert entries[0].kind == "url"
+    assert entries[0].lastmod == "2025-07-01"
+    assert entries[0].changefreq == "daily"
+    assert entries[0].priority == "1.0"
+    assert entries[1].lastmod is None
+
+
+def test_sitemap_index_entries():
+    """Sitemap index documents yield "sitemap" entries for their children."""
+    entries = list(iter_sitemap(chunked(SITEMAP_INDEX)))
+
+    assert [entry.kind for entry in entries] == ["sitemap", "sitemap"]
+    assert entries[1].loc == "https://example.com/sitemap-2.xml"
+    assert entries[1].lastmod == "2025-07-02"
+
+
+def test_gzip_sitemap_entries():
+    """Gzip-compressed sitemaps are decompressed while they are parsed."""
+    entries = list(iter_sitemap(chunked(gzip.compress(SITEMAP), size=16)))
+
+    assert [entry.loc for entry in entries] == ["https://example.com/", "https://example.com/gallery"]
+
+
+def test_uncompressed_chunks_pass_through():
+    """Bodies without the gzip magic number are yielded unchanged."""
+    chunks = [b"", b"<urlset>", b"</urlset>"]
+
+    assert b"".join(iter_decompressed(chunks)) == b"<urlset></urlset>"
+
+
+def test_url_stream_replays_for_every_consumer():
+    """Every consumer of a closed UrlStream sees every URL in order."""
+    urls = UrlStream(["https://example.com/a"])
+    urls.add("https://example.com/b")
+    urls.close()
+
+    assert list(urls) == list(urls) == ["https://example.com/a", "https://example.com/b"]
+    assert len(urls) == 2
+
+
+if __name__ == "__main__":
+    test_url_entries()
+    test_sitemap_index_entries()
+    test_gzip_sitemap_entries()
+    test_uncompressed_chunks_pass_through()
+    test_url_stream_replays_for_every_consumer()
+    print("✓ Streaming sitemap parser tests passed")
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Test script for the synthetic site behind the offline benchmarks: a full analysis
+against it runs offline and must report exactly the findings the site contains.
+"""
+
+import json
+import logging
+
+from benchmarks.synthetic_site import SiteSpec, SyntheticSite, level_sizes
+from src.sitemap_analyzer import SitemapAnalyzer
+
+SPEC = SiteSpec(pages=60, fan_out=3, depth=3, orphans=2, broken=3, missing_description_every=7,
+                rate_limited_every=11, sitemap_size=25, page_bytes=512)
+
+
+def test_site_shape():
+    """Levels grow by the fan-out until the depth limit absorbs the remaining pages."""
+    assert level_sizes(SPEC) == [1, 3, 9, 47]
+    # 27 of the 47 deepest pages have a parent; the rest are orphans besides the extra ones
+    assert SyntheticSite(SPEC).expected == {"broken_links": 3, "orphan_pages": 20 + 2 + 3, "seo_issues": 8 + 3}
+
+
+def test_analysis_matches_the_site():
+    """analyze() reports every planted finding, despite 429s and a gzipped sitemap index."""
+    with SyntheticSite(SPEC, in_process=True) as site:
+        analyzer = SitemapAnalyzer(f"{site.url}/sitemap.xml")
+        analyzer.set_log_level(logging.ERROR)
+        report = analyzer.analyze()
+
+    assert {kind: len(report[kind]) for kind in site.expected} == site.expected
+    assert len(report["link_metrics"]) == SPEC.pages + SPEC.orphans + SPEC.broken
+
+
+def test_engines_report_the_same_findings():
+    """engine="async" and engine="thread" find the same issues; only the order of findings may differ."""
+    def normalized(report):
+        return {kind: sorted(json.dumps(finding, sort_keys=True) for finding in findings)
+                for kind, findings in report.items()}
+
+    reports = {}
+    with SyntheticSite(SPEC, in_process=True) as site:
+        for engine in ("thread", "async"):
+            analyzer = SitemapAnalyzer(f"{site.url}/sitemap.xml", engine=engine)
+            analyzer.set_log_level(logging.ERROR)
+            reports[engine] = normalized(analyzer.analyze())
+
+    assert reports["async"] == reports["thread"]
+    assert {kind: len(reports["async"][kind]) for kind in site.expected} == site.expected
+
+
+if __name__ == "__main__":
+    test_site_shape()
+    test_analysis_matches_the_site()
+    test_engines_report_the_same_findings()
+    print("✓ Synthetic site tests passed")
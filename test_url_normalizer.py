@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Test script for URL normalization and identity keys. Runs offline.
+"""
+
+from src.url_normalizer import normalize_url, url_key
+
+
+def test_normalize_url():
+    """Scheme/host case, default ports, fragments and tracking parameters are normalized away."""
+    assert normalize_url("HTTPS://Example.COM:443/Path/?utm_source=news&id=7#reviews") == \
+        "https://example.com/Path/?id=7"
+    assert normalize_url("http://example.com:80") == "http://example.com/"
+    assert normalize_url("http://example.com:8080/a") == "http://example.com:8080/a"
+    assert normalize_url(" https://example.com/a?gclid=abc ") == "https://example.com/a"
+    assert normalize_url("mailto:team@example.com") == "mailto:team@example.com"
+
+
+def test_url_key_treats_variants_as_one_page():
+    """Trailing-slash, fragment and tracking variants share one key; path case does not."""
+    variants = [
+        "https://example.com/docs",
+        "https://example.com/docs/",
+        "https://EXAMPLE.com/docs#intro",
+        "https://example.com:443/docs/?utm_campaign=launch",
+    ]
+    assert len({url_key(url) for url in variants}) == 1
+    assert url_key("https://example.com/Docs") != url_key("https://example.com/docs")
+    assert url_key("https://example.com") == url_key("https://example.com/")
+
+
+if __name__ == "__main__":
+    test_normalize_url()
+    test_url_key_treats_variants_as_one_page()
+    print("✓ URL normalizer tests passed")